@@ -1,6 +1,9 @@
+import numpy as np
 from moviepy import VideoClip
 from moviepy.Clip import Clip
 
+from model.Effects import AudioEffect, AudioEffectEnum
+from .utils.Exceptions import ConstraintException
 from .utils.VarConstraintChecker import constraintPourcentageNumber
 
 
@@ -15,3 +18,35 @@ def changeAudioVolume(video: VideoClip, volume: float) -> Clip:
 	"""
 	constraintPourcentageNumber(volume)
 	return video.with_volume_scaled(volume)
+
+
+def channelGains(volume: float, pan: float = 0.0) -> np.ndarray:
+	"""Left and right gains of a stereo track
+
+		Args:
+			volume (float): volume of the track, between 0 and 1
+			pan (float): balance, from -1 (left only) to 1 (right only), 0 leaving both channels as they are
+		Returns:
+			np.ndarray: float32 (left, right) gains
+	"""
+	constraintPourcentageNumber(volume)
+	if pan < -1 or pan > 1:
+		raise ConstraintException('Pan must be between -1 and 1.')
+	return np.array([volume * min(1.0, 1.0 - pan), volume * min(1.0, 1.0 + pan)], dtype=np.float32)
+
+
+def effectGains(effects: list[AudioEffect]) -> np.ndarray:
+	"""Left and right gains of the volume and pan effects of a clip, as applied by the mixer
+
+		Args:
+			effects (list[AudioEffect]): effects of the clip, in order
+		Returns:
+			np.ndarray: float32 (left, right) gains
+	"""
+	volume, pan = 1.0, 0.0
+	for effect in effects:
+		if effect.effect == AudioEffectEnum.VOLUME:
+			volume *= effect.params.get("volume", 1.0)
+		elif effect.effect == AudioEffectEnum.PAN:
+			pan = effect.params.get("pan", 0.0)
+	return channelGains(volume, pan)
@@ -0,0 +1,133 @@
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PySide6.QtCore import QObject, Signal
+from moviepy import AudioClip
+from moviepy.config import FFMPEG_BINARY
+
+from controller.utils.cacheDirectory import getCacheDir, sourceHash
+from model.Source import Source
+
+
+class PcmAudioClip(AudioClip):
+    """Audio read straight from a memory-mapped file of float32 PCM frames.
+
+    The file holds interleaved samples at ``sampleRate`` with ``channels``
+    channels and no header, as written by ``convertAudio``. Reading a block
+    is a slice of the mapping: no decoding and no resampling.
+    """
+
+    path: str
+    sampleRate: int
+    channels: int
+
+    def __init__(self, path: str, sampleRate: int, channels: int = 2) -> None:
+        self.path = path
+        self.sampleRate = sampleRate
+        self.channels = channels
+        frames = os.path.getsize(path) // (4 * channels)
+        self._data = np.memmap(path, dtype=np.float32, mode="r", shape=(frames, channels)) if frames else \
+            np.zeros((0, channels), dtype=np.float32)
+        super().__init__(self._samplesAt, duration=frames / sampleRate, fps=sampleRate)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def samples(self, first: int, count: int) -> np.ndarray:
+        """Frames ``[first, first + count)`` as a ``(count, channels)`` array, silent outside the file.
+
+        Inside the file this is a read-only view of the mapping, not a copy.
+        """
+        if 0 <= first and first + count <= len(self._data):
+            return self._data[first:first + count]
+        block = np.zeros((count, self.channels), dtype=np.float32)
+        begin, end = max(first, 0), min(first + count, len(self._data))
+        if begin < end:
+            block[begin - first:end - first] = self._data[begin:end]
+        return block
+
+    def _samplesAt(self, t):
+        indices = np.rint(np.asarray(t) * self.sampleRate).astype(np.int64)
+        inside = (indices >= 0) & (indices < len(self._data))
+        if np.ndim(indices) == 0:
+            return self._data[indices] if inside else np.zeros(self.channels, dtype=np.float32)
+        block = np.zeros((len(indices), self.channels), dtype=np.float32)
+        block[inside] = self._data[indices[inside]]
+        return block
+
+
+def convertAudio(inputPath: str, outputPath: str, sampleRate: int, channels: int) -> None:
+    """Decode the first audio stream of a file to raw float32 PCM at ``sampleRate`` with ``channels`` channels.
+
+    The file is written under a temporary name of its own and renamed once
+    complete, so a PCM file in the cache is always whole, even when two
+    copies of the same file are converted at once.
+
+    Raises:
+        subprocess.CalledProcessError: if ffmpeg fails (no audio stream, unreadable file...)
+    """
+    tmpPath = f"{outputPath}.{threading.get_ident()}.part"
+    try:
+        subprocess.run(
+            [
+                FFMPEG_BINARY, "-y", "-loglevel", "error",
+                "-i", inputPath, "-map", "0:a:0", "-vn",
+                "-ar", str(sampleRate), "-ac", str(channels),
+                "-f", "f32le", "-c:a", "pcm_f32le", tmpPath,
+            ],
+            check=True,
+            capture_output=True,
+        )
+        os.replace(tmpPath, outputPath)
+    finally:
+        if os.path.exists(tmpPath):
+            os.remove(tmpPath)
+
+
+class AudioConversionController(QObject):
+    """Converts the audio of the sources to the project rate and layout, once, in the background.
+
+    Sources come at any rate (44.1, 48, 96 kHz...) and in any layout; each is
+    resampled once to ``sampleRate`` and ``channels`` and stored as float32
+    PCM in the cache directory, under its content hash. Once converted, the
+    path is stored in ``Source.pcmPath`` and the mixer reads the source from
+    there (see ``PcmAudioClip``), so playback and export only copy samples.
+    """
+
+    audioReady = Signal(object)          # Source
+    audioFailed = Signal(object, str)    # Source, reason
+
+    sampleRate: int
+    channels: int
+
+    def __init__(self, sampleRate: int = 44100, channels: int = 2, maxWorkers: int = 2, parent=None) -> None:
+        super().__init__(parent)
+        self.sampleRate = sampleRate
+        self.channels = channels
+        self._executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix="audio-conversion")
+
+    def pcmPathFor(self, source: Source) -> str:
+        return os.path.join(getCacheDir("pcm"), f"{sourceHash(source)}_{self.sampleRate}_{self.channels}.f32")
+
+    def convert(self, source: Source) -> None:
+        """Queue the conversion of a source; ``audioReady`` is emitted when done."""
+        if source.pcmPath is None:
+            self._executor.submit(self._convert, source)
+
+    def _convert(self, source: Source) -> None:
+        try:
+            path = self.pcmPathFor(source)
+            if not os.path.isfile(path):
+                convertAudio(source.filepath, path, self.sampleRate, self.channels)
+            source.pcmPath = path
+            self.audioReady.emit(source)
+        except subprocess.CalledProcessError as e:
+            self.audioFailed.emit(source, e.stderr.decode(errors="replace").strip())
+        except Exception as e:
+            self.audioFailed.emit(source, str(e))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
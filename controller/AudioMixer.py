@@ -0,0 +1,161 @@
+import sys
+import time
+
+import numpy as np
+from moviepy import AudioClip, AudioFileClip, CompositeAudioClip
+from moviepy.audio.fx import MultiplyStereoVolume
+
+from controller.AudioController import changeAudioVolume, channelGains
+from controller.AudioConversionController import PcmAudioClip
+
+
+class MixTrack:
+    """One clip of the mix: ``length`` samples of ``audio`` played from sample ``start`` of the timeline.
+
+    The clip is read from its own beginning. ``gains`` holds one gain per
+    output channel (see ``AudioController.channelGains``).
+    """
+
+    audio: AudioClip
+    start: int
+    length: int
+    gains: np.ndarray
+
+    def __init__(self, audio: AudioClip, start: int, length: int, gains: np.ndarray) -> None:
+        self.audio = audio
+        self.start = start
+        self.length = length
+        self.gains = gains
+
+    @property
+    def end(self) -> int:
+        return self.start + self.length
+
+
+class AudioMixer(AudioClip):
+    """Timeline audio mixed block by block with NumPy.
+
+    Each block reads the samples of the tracks active over it as float32,
+    scales them by the track gains and adds them into one output buffer.
+    Track boundaries are sample indices, so a clip starts and stops on the
+    exact sample its frame maps to. Being an AudioClip, the mix is played
+    and exported like any MoviePy audio; contiguous requests (what playback
+    and ``write_audiofile`` make) go through ``mix`` directly.
+    """
+
+    SAMPLE_RATE = 44100   # project rate, which sources are converted to (see AudioConversionController)
+    CHANNELS = 2
+    MAX_READ = 65536   # samples per read, well below the size of MoviePy's audio reader buffer
+
+    tracks: list[MixTrack]
+    sampleRate: int
+
+    def __init__(self, tracks: list[MixTrack], sampleRate: int = SAMPLE_RATE) -> None:
+        self.tracks = sorted(tracks, key=lambda track: track.start)
+        self.sampleRate = sampleRate
+        self._scratch = np.zeros((0, self.CHANNELS), dtype=np.float32)
+        end = max((track.end for track in self.tracks), default=0)
+        super().__init__(self._samplesAt, duration=end / sampleRate, fps=sampleRate)
+
+    def mix(self, firstSample: int, count: int, out: np.ndarray | None = None) -> np.ndarray:
+        """Mix samples ``[firstSample, firstSample + count)`` into ``out``, a float32 ``(count, 2)`` buffer.
+
+        ``out`` is overwritten; a new buffer is allocated when it is None.
+        """
+        if out is None:
+            out = np.empty((count, self.CHANNELS), dtype=np.float32)
+        out[:] = 0
+        if len(self._scratch) < min(count, self.MAX_READ):
+            self._scratch = np.empty((min(count, self.MAX_READ), self.CHANNELS), dtype=np.float32)
+
+        lastSample = firstSample + count
+        for track in self.tracks:
+            if track.start >= lastSample:
+                break
+            begin, end = max(firstSample, track.start), min(lastSample, track.end)
+            for readStart in range(begin, end, self.MAX_READ):
+                readEnd = min(readStart + self.MAX_READ, end)
+                samples = self._read(track, readStart - track.start, readEnd - readStart)
+                scaled = self._scratch[:len(samples)]
+                np.multiply(samples, track.gains, out=scaled)
+                out[readStart - firstSample:readEnd - firstSample] += scaled
+        return out
+
+    def _read(self, track: MixTrack, offset: int, count: int) -> np.ndarray:
+        """``count`` samples of a track from ``offset`` as float32, mono spread over both channels."""
+        audio = track.audio
+        if isinstance(audio, PcmAudioClip) and audio.sampleRate == self.sampleRate and audio.channels == self.CHANNELS:
+            # Already at the project rate and layout: a slice of the mapped file
+            return audio.samples(offset, count)
+        samples = np.asarray(track.audio.get_frame((offset + np.arange(count)) / self.sampleRate), dtype=np.float32)
+        if samples.ndim == 1:
+            samples = samples[:, None]
+        return samples[:, :self.CHANNELS]
+
+    def _samplesAt(self, t):
+        if np.isscalar(t):
+            return self.mix(int(round(t * self.sampleRate)), 1)[0]
+
+        samples = np.rint(np.asarray(t) * self.sampleRate).astype(np.int64)
+        if len(samples) and samples[-1] - samples[0] == len(samples) - 1:
+            return self.mix(int(samples[0]), len(samples))
+        # Arbitrary times: mix the span they cover and pick the samples from it
+        first = int(samples.min())
+        block = self.mix(first, int(samples.max()) - first + 1)
+        return block[samples - first]
+
+
+def benchmark(paths: list[str], tracks: int = 16, seconds: float = 10.0, sampleRate: int = 44100,
+              blockSize: int = 8192) -> dict[str, float]:
+    """Compare the mixing speed of CompositeAudioClip and of AudioMixer on ``tracks`` simultaneous tracks.
+
+    The files are used in turn, each track starting 10 ms after the previous
+    one with its own volume and pan. Both mixes are read in consecutive
+    blocks of ``blockSize`` samples, as playback does; speeds are in seconds
+    of audio mixed per second.
+    """
+    results = {}
+    blocks = {}
+    for name in ("composite", "mixer"):
+        # Each mix gets its own readers, so neither starts with buffers filled by the other
+        readers = [AudioFileClip(paths[i % len(paths)], fps=sampleRate) for i in range(tracks)]
+        try:
+            layout = []
+            for i, reader in enumerate(readers):
+                start = i * sampleRate // 100
+                length = min(int(reader.duration * sampleRate), int(seconds * sampleRate))
+                volume, pan = 0.5 + 0.5 * i / tracks, -1 + 2 * i / max(tracks - 1, 1)
+                layout.append((reader, start, length, volume, pan))
+
+            if name == "mixer":
+                clip = AudioMixer([
+                    MixTrack(reader, start, length, channelGains(volume, pan))
+                    for reader, start, length, volume, pan in layout
+                ], sampleRate)
+            else:
+                clip = CompositeAudioClip([
+                    changeAudioVolume(reader.subclipped(0, length / sampleRate), volume)
+                    .with_effects([MultiplyStereoVolume(*channelGains(1.0, pan))])
+                    .with_start(start / sampleRate)
+                    for reader, start, length, volume, pan in layout
+                ])
+
+            total = max(start + length for _, start, length, _, _ in layout)
+            startTime = time.perf_counter()
+            blocks[name] = [
+                np.asarray(clip.get_frame(np.arange(first, min(first + blockSize, total)) / sampleRate), dtype=np.float32)
+                for first in range(0, total, blockSize)
+            ]
+            results[name] = total / sampleRate / (time.perf_counter() - startTime)
+        finally:
+            for reader in readers:
+                reader.close()
+
+    results["maxDifference"] = float(max(np.abs(a - b).max() for a, b in zip(blocks["composite"], blocks["mixer"])))
+    return results
+
+
+if __name__ == "__main__":
+    # python -m controller.AudioMixer audio1.wav [audio2.mp3 ...]
+    for name, value in benchmark(sys.argv[1:]).items():
+        print(f"{name}: {value:.3f}")
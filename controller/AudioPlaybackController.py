@@ -0,0 +1,299 @@
+import threading
+import time
+
+import numpy as np
+from PySide6.QtCore import QObject, QIODevice
+from moviepy import AudioClip
+
+from controller.AudioMixer import AudioMixer
+
+
+def renderAudioBlock(audio: AudioClip | None, firstSample: int, count: int, sampleRate: int, channels: int) -> np.ndarray:
+    """Samples ``[firstSample, firstSample + count)`` of a clip as a float32 ``(count, channels)`` block.
+
+    Past the end of the clip (or without a clip) the block is silent, and mono
+    sources are sent to every channel. ``count`` must stay well below MoviePy's
+    audio reader buffer (about 200000 samples), past which it returns silence.
+    An AudioMixer mixes the block directly, without going through times.
+    """
+    if isinstance(audio, AudioMixer) and channels == AudioMixer.CHANNELS:
+        return audio.mix(firstSample, count)
+
+    block = np.zeros((count, channels), dtype=np.float32)
+    if audio is None or audio.duration is None:
+        return block
+
+    t = (firstSample + np.arange(count)) / sampleRate
+    inside = t < audio.duration
+    if not inside.any():
+        return block
+    samples = np.asarray(audio.get_frame(t[inside]), dtype=np.float32)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    block[:len(samples)] = samples[:, :channels] if samples.shape[1] >= channels else samples[:, :1]
+    return block
+
+
+class AudioRingBuffer:
+    """Single-producer/single-consumer ring buffer of float32 audio frames.
+
+    The mixer thread is the only writer and the output device the only reader.
+    Each side only ever advances its own counter, so no lock is needed: the
+    writer publishes samples by moving ``_writePos`` after copying them, and
+    the reader frees space by moving ``_readPos`` after consuming them.
+    """
+
+    capacity: int
+    channels: int
+
+    def __init__(self, capacity: int, channels: int = 2) -> None:
+        self.capacity = capacity
+        self.channels = channels
+        self._data = np.zeros((capacity, channels), dtype=np.float32)
+        self._writePos = 0   # total frames written, owned by the writer
+        self._readPos = 0    # total frames read, owned by the reader
+
+    def available(self) -> int:
+        """Frames ready to be read."""
+        return self._writePos - self._readPos
+
+    def free(self) -> int:
+        """Frames that can be written without overwriting unread ones."""
+        return self.capacity - self.available()
+
+    def write(self, frames: np.ndarray) -> int:
+        """Copy as many frames as fit; return how many were written."""
+        count = min(len(frames), self.free())
+        start = self._writePos % self.capacity
+        first = min(count, self.capacity - start)
+        self._data[start:start + first] = frames[:first]
+        self._data[:count - first] = frames[first:count]
+        self._writePos += count
+        return count
+
+    def read(self, out: np.ndarray) -> int:
+        """Fill ``out`` with as many frames as are available; return how many were read."""
+        count = min(len(out), self.available())
+        start = self._readPos % self.capacity
+        first = min(count, self.capacity - start)
+        out[:first] = self._data[start:start + first]
+        out[first:count] = self._data[:count - first]
+        self._readPos += count
+        return count
+
+    def reset(self) -> None:
+        """Empty the buffer. Only call this while neither side is running."""
+        self._writePos = self._readPos = 0
+
+
+class NullAudioDevice:
+    """Output device stand-in that consumes samples in real time without playing them.
+
+    Used when no audio output is available (headless runs, tests), so the
+    audio clock and the rest of the pipeline behave as with a sound card.
+    """
+
+    def __init__(self, sampleRate: int, channels: int, period: float = 0.01) -> None:
+        self.sampleRate = sampleRate
+        self.channels = channels
+        self.period = period
+        self.underruns = 0
+        self._ring = None
+        self._thread = None
+        self._running = False
+        self._consumed = 0
+
+    def start(self, ring: AudioRingBuffer) -> None:
+        self.stop()
+        self._ring = ring
+        self._consumed = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="null-audio", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def position(self) -> float:
+        """Seconds of audio played since ``start``."""
+        return self._consumed / self.sampleRate
+
+    def _run(self) -> None:
+        startTime = time.monotonic()
+        out = np.zeros((self.sampleRate, self.channels), dtype=np.float32)
+        while self._running:
+            due = int((time.monotonic() - startTime) * self.sampleRate) - self._consumed
+            if due > 0:
+                due = min(due, len(out))
+                if self._ring.read(out[:due]) < due:
+                    self.underruns += 1
+                self._consumed += due
+            time.sleep(self.period)
+
+
+class _RingReader(QIODevice):
+    """QIODevice pulled by QAudioSink, converting ring buffer frames to 16-bit PCM."""
+
+    def __init__(self, ring: AudioRingBuffer, channels: int) -> None:
+        super().__init__()
+        self.ring = ring
+        self.channels = channels
+        self.underruns = 0
+
+    def readData(self, maxlen: int) -> bytes:
+        frames = np.zeros((maxlen // (2 * self.channels), self.channels), dtype=np.float32)
+        if self.ring.read(frames) < len(frames):
+            # Underrun: play silence rather than stalling the device, which is the clock
+            self.underruns += 1
+        return (np.clip(frames, -1, 1) * 32767).astype(np.int16).tobytes()
+
+    def writeData(self, data) -> int:
+        return -1
+
+    def bytesAvailable(self) -> int:
+        return self.ring.available() * 2 * self.channels + super().bytesAvailable()
+
+
+class QtAudioDevice:
+    """Sound card output through QAudioSink, pulling samples from the ring buffer."""
+
+    def __init__(self, sampleRate: int, channels: int) -> None:
+        from PySide6.QtMultimedia import QAudioFormat, QAudioSink, QMediaDevices
+
+        device = QMediaDevices.defaultAudioOutput()
+        if device.isNull():
+            raise RuntimeError("No audio output device")
+
+        audioFormat = QAudioFormat()
+        audioFormat.setSampleRate(sampleRate)
+        audioFormat.setChannelCount(channels)
+        audioFormat.setSampleFormat(QAudioFormat.SampleFormat.Int16)
+        if not device.isFormatSupported(audioFormat):
+            raise RuntimeError("Unsupported audio format")
+
+        self.sampleRate = sampleRate
+        self.channels = channels
+        self._sink = QAudioSink(device, audioFormat)
+        self._reader = None
+
+    @property
+    def underruns(self) -> int:
+        return self._reader.underruns if self._reader else 0
+
+    def start(self, ring: AudioRingBuffer) -> None:
+        self.stop()
+        self._reader = _RingReader(ring, self.channels)
+        self._reader.open(QIODevice.OpenModeFlag.ReadOnly)
+        self._sink.start(self._reader)
+
+    def stop(self) -> None:
+        self._sink.stop()
+        if self._reader is not None:
+            self._reader.close()
+
+    def position(self) -> float:
+        """Seconds of audio actually played: what was processed minus what still sits in the device buffer."""
+        buffered = self._sink.bufferSize() - self._sink.bytesFree()
+        return max(0.0, self._sink.processedUSecs() / 1e6 - buffered / (2 * self.channels * self.sampleRate))
+
+
+def createAudioDevice(sampleRate: int, channels: int) -> "QtAudioDevice | NullAudioDevice":
+    """Open the default sound card, or a NullAudioDevice if there is none (or no QtMultimedia backend)."""
+    try:
+        return QtAudioDevice(sampleRate, channels)
+    except (ImportError, RuntimeError) as e:
+        print(f"[AudioPlaybackController] No audio output, playing silently: {e}")
+        return NullAudioDevice(sampleRate, channels)
+
+
+class AudioPlaybackController(QObject):
+    """Streams the timeline audio to the output device and serves as the playback clock.
+
+    A mixer thread renders the timeline audio in small blocks into a ring
+    buffer that the device drains. The device position is what the video
+    follows (see ``PlaybackClock.setTimeSource``), so picture stays in sync
+    with what is heard even when the sound card clock runs slightly off.
+    """
+
+    SAMPLE_RATE = 44100
+    CHANNELS = 2
+    BLOCK_SIZE = 1024        # frames mixed at a time
+    BUFFER_SECONDS = 0.25    # audio queued ahead of the device
+
+    audio: AudioClip | None
+    playing: bool
+
+    def __init__(self, device=None, parent=None) -> None:
+        super().__init__(parent)
+        self.device = device if device is not None else createAudioDevice(self.SAMPLE_RATE, self.CHANNELS)
+        self.ring = AudioRingBuffer(int(self.SAMPLE_RATE * self.BUFFER_SECONDS), self.CHANNELS)
+        self.audio = None
+        self.playing = False
+        self._startSeconds = 0.0
+        self._startTime = 0.0
+        self._mixPos = 0
+        self._mixer = None
+
+    def hasAudio(self) -> bool:
+        return self.audio is not None and self.audio.duration is not None
+
+    def setAudio(self, audio: AudioClip | None) -> None:
+        """Use a new mix of the timeline. While playing, the mixer switches to it at its next block."""
+        self.audio = audio
+
+    def start(self, seconds: float) -> None:
+        """Start playing the timeline audio from ``seconds``."""
+        self.stop()
+        self.ring.reset()
+        self._startSeconds = seconds
+        self._mixPos = int(round(seconds * self.SAMPLE_RATE))
+        # Pre-fill so the device does not start on an underrun
+        self._mixBlocks()
+        self.playing = True
+        self._mixer = threading.Thread(target=self._runMixer, name="audio-mixer", daemon=True)
+        self._mixer.start()
+        self.device.start(self.ring)
+        self._startTime = time.monotonic()
+
+    def stop(self) -> None:
+        if not self.playing:
+            return
+        self.playing = False
+        self.device.stop()
+        self._mixer.join()
+        self._mixer = None
+
+    def elapsed(self) -> float:
+        """Seconds played by the device since ``start``: the time source of the playback clock."""
+        return self.device.position()
+
+    def position(self) -> float:
+        """Timeline position of the audio being heard, in seconds."""
+        return self._startSeconds + (self.device.position() if self.playing else 0.0)
+
+    def drift(self) -> float:
+        """How far the device clock is ahead (positive) or behind the wall clock since ``start``, in seconds."""
+        if not self.playing:
+            return 0.0
+        return self.device.position() - (time.monotonic() - self._startTime)
+
+    def _runMixer(self) -> None:
+        blockDuration = self.BLOCK_SIZE / self.SAMPLE_RATE
+        while self.playing:
+            if not self._mixBlocks():
+                time.sleep(blockDuration / 2)
+
+    def _mixBlocks(self) -> bool:
+        """Render blocks until the ring buffer is full; return whether anything was written."""
+        wrote = False
+        while self.ring.free() >= self.BLOCK_SIZE:
+            self.ring.write(self._mixBlock(self._mixPos, self.BLOCK_SIZE))
+            self._mixPos += self.BLOCK_SIZE
+            wrote = True
+        return wrote
+
+    def _mixBlock(self, firstSample: int, count: int) -> np.ndarray:
+        return renderAudioBlock(self.audio, firstSample, count, self.SAMPLE_RATE, self.CHANNELS)
@@ -32,20 +32,20 @@ class ClipResizeController(QObject):
         self.clipResized.emit(clip, old_duration, new_duration_frames)
         return True
     
-    def _resize_timeline_clip(self, clip: TimelineClip, new_duration_sec: float, max_duration_sec: float = None):
-        old_duration = clip.duration
+    def _resize_timeline_clip(self, clip: TimelineClip, new_duration_frames: int, max_duration_frames: int = None):
+        old_duration = clip.duration_frames
         
-        if new_duration_sec <= 0:
-            self.resizeFailed.emit(clip, f"Durée invalide: {new_duration_sec:.2f}s (minimum: 0.1s)")
+        if new_duration_frames <= 0:
+            self.resizeFailed.emit(clip, f"Durée invalide: {new_duration_frames} frames (minimum: 1)")
             return False
         
-        if max_duration_sec and new_duration_sec > max_duration_sec:
-            self.resizeFailed.emit(clip, f"Durée trop grande: {new_duration_sec:.2f}s (maximum: {max_duration_sec:.2f}s)")
+        if max_duration_frames and new_duration_frames > max_duration_frames:
+            self.resizeFailed.emit(clip, f"Durée trop grande: {new_duration_frames} frames (maximum: {max_duration_frames})")
             return False
         
-        clip.end = clip.start + new_duration_sec
-        clip.duration = new_duration_sec
-        self.clipResized.emit(clip, int(old_duration * 24), int(new_duration_sec * 24))  # conversion en frames pour le signal
+        clip.duration_frames = new_duration_frames
+        clip.end = clip.start_frame + new_duration_frames
+        self.clipResized.emit(clip, old_duration, new_duration_frames)
         return True
     
     def move_clip(self, clip, new_start, min_start=0):
@@ -66,17 +66,16 @@ class ClipResizeController(QObject):
         self.clipMoved.emit(clip, old_start, new_start_frame)
         return True
     
-    def _move_timeline_clip(self, clip: TimelineClip, new_start_sec: float, min_start_sec: float = 0):
-        old_start = clip.start
+    def _move_timeline_clip(self, clip: TimelineClip, new_start_frame: int, min_start: int = 0):
+        old_start = clip.start_frame
         
-        if new_start_sec < min_start_sec:
-            self.resizeFailed.emit(clip, f"Position invalide: {new_start_sec:.2f}s (minimum: {min_start_sec:.2f}s)")
+        if new_start_frame < min_start:
+            self.resizeFailed.emit(clip, f"Position invalide: {new_start_frame} frames (minimum: {min_start})")
             return False
         
-        duration = clip.duration
-        clip.start = new_start_sec
-        clip.end = new_start_sec + duration
-        self.clipMoved.emit(clip, int(old_start * 24), int(new_start_sec * 24)) # Convertir en frames pour le signal
+        clip.start_frame = new_start_frame
+        clip.end = new_start_frame + clip.duration_frames
+        self.clipMoved.emit(clip, old_start, new_start_frame)
         return True
     
     def resize_clip_from_left(self, clip, new_start, max_duration=None):
@@ -107,26 +106,26 @@ class ClipResizeController(QObject):
         self.clipResized.emit(clip, old_duration, new_duration)
         return True
     
-    def _resize_timeline_clip_from_left(self, clip: TimelineClip, new_start_sec: float, max_duration_sec: float = None):
-        old_start = clip.start
-        old_duration = clip.duration
+    def _resize_timeline_clip_from_left(self, clip: TimelineClip, new_start_frame: int, max_duration_frames: int = None):
+        old_start = clip.start_frame
+        old_duration = clip.duration_frames
         
-        new_duration = old_duration - (new_start_sec - old_start)
+        new_duration = old_duration - (new_start_frame - old_start)
         
         if new_duration <= 0:
             self.resizeFailed.emit(clip, "Impossible de redimensionner: durée négative")
             return False
         
-        if max_duration_sec and new_duration > max_duration_sec:
-            self.resizeFailed.emit(clip, f"Durée trop grande après redimensionnement: {new_duration:.2f}s")
+        if max_duration_frames and new_duration > max_duration_frames:
+            self.resizeFailed.emit(clip, f"Durée trop grande après redimensionnement: {new_duration} frames")
             return False
         
-        clip.start = new_start_sec
-        clip.duration = new_duration
-        clip.end = new_start_sec + new_duration
+        clip.start_frame = new_start_frame
+        clip.duration_frames = new_duration
+        clip.end = new_start_frame + new_duration
         
-        self.clipMoved.emit(clip, int(old_start * 24), int(new_start_sec * 24))
-        self.clipResized.emit(clip, int(old_duration * 24), int(new_duration * 24))
+        self.clipMoved.emit(clip, old_start, new_start_frame)
+        self.clipResized.emit(clip, old_duration, new_duration)
         return True
     
     def resize_clip_from_right(self, clip, new_duration, max_duration=None):
@@ -0,0 +1,452 @@
+import copy
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+from moviepy import AudioClip, VideoClip, VideoFileClip
+from moviepy.audio.io.readers import FFMPEG_AudioReader
+from moviepy.video.io.ffmpeg_reader import FFMPEG_VideoReader, ffmpeg_parse_infos
+
+Reader = FFMPEG_VideoReader | FFMPEG_AudioReader
+
+
+class _Entry:
+    """A file of the pool: its parsed infos, its open readers and the number of handles on it."""
+
+    def __init__(self, path: str, infos: dict) -> None:
+        self.path = path
+        self.infos = infos
+        self.handles = 0
+        self.readers: dict[str, list[Reader]] = {"video": [], "audio": []}
+        # First reader opened of each kind; later ones are copies of it, so the file is parsed once
+        self.templates: dict[str, Reader | None] = {"video": None, "audio": None}
+
+
+class SourceReader:
+    """A clip's reference to the readers of one file in a DecoderPool.
+
+    It has the ``get_frame`` of MoviePy's readers, so it stands in for
+    ``VideoFileClip.reader``: each call borrows the pooled reader positioned
+    closest before ``t``. ``close`` (or dropping the last reference to the
+    handle) gives the reference back; the readers of a file are closed when
+    no handle on it is left.
+    """
+
+    path: str
+    kind: str
+
+    def __init__(self, pool: "DecoderPool", entry: _Entry, kind: str) -> None:
+        self.path = entry.path
+        self.kind = kind
+        self._pool = pool
+        self._entry = entry
+        self._finalizer = weakref.finalize(self, pool._release, entry)
+
+    def get_frame(self, t):
+        return self._pool._read(self, self._entry, self.kind, t)
+
+    def close(self) -> None:
+        # Runs the release once, however many clips share the handle
+        self._finalizer()
+
+
+class PooledVideoClip(VideoClip):
+    """Video file clip whose frames are decoded by the readers of a DecoderPool.
+
+    Like a VideoFileClip it exposes ``reader``, ``fps``, ``size`` and
+    ``audio``, but opening it starts no process: readers are opened when
+    frames are read, and shared with every other clip of the same file.
+    """
+
+    filename: str
+    reader: SourceReader | None
+
+    def __init__(self, reader: SourceReader, fps: float, size: tuple[int, int], duration: float,
+                 audio: "PooledAudioClip | None" = None) -> None:
+        super().__init__()
+        self.reader = reader
+        self.filename = reader.path
+        self.fps = fps
+        self.size = size
+        self.duration = self.end = duration
+        self.audio = audio
+        self.frame_function = lambda t: self.reader.get_frame(t)
+
+    def close(self) -> None:
+        if self.reader:
+            self.reader.close()
+            self.reader = None
+        if self.audio:
+            self.audio.close()
+            self.audio = None
+
+
+class PooledAudioClip(AudioClip):
+    """Audio file clip read by the readers of a DecoderPool (see PooledVideoClip)."""
+
+    filename: str
+    reader: SourceReader | None
+
+    def __init__(self, reader: SourceReader, fps: int, nchannels: int, duration: float) -> None:
+        # No frame function given to AudioClip, which would read a frame to count the channels
+        super().__init__(duration=duration, fps=fps)
+        self.reader = reader
+        self.filename = reader.path
+        self.nchannels = nchannels
+        self.frame_function = lambda t: self.reader.get_frame(t)
+
+    def close(self) -> None:
+        if self.reader:
+            self.reader.close()
+            self.reader = None
+
+
+class DecoderPool:
+    """ffmpeg readers of the media files, shared by every clip made from them.
+
+    Opening a VideoFileClip starts an ffmpeg process for the video and
+    another for the audio; with one per timeline clip, ten clips cut from a
+    file keep twenty processes alive. Clips of the pool instead hold a
+    reference-counted handle on their file (see SourceReader), and readers are
+    borrowed for each read: the one whose position is just before the
+    requested time (within ``MAX_SKIP_FRAMES``) is used, so clips playing
+    different parts of a file each keep a reader positioned for them, and a
+    new reader is only opened when none is.
+
+    At most ``maxReaders`` video readers stay open (audio readers, few and
+    only used until the audio is converted, are not counted). At the cap, an
+    idle reader of the same file is sought to the new position, else the
+    least recently used idle one is closed. Readers used during the frame
+    being drawn (or the one before) are never taken that way: a thread
+    starts a new frame when one of its handles reads again, so the readers
+    of every layer stay put and the cap grows to the number of readers in
+    use at once.
+    """
+
+    MAX_SKIP_FRAMES = 100     # frames read through rather than seeking, as MoviePy's reader does
+    AUDIO_FPS = 44100         # same reading parameters as VideoFileClip's audio
+    AUDIO_NBYTES = 2
+    AUDIO_CHANNELS = 2
+    AUDIO_BUFFER = 200000
+
+    maxReaders: int
+    opened: int
+    reused: int
+    evicted: int
+
+    def __init__(self, maxReaders: int = 8) -> None:
+        self.maxReaders = maxReaders
+        self.opened = 0
+        self.reused = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+        self._idle: OrderedDict[int, tuple[_Entry, str, Reader]] = OrderedDict()   # least recently used first
+        self._open = 0   # video readers open or being opened, idle or borrowed
+        # Per thread: the handles read during its current frame, and the readers used during it and the previous one
+        self._frames: dict[int, tuple[set[int], set[int], set[int]]] = {}
+
+    def videoClip(self, path: str) -> PooledVideoClip:
+        """Clip of the video of a file, with its audio as ``audio`` when it has some."""
+        entry = self._retain(path)
+        infos = entry.infos
+        size = tuple(infos.get("video_size", (1, 1)))
+        if abs(infos.get("video_rotation", 0)) in (90, 270):
+            # ffmpeg rotates such videos when decoding
+            size = (size[1], size[0])
+        audio = self.audioClip(path) if infos.get("audio_found") else None
+        return PooledVideoClip(
+            SourceReader(self, entry, "video"), infos.get("video_fps", 1.0), size,
+            infos.get("video_duration", 0.0), audio,
+        )
+
+    def audioClip(self, path: str) -> PooledAudioClip:
+        entry = self._retain(path)
+        return PooledAudioClip(
+            SourceReader(self, entry, "audio"), self.AUDIO_FPS, self.AUDIO_CHANNELS, entry.infos.get("duration", 0.0),
+        )
+
+    def stats(self) -> dict[str, int]:
+        """Files in use, handles on them, open readers and live ffmpeg processes."""
+        with self._lock:
+            readers = [reader for entry in self._entries.values() for kind in entry.readers.values() for reader in kind]
+            return {
+                "files": len(self._entries),
+                "handles": sum(entry.handles for entry in self._entries.values()),
+                "decoders": len(readers),
+                "subprocesses": sum(1 for reader in readers if reader.proc is not None and reader.proc.poll() is None),
+                "idle": len(self._idle),
+            }
+
+    def close(self) -> None:
+        """Close the idle readers; borrowed ones are closed when given back."""
+        with self._lock:
+            idle = list(self._idle.values())
+            self._idle.clear()
+            for entry, kind, reader in idle:
+                self._forget(entry, kind, reader)
+        for _, _, reader in idle:
+            reader.close()
+
+    def _retain(self, path: str) -> _Entry:
+        path = os.path.abspath(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                entry.handles += 1
+                return entry
+        # Parsed outside the lock: a short ffmpeg run, no process is left open
+        infos = ffmpeg_parse_infos(path)
+        with self._lock:
+            entry = self._entries.setdefault(path, _Entry(path, infos))
+            entry.handles += 1
+            return entry
+
+    def _release(self, entry: _Entry) -> None:
+        with self._lock:
+            entry.handles -= 1
+            if entry.handles > 0:
+                return
+            if self._entries.get(entry.path) is entry:
+                del self._entries[entry.path]
+            idle = [(kind, reader) for e, kind, reader in list(self._idle.values()) if e is entry]
+            for kind, reader in idle:
+                del self._idle[id(reader)]
+                self._forget(entry, kind, reader)
+        for _, reader in idle:
+            reader.close()
+
+    def _read(self, handle: SourceReader, entry: _Entry, kind: str, t):
+        reader = self._borrow(handle, entry, kind, t)
+        try:
+            frame = reader.get_frame(t)
+        except Exception:
+            # The reader may be left mid-frame: do not hand it out again
+            with self._lock:
+                self._forget(entry, kind, reader)
+            reader.close()
+            raise
+        self._giveBack(entry, kind, reader)
+        return frame
+
+    def _borrow(self, handle: SourceReader, entry: _Entry, kind: str, t) -> Reader:
+        distance = self._videoDistance if kind == "video" else self._audioDistance
+        toClose = []
+        with self._lock:
+            handles, used, previous = self._frames.setdefault(threading.get_ident(), (set(), set(), set()))
+            if id(handle) in handles:
+                # The handle reads again: this thread has moved on to its next frame
+                handles.clear()
+                previous.clear()
+                previous.update(used)
+                used.clear()
+            handles.add(id(handle))
+
+            best, bestDistance = None, None
+            for reader in entry.readers[kind]:
+                if id(reader) not in self._idle:
+                    continue
+                d = distance(reader, t)
+                if d is not None and (best is None or d < bestDistance):
+                    best, bestDistance = reader, d
+
+            if best is None and (kind == "audio" or self._open >= self.maxReaders):
+                # Seek an idle reader of the file rather than opening one
+                inUse = self._inUse()
+                best = next((reader for e, k, reader in self._idle.values()
+                             if e is entry and k == kind and id(reader) not in inUse), None)
+                if best is None and kind == "video":
+                    lru = self._leastRecentlyUsed(inUse)
+                    if lru is not None:
+                        self._evict(lru)
+                        toClose.append(lru)
+
+            if best is not None:
+                del self._idle[id(best)]
+                used.add(id(best))
+                self.reused += 1
+            elif kind == "video":
+                self._open += 1
+        for reader in toClose:
+            reader.close()
+        if best is not None:
+            return best
+
+        try:
+            reader = self._openReader(entry, kind, t)
+        except Exception:
+            if kind == "video":
+                with self._lock:
+                    self._open -= 1
+            raise
+        with self._lock:
+            entry.readers[kind].append(reader)
+            used.add(id(reader))
+            self.opened += 1
+        return reader
+
+    def _giveBack(self, entry: _Entry, kind: str, reader: Reader) -> None:
+        toClose = []
+        with self._lock:
+            if entry.handles <= 0:
+                # Every handle on the file was released while the reader was out
+                self._forget(entry, kind, reader)
+                toClose.append(reader)
+            else:
+                self._idle[id(reader)] = (entry, kind, reader)
+            if self._open > self.maxReaders:
+                inUse = self._inUse()
+                while self._open > self.maxReaders:
+                    lru = self._leastRecentlyUsed(inUse)
+                    if lru is None:
+                        break
+                    self._evict(lru)
+                    toClose.append(lru)
+        for reader in toClose:
+            reader.close()
+
+    # The methods below are called with the lock held
+
+    def _inUse(self) -> set[int]:
+        """Readers used during the current or previous frame of a live thread.
+
+        The previous frame counts too: its readers are about to be read again
+        by the layers that have not reached the current frame yet.
+        """
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._frames if ident not in alive]:
+            del self._frames[ident]
+        return set().union(*(used | previous for _, used, previous in self._frames.values()))
+
+    def _leastRecentlyUsed(self, inUse: set[int]) -> Reader | None:
+        """Least recently used idle video reader not in use during a current frame."""
+        return next((reader for key, (_, kind, reader) in self._idle.items()
+                     if kind == "video" and key not in inUse), None)
+
+    def _evict(self, reader: Reader) -> None:
+        entry, kind, _ = self._idle.pop(id(reader))
+        self._forget(entry, kind, reader)
+        self.evicted += 1
+
+    def _forget(self, entry: _Entry, kind: str, reader: Reader) -> None:
+        if reader in entry.readers[kind]:
+            entry.readers[kind].remove(reader)
+            if kind == "video":
+                self._open -= 1
+
+    def _openReader(self, entry: _Entry, kind: str, t) -> Reader:
+        template = entry.templates[kind]
+        if kind == "video":
+            if template is None:
+                reader = entry.templates[kind] = FFMPEG_VideoReader(entry.path, decode_file=False)
+                return reader
+            reader = copy.copy(template)
+            reader.proc = None   # so that initialize does not close the template's process
+            reader.initialize(t)
+            return reader
+
+        if template is None:
+            reader = entry.templates[kind] = FFMPEG_AudioReader(
+                entry.path, self.AUDIO_BUFFER, fps=self.AUDIO_FPS, nbytes=self.AUDIO_NBYTES, nchannels=self.AUDIO_CHANNELS,
+            )
+            return reader
+        reader = copy.copy(template)
+        reader.proc, reader.buffer = None, None
+        # Start where buffer_around will want its buffer to begin, so it reads without seeking
+        first = self._firstSample(reader, t)
+        start = max(0, first - reader.buffersize // 2)
+        reader.initialize(start / reader.fps)
+        reader.buffer_around(first)
+        return reader
+
+    def _videoDistance(self, reader: FFMPEG_VideoReader, t: float) -> int | None:
+        """Frames ``reader`` has to read through to reach ``t``, None if it would have to seek."""
+        d = reader.get_frame_number(t) + 1 - reader.pos
+        return d if 0 <= d <= self.MAX_SKIP_FRAMES else None
+
+    def _audioDistance(self, reader: FFMPEG_AudioReader, t) -> int | None:
+        """Samples from the start of the buffer of ``reader`` to ``t``, None unless it is buffered or just ahead."""
+        first = self._firstSample(reader, t)
+        if reader.buffer_startframe <= first < reader.pos + reader.buffersize // 2:
+            return first - reader.buffer_startframe
+        return None
+
+    @staticmethod
+    def _firstSample(reader: FFMPEG_AudioReader, t) -> int:
+        return int(round(reader.fps * float(np.min(t)))) if np.size(t) else 0
+
+
+_pool: DecoderPool | None = None
+_poolLock = threading.Lock()
+
+
+def getDecoderPool() -> DecoderPool:
+    """The pool shared by the clips of this process."""
+    global _pool
+    with _poolLock:
+        if _pool is None:
+            _pool = DecoderPool()
+        return _pool
+
+
+def benchmark(paths: list[str], clipsPerFile: int = 10, fps: int = 24, maxReaders: int = 8) -> dict[str, float]:
+    """Open ``clipsPerFile`` clips of each file with VideoFileClip and with a DecoderPool, and read them.
+
+    Clip ``i`` of a file shows its second ``i``, as consecutive cuts of one
+    file do. The clips are read one after the other ("sequential", a timeline
+    playing its cuts) and then all at once ("interleaved", as many layers
+    from one file). Reports milliseconds per clip opened and per frame read,
+    and the ffmpeg processes left alive.
+
+    With more clips than ``maxReaders``, interleaved reads are the case where
+    an eviction on every read would reopen a reader for each frame:
+    ``pool.interleavedOpened``, the readers opened during them, must stay
+    at most one per clip.
+    """
+    results = {}
+    for name in ("videoFileClip", "pool"):
+        pool = DecoderPool(maxReaders)
+        start = time.perf_counter()
+        if name == "pool":
+            clips = [pool.videoClip(path) for path in paths for _ in range(clipsPerFile)]
+        else:
+            clips = [VideoFileClip(path) for path in paths for _ in range(clipsPerFile)]
+        results[f"{name}.openMs"] = (time.perf_counter() - start) * 1000 / len(clips)
+
+        orders = {
+            "sequential": [(i, frame) for i in range(len(clips)) for frame in range(fps)],
+            "interleaved": [(i, frame) for frame in range(fps) for i in range(len(clips))],
+        }
+        for order, reads in orders.items():
+            opened = pool.opened
+            start = time.perf_counter()
+            for i, frame in reads:
+                t = (i % clipsPerFile) + frame / fps
+                clips[i].get_frame(min(t, clips[i].duration - 1 / fps))
+            results[f"{name}.{order}FrameMs"] = (time.perf_counter() - start) * 1000 / len(reads)
+            if name == "pool":
+                results[f"{name}.{order}Opened"] = pool.opened - opened
+
+        if name == "pool":
+            results[f"{name}.subprocesses"] = pool.stats()["subprocesses"]
+        else:
+            readers = [clip.reader for clip in clips] + [clip.audio.reader for clip in clips if clip.audio]
+            results[f"{name}.subprocesses"] = sum(1 for reader in readers if reader.proc and reader.proc.poll() is None)
+        for clip in clips:
+            clip.close()
+        pool.close()
+    return results
+
+
+if __name__ == "__main__":
+    # python -m controller.DecoderPool video1.mp4 [video2.mp4 ...]
+    clipsPerFile = 10
+    results = benchmark(sys.argv[1:], clipsPerFile)
+    for name, value in results.items():
+        print(f"{name}: {value:.2f}")
+    if results["pool.interleavedOpened"] > clipsPerFile * len(sys.argv[1:]):
+        sys.exit("More readers opened than clips read: the pool evicts readers still in use")
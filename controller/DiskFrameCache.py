@@ -0,0 +1,192 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+
+class DiskFrameCache:
+    """Persistent, content-addressed cache of rendered preview frames.
+
+    Frames are appended to fixed-size chunk files that are memory-mapped, so
+    reading a frame back is a copy out of the page cache rather than a decode.
+    Keys are strings describing what the frame is made of (see
+    ``VideoPreviewController.diskKeyFor``), never where it sits on the
+    timeline, so a cached frame stays valid across edits and restarts.
+
+    The cache holds at most ``maxBytes`` on disk. Eviction works on whole
+    chunks: when a new chunk is needed and the cap is reached, the least
+    recently used chunk is deleted with all its frames. The index mapping keys
+    to chunk offsets is saved as JSON by ``flush``.
+    """
+
+    INDEX_NAME = "index.json"
+    FLUSH_EVERY = 64   # puts between two index saves
+
+    directory: str
+    maxBytes: int
+    chunkBytes: int
+    hits: int
+    misses: int
+
+    def __init__(self, directory: str, maxBytes: int = 2 * 1024 ** 3, chunkBytes: int = 64 * 1024 ** 2) -> None:
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.chunkBytes = chunkBytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._frames: dict[str, tuple[int, int, tuple[int, ...]]] = {}   # key -> chunk, offset, shape
+        self._chunks: dict[int, dict] = {}    # chunk -> {"used": bytes written, "lastUsed": timestamp}
+        self._maps: dict[int, np.memmap] = {}
+        self._current = None
+        self._dirtyPuts = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._frames
+
+    def get(self, key: str) -> np.ndarray | None:
+        """Return a copy of the cached frame, or None on a miss."""
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            chunk, offset, shape = entry
+            data = self._map(chunk)
+            nbytes = int(np.prod(shape))
+            self._chunks[chunk]["lastUsed"] = time.time()
+            self.hits += 1
+            return np.array(data[offset:offset + nbytes]).reshape(shape)
+
+    def put(self, key: str, frame: np.ndarray) -> None:
+        """Append a uint8 frame to the current chunk, starting a new chunk when it is full."""
+        if frame.dtype != np.uint8 or frame.nbytes > self.chunkBytes:
+            return
+
+        with self._lock:
+            if key in self._frames:
+                return
+            if self._current is None or self._chunks[self._current]["used"] + frame.nbytes > self.chunkBytes:
+                self._newChunk()
+
+            chunk = self._current
+            offset = self._chunks[chunk]["used"]
+            self._map(chunk)[offset:offset + frame.nbytes] = np.ascontiguousarray(frame).reshape(-1)
+            self._chunks[chunk]["used"] += frame.nbytes
+            self._chunks[chunk]["lastUsed"] = time.time()
+            self._frames[key] = (chunk, offset, frame.shape)
+
+            self._dirtyPuts += 1
+            if self._dirtyPuts >= self.FLUSH_EVERY:
+                self._flush()
+
+    def flush(self) -> None:
+        """Write pending frames and the index to disk."""
+        with self._lock:
+            self._flush()
+
+    def clear(self) -> None:
+        with self._lock:
+            for chunk in list(self._chunks):
+                self._dropChunk(chunk)
+            self._current = None
+            self._flush()
+
+    def totalBytes(self) -> int:
+        return len(self._chunks) * self.chunkBytes
+
+    def hitRate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._maps.clear()
+
+    def _chunkPath(self, chunk: int) -> str:
+        return os.path.join(self.directory, f"{chunk:08d}.bin")
+
+    def _map(self, chunk: int) -> np.memmap:
+        data = self._maps.get(chunk)
+        if data is None:
+            data = np.memmap(self._chunkPath(chunk), dtype=np.uint8, mode="r+", shape=(self.chunkBytes,))
+            self._maps[chunk] = data
+        return data
+
+    def _newChunk(self) -> None:
+        maxChunks = max(1, self.maxBytes // self.chunkBytes)
+        while len(self._chunks) >= maxChunks:
+            self._dropChunk(min(self._chunks, key=lambda c: self._chunks[c]["lastUsed"]))
+
+        chunk = max(self._chunks, default=-1) + 1
+        # Created at full size; the file is sparse until frames are written
+        self._maps[chunk] = np.memmap(self._chunkPath(chunk), dtype=np.uint8, mode="w+", shape=(self.chunkBytes,))
+        self._chunks[chunk] = {"used": 0, "lastUsed": time.time()}
+        self._current = chunk
+
+    def _dropChunk(self, chunk: int) -> None:
+        self._maps.pop(chunk, None)
+        self._chunks.pop(chunk, None)
+        self._frames = {key: entry for key, entry in self._frames.items() if entry[0] != chunk}
+        if self._current == chunk:
+            self._current = None
+        try:
+            os.remove(self._chunkPath(chunk))
+        except FileNotFoundError:
+            pass
+
+    def _flush(self) -> None:
+        # Frames must reach the chunk files before the index refers to them
+        for data in self._maps.values():
+            data.flush()
+        index = {
+            "chunkBytes": self.chunkBytes,
+            "chunks": {str(chunk): info for chunk, info in self._chunks.items()},
+            "frames": {key: [chunk, offset, list(shape)] for key, (chunk, offset, shape) in self._frames.items()},
+        }
+        path = os.path.join(self.directory, self.INDEX_NAME)
+        with open(path + ".part", "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(path + ".part", path)
+        self._dirtyPuts = 0
+
+    def _load(self) -> None:
+        path = os.path.join(self.directory, self.INDEX_NAME)
+        index = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = {}
+
+        if index.get("chunkBytes") == self.chunkBytes:
+            for chunk, info in index["chunks"].items():
+                chunkPath = self._chunkPath(int(chunk))
+                if os.path.isfile(chunkPath) and os.path.getsize(chunkPath) == self.chunkBytes:
+                    self._chunks[int(chunk)] = info
+            self._frames = {
+                key: (chunk, offset, tuple(shape))
+                for key, (chunk, offset, shape) in index["frames"].items() if chunk in self._chunks
+            }
+
+        # Remove chunk files the index does not know about (e.g. after a crash)
+        for name in os.listdir(self.directory):
+            if name.endswith(".bin") and int(name[:-4]) not in self._chunks:
+                os.remove(os.path.join(self.directory, name))
+
+        # Honour a cap that was lowered since the last run
+        maxChunks = max(1, self.maxBytes // self.chunkBytes)
+        while len(self._chunks) > maxChunks:
+            self._dropChunk(min(self._chunks, key=lambda c: self._chunks[c]["lastUsed"]))
+
+        # Keep filling the last chunk rather than leaving it half empty
+        self._current = max(self._chunks, default=None)
@@ -0,0 +1,472 @@
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+from moviepy.video.fx.Painting import Painting
+
+from controller.FrameCache import FrameCache
+from model.Effects import VideoEffect, VideoEffectEnum, effectChainHash
+
+LUT_SIZE = 33                # points per axis of the 3D LUTs point-wise effects are folded into
+LUT_CACHE_SIZE = 64          # folded LUTs kept in memory
+
+# Effects that map each pixel's colour on its own, whatever its neighbours
+POINT_EFFECTS = {
+    VideoEffectEnum.BLACK_AND_WHITE,
+    VideoEffectEnum.CONTRAST,
+    VideoEffectEnum.BRIGHTNESS,
+    VideoEffectEnum.LUT,
+}
+
+
+class CubeLut:
+    """Colour lookup table read from an Adobe/Resolve ``.cube`` file.
+
+    ``table`` is either a 3D lattice indexed ``[r, g, b]`` or, for 1D LUTs,
+    one curve per channel of shape ``(size, 3)``; values are in the output
+    range 0-1, and input colours are mapped from ``[domainMin, domainMax]``
+    onto the table.
+    """
+
+    size: int
+    table: np.ndarray
+    domainMin: np.ndarray
+    domainMax: np.ndarray
+
+    def __init__(self, table: np.ndarray, domainMin=(0.0, 0.0, 0.0), domainMax=(1.0, 1.0, 1.0)) -> None:
+        self.size = table.shape[0]
+        self.table = table.astype(np.float32)
+        self.domainMin = np.asarray(domainMin, dtype=np.float64)
+        self.domainMax = np.asarray(domainMax, dtype=np.float64)
+
+    @classmethod
+    def load(cls, path: str) -> "CubeLut":
+        """Parse a ``.cube`` file (LUT_3D_SIZE or LUT_1D_SIZE).
+
+        Raises:
+            ValueError: if the file is not a valid cube LUT
+        """
+        size3d = size1d = None
+        domainMin, domainMax = (0.0, 0.0, 0.0), (1.0, 1.0, 1.0)
+        rows = []
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if not line:
+                    continue
+                keyword, _, rest = line.partition(" ")
+                if keyword == "LUT_3D_SIZE":
+                    size3d = int(rest)
+                elif keyword == "LUT_1D_SIZE":
+                    size1d = int(rest)
+                elif keyword == "DOMAIN_MIN":
+                    domainMin = tuple(float(v) for v in rest.split())
+                elif keyword == "DOMAIN_MAX":
+                    domainMax = tuple(float(v) for v in rest.split())
+                elif keyword in ("LUT_3D_INPUT_RANGE", "LUT_1D_INPUT_RANGE"):
+                    low, high = (float(v) for v in rest.split())
+                    domainMin, domainMax = (low,) * 3, (high,) * 3
+                elif keyword[0].isdigit() or keyword[0] in "-.":
+                    rows.append(line.split())
+                # TITLE and unknown keywords are ignored
+
+        try:
+            data = np.array(rows, dtype=np.float64)
+        except ValueError:
+            raise ValueError(f"Malformed LUT data in {path}")
+
+        if size3d is not None:
+            if data.shape != (size3d ** 3, 3):
+                raise ValueError(f"Expected {size3d ** 3} RGB rows in {path}, got {len(data)}")
+            # Red varies fastest in the file, so the raw reshape is indexed [b, g, r]
+            return cls(data.reshape(size3d, size3d, size3d, 3).transpose(2, 1, 0, 3), domainMin, domainMax)
+
+        if size1d is not None:
+            if data.shape != (size1d, 3):
+                raise ValueError(f"Expected {size1d} RGB rows in {path}, got {len(data)}")
+            return cls(data, domainMin, domainMax)
+
+        raise ValueError(f"No LUT_3D_SIZE or LUT_1D_SIZE in {path}")
+
+    def __call__(self, rgb: np.ndarray) -> np.ndarray:
+        """Map float RGB values in 0-255, of shape ``(..., 3)``."""
+        position = (rgb / 255 - self.domainMin) / (self.domainMax - self.domainMin) * (self.size - 1)
+        position = np.clip(position, 0, self.size - 1)
+        if self.table.ndim == 2:
+            # 1D LUT: each output channel only depends on the same input channel
+            levels = np.arange(self.size)
+            result = np.stack([np.interp(position[..., c], levels, self.table[:, c]) for c in range(3)], axis=-1)
+            return np.clip(result * 255, 0, 255)
+
+        lower = np.minimum(position.astype(np.intp), self.size - 2)
+        fraction = (position - lower).astype(np.float32)
+        n = self.size
+        result = trilinear(
+            self.table.reshape(-1, 3), n,
+            lower[..., 0] * (n * n) + lower[..., 1] * n + lower[..., 2],
+            fraction[..., 0:1], fraction[..., 1:2], fraction[..., 2:3],
+        )
+        return np.clip(result * 255, 0, 255)
+
+
+def trilinear(flat: np.ndarray, n: int, base: np.ndarray,
+              fr: np.ndarray, fg: np.ndarray, fb: np.ndarray) -> np.ndarray:
+    """Trilinear lookup in a ``n``×``n``×``n`` lattice of RGB values flattened to ``(n³, 3)``.
+
+    Args:
+        flat (np.ndarray): lattice values, indexed ``r * n² + g * n + b``
+        n (int): points per axis
+        base (np.ndarray): flat index of the lower corner of each pixel's cell
+        fr, fg, fb (np.ndarray): position of the pixel in its cell along each axis, 0-1,
+            with a trailing axis of size 1 to broadcast over the channels
+    """
+    def corner(offset):
+        # np.take is several times faster than fancy indexing for row gathers
+        return np.take(flat, base + offset, axis=0)
+
+    def lerp(a, b, t):
+        b -= a
+        b *= t
+        b += a
+        return b
+
+    c00 = lerp(corner(0), corner(1), fb)
+    c01 = lerp(corner(n), corner(n + 1), fb)
+    c10 = lerp(corner(n * n), corner(n * n + 1), fb)
+    c11 = lerp(corner(n * n + n), corner(n * n + n + 1), fb)
+    return lerp(lerp(c00, c01, fg), lerp(c10, c11, fg), fr)
+
+
+def pointFunction(effect: VideoEffect) -> Callable[[np.ndarray], np.ndarray]:
+    """Point-wise effect as a function of float RGB values in 0-255, of shape ``(..., 3)``.
+
+    The formulas are MoviePy's (BlackAndWhite, LumContrast, MultiplyColor).
+    """
+    params = effect.params
+    match effect.effect:
+        case VideoEffectEnum.BLACK_AND_WHITE:
+            return lambda rgb: np.repeat(rgb.mean(axis=-1, keepdims=True), 3, axis=-1)
+        case VideoEffectEnum.CONTRAST:
+            lum, contrast = params.get("lum", 0), params.get("contrast", 1)
+            return lambda rgb: np.clip(rgb + lum + contrast * (rgb - 127), 0, 255)
+        case VideoEffectEnum.BRIGHTNESS:
+            factor = params.get("brightness", 1.0)
+            return lambda rgb: np.clip(factor * rgb, 0, 255)
+        case VideoEffectEnum.LUT:
+            return CubeLut.load(params["path"])
+    raise ValueError(f"{effect.effect.name} is not a point-wise effect")
+
+
+def channelTable(effect: VideoEffect) -> np.ndarray:
+    """256-entry uint8 table of an effect that treats each channel on its own (contrast, brightness)."""
+    values = np.repeat(np.arange(256, dtype=np.float64)[:, None], 3, axis=1)
+    return pointFunction(effect)(values)[:, 0].astype(np.uint8)
+
+
+_latticeCache: OrderedDict[str, np.ndarray] = OrderedDict()
+_latticeLock = threading.Lock()
+
+
+def foldedLattice(effects: list[VideoEffect], size: int = LUT_SIZE) -> np.ndarray:
+    """Fold a run of point-wise effects into one ``size``³ RGB lattice (float32, values 0-255).
+
+    The effects are evaluated once on the lattice points instead of once per
+    pixel. Lattices are cached by effect chain hash, which covers the
+    modification time of the ``.cube`` files so an edited file is read again.
+    """
+    key = f"{effectChainHash(effects)}:{size}"
+    with _latticeLock:
+        lattice = _latticeCache.get(key)
+        if lattice is not None:
+            _latticeCache.move_to_end(key)
+            return lattice
+
+    axis = np.linspace(0, 255, size)
+    rgb = np.stack(np.meshgrid(axis, axis, axis, indexing="ij"), axis=-1)
+    for effect in effects:
+        rgb = pointFunction(effect)(rgb)
+    lattice = rgb.astype(np.float32)
+
+    with _latticeLock:
+        _latticeCache[key] = lattice
+        while len(_latticeCache) > LUT_CACHE_SIZE:
+            _latticeCache.popitem(last=False)
+    return lattice
+
+
+class _PointStage:
+    """Fused run of point-wise effects: ``tableBefore`` on each channel, optional grey mix, ``tableAfter``.
+
+    Chains of per-channel effects collapse into one table (uint8 in, uint8
+    out, so composing tables is exact), and everything after a grey mix is
+    applied to the single grey plane instead of three channels.
+    """
+
+    def __init__(self) -> None:
+        self.tableBefore = None
+        self.gray = False
+        self.tableAfter = None
+        self._shape = None
+
+    def addTable(self, table: np.ndarray) -> None:
+        if self.gray:
+            self.tableAfter = table if self.tableAfter is None else table[self.tableAfter]
+        else:
+            self.tableBefore = table if self.tableBefore is None else table[self.tableBefore]
+
+    def addGray(self) -> None:
+        # Grey of a grey image is itself, so only the first mix matters
+        self.gray = True
+
+    def _allocate(self, shape: tuple[int, ...]) -> None:
+        h, w = shape[:2]
+        self._rgb = np.empty((h, w, 3), dtype=np.uint8)
+        self._sum = np.empty((h, w), dtype=np.uint16)
+        self._plane = np.empty((h, w), dtype=np.uint8)
+        self._shape = shape
+        # Division by 3 and the tables after the grey mix, as one lookup on r + g + b
+        gray = (np.arange(766) // 3).astype(np.uint8)
+        self._grayTable = gray if self.tableAfter is None else self.tableAfter[gray]
+
+    def apply(self, frame: np.ndarray, out: np.ndarray) -> np.ndarray:
+        if frame.shape != self._shape:
+            self._allocate(frame.shape)
+
+        if not self.gray:
+            np.take(self.tableBefore, frame, out=out)
+            return out
+
+        if self.tableBefore is not None:
+            frame = np.take(self.tableBefore, frame, out=self._rgb)
+        # (r + g + b) // 3 in 16-bit integers rather than a float weighted sum
+        np.add(frame[:, :, 0], frame[:, :, 1], out=self._sum, dtype=np.uint16)
+        self._sum += frame[:, :, 2]
+        np.take(self._grayTable, self._sum, out=self._plane)
+        out[...] = self._plane[:, :, None]
+        return out
+
+
+class _LutStage:
+    """Run of point-wise effects folded into a 3D LUT: one trilinear lookup per pixel, however long the run.
+
+    The interpolation along blue is done once for the 256 input levels when
+    the stage is built, which leaves a bilinear lookup (4 gathers instead of
+    8) per pixel in a ``n``×``n``×256 table.
+    """
+
+    def __init__(self, lattice: np.ndarray) -> None:
+        n = lattice.shape[0]
+        self.size = n
+        # Lattice cell and position in the cell of every 8-bit input level
+        position = np.arange(256) * (n - 1) / 255
+        lower = np.minimum(position.astype(np.intp), n - 2)
+        fraction = (position - lower).astype(np.float32)
+
+        t = fraction[:, None]
+        dense = lattice[:, :, lower] * (1 - t) + lattice[:, :, lower + 1] * t
+        self.table = np.ascontiguousarray(dense, dtype=np.float32).reshape(-1, 3)
+        self._fraction = fraction
+        self._rBase = lower * (n * 256)
+        self._gBase = lower * 256
+
+    def apply(self, frame: np.ndarray, out: np.ndarray) -> np.ndarray:
+        r, g, b = frame[:, :, 0], frame[:, :, 1], frame[:, :, 2]
+        base = np.take(self._rBase, r)
+        base += np.take(self._gBase, g)
+        base += b
+
+        def corner(offset):
+            # np.take is several times faster than fancy indexing for row gathers
+            return np.take(self.table, base + offset, axis=0)
+
+        def lerp(a, b, t):
+            b -= a
+            b *= t
+            b += a
+            return b
+
+        fg = np.take(self._fraction, g)[..., None]
+        rowStep = self.size * 256
+        low = lerp(corner(0), corner(256), fg)
+        high = lerp(corner(rowStep), corner(rowStep + 256), fg)
+        result = lerp(low, high, np.take(self._fraction, r)[..., None])
+        result += 0.5
+        np.copyto(out, result, casting="unsafe")
+        return out
+
+
+class _PaintingStage:
+    """Painting needs edge detection over neighbouring pixels, so it stays a stage of its own."""
+
+    def __init__(self, saturation: float) -> None:
+        self.painting = Painting(saturation)
+
+    def apply(self, frame: np.ndarray, out: np.ndarray) -> np.ndarray:
+        out[...] = self.painting.to_painting(frame, self.painting.saturation, self.painting.black)
+        return out
+
+
+class _RotateStage:
+    """Rotation by an arbitrary angle, as MoviePy's Rotate with its defaults (expand, bicubic)."""
+
+    def __init__(self, angle: float) -> None:
+        self.angle = angle
+
+    def apply(self, frame: np.ndarray, out: np.ndarray | None) -> np.ndarray:
+        # The frame size changes, so the result cannot go into a buffer of the input size
+        return np.array(Image.fromarray(np.ascontiguousarray(frame)).rotate(self.angle, expand=True, resample=Image.BICUBIC))
+
+
+class EffectChain:
+    """A clip's effect chain compiled into as few full-frame passes as possible.
+
+    Consecutive point-wise effects are fused into a single pass. Runs made
+    of black & white, contrast and brightness only are per-channel tables
+    and a grey mix, applied in uint8/uint16; as soon as a run contains a
+    ``.cube`` LUT, the whole run is folded into one 3D LUT (see
+    ``foldedLattice``). Intermediate buffers are allocated once per frame
+    size, and rotations by multiples of 90° are applied at the end as a view,
+    without copying. Speed changes do not touch pixels and are exposed as
+    ``speed`` for the caller to fold into its time mapping.
+
+    Results match MoviePy's effects up to rounding: the integer grey mix can
+    differ by one level from MoviePy's float one, and a 3D LUT interpolates
+    between its lattice points. A chain keeps scratch buffers, so it must not
+    be shared between threads.
+    """
+
+    speed: float
+    quarterTurns: int
+
+    def __init__(self, effects: list[VideoEffect]) -> None:
+        self.speed = 1.0
+        self.quarterTurns = 0
+        self.stages = []
+        self._scratch: dict[int, np.ndarray] = {}
+        run = []
+        for effect in effects:
+            params = effect.params
+            if effect.effect in POINT_EFFECTS:
+                run.append(effect)
+                continue
+            match effect.effect:
+                case VideoEffectEnum.SPEED:
+                    self.speed *= params.get("speed", 1.0)
+                case VideoEffectEnum.SATURATION:
+                    self._addPointRun(run)
+                    self.stages.append(_PaintingStage(params.get("saturation", 1)))
+                case VideoEffectEnum.ROTATION:
+                    angle = params.get("rotation", 0) % 360
+                    if angle % 90 == 0:
+                        # The other effects commute with quarter turns, which can then be a final view
+                        self.quarterTurns = (self.quarterTurns + int(angle // 90)) % 4
+                    else:
+                        self._addPointRun(run)
+                        self.stages.append(_RotateStage(angle))
+        self._addPointRun(run)
+
+    def _addPointRun(self, run: list[VideoEffect]) -> None:
+        """Turn consecutive point-wise effects into one stage, then empty ``run``."""
+        effects = list(run)
+        run.clear()
+        if not effects:
+            return
+
+        if any(e.effect == VideoEffectEnum.LUT for e in effects):
+            try:
+                self.stages.append(_LutStage(foldedLattice(effects)))
+                return
+            except (OSError, ValueError) as e:
+                # A missing or broken .cube file must not stop the preview
+                print(f"[EffectChain] LUT skipped: {e}")
+                effects = [e for e in effects if e.effect != VideoEffectEnum.LUT]
+                if not effects:
+                    return
+
+        stage = _PointStage()
+        for effect in effects:
+            if effect.effect == VideoEffectEnum.BLACK_AND_WHITE:
+                stage.addGray()
+            else:
+                stage.addTable(channelTable(effect))
+        self.stages.append(stage)
+
+    def isIdentity(self) -> bool:
+        return not self.stages and not self.quarterTurns
+
+    def apply(self, frame: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        """Run the chain on a uint8 RGB frame.
+
+        The last pass writes into ``out`` (allocated if not given); with no
+        pixel stage, the input itself is returned, rotated as a view.
+        """
+        last = len(self.stages) - 1
+        for i, stage in enumerate(self.stages):
+            if i < last:
+                target = self._scratchFor(i, frame.shape)
+            elif out is not None and out.shape == frame.shape:
+                target = out
+            else:
+                target = np.empty(frame.shape, dtype=np.uint8)
+            frame = stage.apply(frame, target)
+
+        if self.quarterTurns:
+            # Same orientation as MoviePy's Rotate (counter-clockwise)
+            return np.rot90(frame, self.quarterTurns)
+        return frame
+
+    def _scratchFor(self, stage: int, shape: tuple[int, ...]) -> np.ndarray:
+        buffer = self._scratch.get(stage)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            self._scratch[stage] = buffer
+        return buffer
+
+
+class MemoizedEffectChain:
+    """Effect chain whose output, and that of each of its prefixes, is memoised per source frame.
+
+    Results are stored in a shared FrameCache under ``(sourceFrame, baseKey,
+    hash of the effects applied)``. Rendering a frame starts from the longest
+    prefix of the chain found in the cache, so after an effect is appended
+    only that new effect runs, on top of what the previous chain produced;
+    a full hit does not even decode the frame. Speed effects only remap time
+    and are left out of the hashes.
+    """
+
+    baseKey: str
+    effects: list[VideoEffect]
+
+    def __init__(self, effects: list[VideoEffect], cache: FrameCache, baseKey: str) -> None:
+        self.effects = [e for e in effects if e.effect != VideoEffectEnum.SPEED]
+        self.cache = cache
+        self.baseKey = baseKey
+        # prefixKeys[k] identifies the output of the first k effects
+        self.prefixKeys = [effectChainHash(self.effects[:k]) for k in range(len(self.effects) + 1)]
+        self._tails: dict[int, EffectChain] = {}
+
+    def render(self, sourceFrame: int, decode: Callable[[], np.ndarray]) -> np.ndarray:
+        """Frame ``sourceFrame`` with the chain applied; ``decode`` is only called when no prefix is cached."""
+        done = len(self.effects)
+        while done > 0:
+            key = (sourceFrame, self.baseKey, self.prefixKeys[done])
+            if key in self.cache:
+                frame = self.cache.get(key)
+                break
+            done -= 1
+        else:
+            frame = decode()
+
+        if done < len(self.effects):
+            frame = self._tail(done).apply(frame)
+            self.cache.put((sourceFrame, self.baseKey, self.prefixKeys[-1]), frame)
+        return frame
+
+    def _tail(self, start: int) -> EffectChain:
+        chain = self._tails.get(start)
+        if chain is None:
+            chain = EffectChain(self.effects[start:])
+            self._tails[start] = chain
+        return chain
@@ -0,0 +1,814 @@
+import multiprocessing
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable
+
+import numpy as np
+from PySide6.QtCore import QObject, Signal
+from moviepy.config import FFMPEG_BINARY
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+
+from controller.AudioPlaybackController import renderAudioBlock
+from controller.KeyframeController import KeyframeController
+from controller.RenderGraph import RenderGraphCompiler, benchmarkTimelines, outputSize, renderTimelines
+from controller.SegmentPlanner import SegmentPlan, planSegments
+from controller.utils.Exceptions import ExportCancelledException
+from model.Effects import AudioEffect, AudioEffectEnum, VideoEffect, VideoEffectEnum
+from model.Source import Source
+from model.Timeline import Timeline, TimelineType
+from model.TimelineClip import TimelineAudioClip, TimelineVideoClip
+
+# Progress callback of the exporters: frames done, total frames, throughput of each stage
+ProgressCallback = Callable[[int, int, dict[str, float]], None]
+
+
+def describeTimelines(timelines: list[Timeline]) -> list[dict]:
+    """Plain, picklable description of the timelines, from which worker processes rebuild them.
+
+    MoviePy clips hold open readers and cannot cross process boundaries, so
+    only what is needed to open them again is kept: paths, positions and effects.
+    """
+    description = []
+    for timeline in timelines:
+        clips = []
+        for clip in timeline.clips:
+            clips.append({
+                "kind": "audio" if isinstance(clip, TimelineAudioClip) else "video",
+                "title": clip.title,
+                "path": clip.source.filepath,
+                "name": clip.source.name,
+                "contentHash": clip.source.contentHash,
+                "pcmPath": clip.source.pcmPath,
+                "start": clip.start_frame,
+                "duration": clip.duration_frames,
+                "effects": [(effect.effect.name, effect.params) for effect in clip.effects],
+            })
+        description.append({"name": timeline.name, "type": timeline.typee.name, "clips": clips})
+    return description
+
+
+def buildTimelines(description: list[dict], withAudio: bool = True) -> list[Timeline]:
+    """Rebuild the timelines described by ``describeTimelines``, opening their sources again."""
+    timelines = []
+    for track in description:
+        timeline = Timeline(track["name"], typee=TimelineType[track["type"]])
+        for item in track["clips"]:
+            if item["kind"] == "audio" and not withAudio:
+                continue
+            source = Source()
+            source.filepath, source.name, source.contentHash = item["path"], item["name"], item["contentHash"]
+            source.pcmPath = item["pcmPath"]
+            if item["kind"] == "audio":
+                clip = TimelineAudioClip(item["title"], source, item["start"], item["duration"])
+                clip.effects = [AudioEffect(AudioEffectEnum[name], params) for name, params in item["effects"]]
+            else:
+                clip = TimelineVideoClip(item["title"], source, item["start"], item["duration"])
+                clip.effects = [VideoEffect(VideoEffectEnum[name], params) for name, params in item["effects"]]
+            timeline.add_clip(clip)
+        timelines.append(timeline)
+    return timelines
+
+
+def planChunks(plan: SegmentPlan, count: int, minFrames: int) -> list[tuple[int, int]]:
+    """Split the frames ``[0, plan.end)`` into about ``count`` chunks of similar length.
+
+    Cuts are moved to a nearby segment boundary when there is one, so that a
+    chunk does not start right before a change of layers; long segments are
+    cut evenly. Chunks are at least ``minFrames`` long (except a lone one).
+    """
+    end = plan.end
+    if end <= 0:
+        return []
+    count = max(1, min(count, end // max(minFrames, 1)))
+    length = end / count
+    boundaries = sorted({segment.start for segment in plan} | {segment.end for segment in plan})
+
+    cuts = [0]
+    for i in range(1, count):
+        ideal = int(round(i * length))
+        nearest = min(boundaries, key=lambda b: abs(b - ideal))
+        cut = nearest if abs(nearest - ideal) <= length / 4 else ideal
+        if cut - cuts[-1] >= minFrames and end - cut >= minFrames:
+            cuts.append(cut)
+    cuts.append(end)
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def closeTimelines(timelines: list[Timeline]) -> None:
+    """Close the readers opened by ``buildTimelines``."""
+    for timeline in timelines:
+        for clip in timeline.clips:
+            clip.close()
+
+
+def renderChunk(description: list[dict], fps: int, start: int, end: int, path: str,
+                codec: str = "libx264", preset: str = "medium", threads: int | None = None,
+                bitstreamFilter: str | None = None) -> int:
+    """Render and encode the timeline frames ``[start, end)`` to ``path``, without audio.
+
+    Runs in a worker process: the timelines are rebuilt from their
+    description, so the worker has its own decoders, effect kernels and
+    encoder. ``bitstreamFilter`` is applied to the encoded packets.
+    Returns the number of frames written.
+    """
+    timelines = buildTimelines(description, withAudio=False)
+    # Every frame is rendered once, so memoising effect results would only use memory
+    clip, _ = renderTimelines(timelines, fps, compiler=RenderGraphCompiler(effectCacheBytes=0))
+    writer = FFMPEG_VideoWriter(
+        path, clip.size, fps, codec=codec, preset=preset, threads=threads,
+        ffmpeg_params=["-bsf:v", bitstreamFilter] if bitstreamFilter else None,
+    )
+    try:
+        for frame in range(start, end):
+            writer.write_frame(clip.get_frame(frame / fps))
+    finally:
+        writer.close()
+        closeTimelines(timelines)
+    return end - start
+
+
+class ParallelExporter:
+    """Exports the timelines by rendering chunks of frames in parallel processes.
+
+    Generating frames (decoding, effects, compositing) is Python code and
+    runs on one core per process. The timeline is cut into chunks
+    (see ``planChunks``), and each worker process runs its own
+    decode→effects→encode pipeline on a chunk. The chunks all start with a
+    keyframe and use the same encoder settings, so ffmpeg's concat demuxer
+    joins them without re-encoding (``-c copy``). The audio is mixed once,
+    in the calling process, and muxed in during the concatenation.
+    """
+
+    workers: int
+    codec: str
+    preset: str
+    chunksPerWorker: int
+    minChunkSeconds: float
+
+    def __init__(self, workers: int | None = None, codec: str = "libx264", preset: str = "medium") -> None:
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.codec = codec
+        self.preset = preset
+        # More chunks than workers, so a worker that gets an easy chunk picks up another one
+        self.chunksPerWorker = 2
+        self.minChunkSeconds = 2.0
+
+    def export(self, description: list[dict], fps: int, path: str, progress: ProgressCallback | None = None,
+               cancelled: threading.Event | None = None) -> None:
+        """Export the timelines to ``path``.
+
+        Args:
+            description (list[dict]): tracks to export, from ``describeTimelines``
+            fps (int): timeline framerate
+            path (str): output file
+            progress (ProgressCallback | None): called each time a chunk is finished
+            cancelled (threading.Event | None): set to stop the export; chunks not started yet are
+                dropped, the ones being rendered are left to finish in the background
+
+        Raises:
+            RuntimeError: if the timelines are empty or ffmpeg fails to join the chunks
+            ExportCancelledException: if ``cancelled`` was set
+        """
+        plan = self._plan(description)
+        chunks = planChunks(plan, self.workers * self.chunksPerWorker, int(self.minChunkSeconds * fps))
+        if not chunks:
+            raise RuntimeError("Nothing to export")
+
+        cancelled = cancelled or threading.Event()
+        workDir = tempfile.mkdtemp(prefix="pydeo-export-")
+        try:
+            chunkPaths = [os.path.join(workDir, f"chunk{i:04d}.mp4") for i in range(len(chunks))]
+            self._renderChunks(description, fps, list(zip(chunks, chunkPaths)), plan.end, 0, progress, cancelled)
+            audioPath = self._writeAudio(description, fps, plan.end, workDir)
+            self._concat(chunkPaths, audioPath, path, workDir)
+        finally:
+            shutil.rmtree(workDir, ignore_errors=True)
+
+    def _renderChunks(self, description: list[dict], fps: int, chunks: list[tuple[tuple[int, int], str]],
+                      total: int, done: int, progress: ProgressCallback | None, cancelled: threading.Event,
+                      bitstreamFilter: str | None = None) -> None:
+        """Render ``((start, end), path)`` chunks, in worker processes when there is more than one worker.
+
+        ``done`` frames of ``total`` are already exported, for the progress reports.
+        """
+        startTime = time.perf_counter()
+        rendered = 0
+        # Encoder threads are shared out between the workers rather than each taking every core
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        arguments = [
+            (description, fps, start, end, chunkPath, self.codec, self.preset, threads, bitstreamFilter)
+            for (start, end), chunkPath in chunks
+        ]
+
+        def report(frames):
+            nonlocal rendered
+            rendered += frames
+            if progress:
+                progress(done + rendered, total, {"render": rendered / (time.perf_counter() - startTime)})
+
+        if self.workers == 1:
+            for args in arguments:
+                if cancelled.is_set():
+                    raise ExportCancelledException()
+                report(renderChunk(*args))
+            return
+
+        # Spawned rather than forked: the GUI process runs Qt and decoder threads
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            pending = {pool.submit(renderChunk, *args) for args in arguments}
+            while pending:
+                finished, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                if cancelled.is_set():
+                    raise ExportCancelledException()
+                for future in finished:
+                    report(future.result())
+        finally:
+            pool.shutdown(wait=not cancelled.is_set(), cancel_futures=True)
+
+    @staticmethod
+    def _plan(description: list[dict]) -> SegmentPlan:
+        timelines = buildTimelines(description, withAudio=False)
+        closeTimelines(timelines)
+        return planSegments(timelines)
+
+    def _writeAudio(self, description: list[dict], fps: int, frames: int, workDir: str) -> str | None:
+        # Sources are opened again, so that the preview keeps its own readers
+        timelines = buildTimelines(description)
+        try:
+            _, audio = renderTimelines(timelines, fps)
+            if audio.duration is None:
+                return None
+            audioPath = os.path.join(workDir, "audio.m4a")
+            audio.with_duration(min(audio.duration, frames / fps)).write_audiofile(
+                audioPath, fps=44100, codec="aac", logger=None,
+            )
+            return audioPath
+        finally:
+            closeTimelines(timelines)
+
+    @staticmethod
+    def _concat(chunkPaths: list[str], audioPath: str | None, path: str, workDir: str,
+                inBandHeaders: bool = False) -> None:
+        """Join the chunks into ``path`` without re-encoding, muxing in ``audioPath`` if given.
+
+        With ``inBandHeaders`` the H.264 parameter sets of each chunk are
+        repeated in front of its keyframes, for chunks made by different
+        encoders whose headers differ.
+        """
+        listPath = os.path.join(workDir, "chunks.txt")
+        with open(listPath, "w", encoding="utf-8") as f:
+            for chunkPath in chunkPaths:
+                f.write(f"file '{chunkPath}'\n")
+
+        command = [FFMPEG_BINARY, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", listPath]
+        if audioPath:
+            command += ["-i", audioPath, "-map", "0:v:0", "-map", "1:a:0"]
+        command += ["-c", "copy"]
+        if inBandHeaders:
+            command += ["-bsf:v", "h264_mp4toannexb"]
+        command += ["-movflags", "+faststart", path]
+        result = subprocess.run(command, capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode(errors="replace").strip())
+
+
+class SmartExporter(ParallelExporter):
+    """Exports the timelines re-encoding only what changed, stream-copying the rest.
+
+    Spans where a single video clip without effects is shown, whose source
+    is H.264 at the output size and framerate, with the pixel format,
+    profile, level and pixel aspect ratio the encoder writes, are copied from the source
+    at the bitstream level, from its first to its last keyframe inside the
+    span. The rest (cuts between keyframes, effects, composited layers,
+    gaps) is rendered as in ParallelExporter. When the pieces are joined,
+    the codec parameters of each piece are repeated in-band, so copied and
+    re-encoded pieces can follow each other in one stream.
+
+    Pieces with B-frames start decoding a few frames before they are shown,
+    and a piece that does so more than the one before it would overlap it
+    in decoding order. Every piece is therefore given the same decoding
+    delay, ``reorderFrames``, with a timestamp filter.
+
+    ``export`` returns a report of the frames and spans copied and re-encoded.
+    """
+
+    minCopySeconds: float
+    reorderFrames: int
+
+    def __init__(self, workers: int | None = None, codec: str = "libx264", preset: str = "medium") -> None:
+        super().__init__(workers, codec, preset)
+        # Shorter copies are not worth the extra cuts around them
+        self.minCopySeconds = 1.0
+        # Enough for x264 and most cameras (B-pyramids of up to 3 B-frames)
+        self.reorderFrames = 4
+        self._probes: dict[str, dict] = {}
+        self._parameters: dict[str, dict[str, str]] = {}
+        self._encoderParameters: dict[tuple[tuple[int, int], int], dict[str, str]] = {}
+
+    def export(self, description: list[dict], fps: int, path: str, progress: ProgressCallback | None = None,
+               cancelled: threading.Event | None = None) -> dict[str, int]:
+        """Export the timelines to ``path``; same arguments and errors as ``ParallelExporter.export``.
+
+        Returns:
+            dict[str, int]: ``copiedFrames``, ``encodedFrames``, ``copiedSpans`` and ``encodedSpans``
+        """
+        timelines = buildTimelines(description, withAudio=False)
+        try:
+            plan = planSegments(timelines)
+            spans = self.planSpans(plan, timelines, fps)
+        finally:
+            closeTimelines(timelines)
+        if not spans:
+            raise RuntimeError("Nothing to export")
+
+        copies = [span for span in spans if span[2] is not None]
+        report = {
+            "copiedFrames": sum(end - start for start, end, _ in copies),
+            "encodedFrames": sum(end - start for start, end, copy in spans if copy is None),
+            "copiedSpans": len(copies),
+            "encodedSpans": len(spans) - len(copies),
+        }
+        if not copies:
+            # Nothing to copy: a plain export is simpler and streams with one worker
+            exporter = StreamingExporter(self.codec, self.preset) if self.workers == 1 else \
+                ParallelExporter(self.workers, self.codec, self.preset)
+            exporter.export(description, fps, path, progress, cancelled)
+            return report
+
+        cancelled = cancelled or threading.Event()
+        timestamps = self._timestampFilter(fps)
+        workDir = tempfile.mkdtemp(prefix="pydeo-export-")
+        try:
+            piecePaths = []
+            renders = []
+            done = 0
+            for start, end, copy in self._splitEncodedSpans(spans, fps):
+                piecePath = os.path.join(workDir, f"piece{len(piecePaths):04d}.mp4")
+                piecePaths.append(piecePath)
+                if copy is None:
+                    renders.append(((start, end), piecePath))
+                    continue
+                if cancelled.is_set():
+                    raise ExportCancelledException()
+                sourcePath, sourceStart = copy
+                self._copy(sourcePath, sourceStart, end - start, piecePath, timestamps)
+                done += end - start
+                if progress:
+                    progress(done, plan.end, {})
+
+            self._renderChunks(description, fps, renders, plan.end, done, progress, cancelled, timestamps)
+            audioPath = self._writeAudio(description, fps, plan.end, workDir)
+            self._concat(piecePaths, audioPath, path, workDir, inBandHeaders=True)
+        finally:
+            shutil.rmtree(workDir, ignore_errors=True)
+        return report
+
+    def planSpans(self, plan: SegmentPlan, timelines: list[Timeline], fps: int) -> list[tuple[int, int, tuple[str, float] | None]]:
+        """Cut ``[0, plan.end)`` into spans to copy or to re-encode.
+
+        Returns:
+            list[tuple[int, int, tuple[str, float] | None]]: ``(start, end, copy)`` in timeline
+            frames, ``copy`` being ``(source path, source time of the first frame)`` for spans
+            to copy, None for spans to re-encode; consecutive spans to re-encode are merged
+        """
+        decoders = [clip.videoClip for timeline in timelines for clip in timeline.clips
+                    if isinstance(clip, TimelineVideoClip)]
+        size = outputSize(decoders)
+
+        spans = []
+
+        def add(start, end, copy):
+            if end <= start:
+                return
+            if copy is None and spans and spans[-1][2] is None and spans[-1][1] == start:
+                spans[-1] = (spans[-1][0], end, None)
+            else:
+                spans.append((start, end, copy))
+
+        position = 0
+        for segment in plan:
+            add(position, segment.start, None)   # gap, rendered black
+            copyStart, copyEnd, sourceStart = self._copyableRange(segment, size, fps)
+            add(segment.start, copyStart, None)
+            add(copyStart, copyEnd, (segment.layers[0][1].source.filepath, sourceStart) if copyEnd > copyStart else None)
+            add(copyEnd, segment.end, None)
+            position = segment.end
+        return spans
+
+    def _copyableRange(self, segment, size: tuple[int, int], fps: int) -> tuple[int, int, float]:
+        """Frames ``[start, end)`` of a segment that can be copied from its source, and the source time of ``start``."""
+        nothing = (segment.end, segment.end, 0.0)
+        if self.codec != "libx264" or len(segment.layers) != 1:
+            return nothing
+        clip = segment.layers[0][1]
+        if not isinstance(clip, TimelineVideoClip) or clip.effects:
+            return nothing
+
+        path = clip.source.filepath
+        infos = self._probe(path)
+        if (infos.get("video_codec_name") != "h264" or tuple(infos.get("video_size") or ()) != size
+                or abs((infos.get("video_fps") or 0) - fps) > 1e-3):
+            return nothing
+        # Copied and re-encoded pieces share one stream: they must decode to the same pictures
+        if self._codecParameters(path) != self._encoderCodecParameters(size, fps):
+            return nothing
+
+        # The clip shows its source from the beginning
+        sourceDuration = clip.videoClip.duration
+        first = (segment.start - clip.start_frame) / fps
+        last = min((segment.end - clip.start_frame) / fps, sourceDuration)
+        # Copies must start on a keyframe and stop right before one (or at the end of the source)
+        keyframes = KeyframeController.loadOrScan(path).times + [sourceDuration]
+        starts = [t for t in keyframes[:-1] if first - 1e-6 <= t]
+        ends = [t for t in keyframes if t <= last + 1e-6]
+        if not starts or not ends:
+            return nothing
+        copyStart = clip.start_frame + int(round(starts[0] * fps))
+        copyEnd = clip.start_frame + int(round(ends[-1] * fps))
+        if copyEnd - copyStart < self.minCopySeconds * fps:
+            return nothing
+        return copyStart, copyEnd, starts[0]
+
+    def _probe(self, path: str) -> dict:
+        infos = self._probes.get(path)
+        if infos is None:
+            infos = ffmpeg_parse_infos(path)
+            self._probes[path] = infos
+        return infos
+
+    def _codecParameters(self, path: str) -> dict[str, str]:
+        """Pixel format, profile, level and pixel aspect ratio of the H.264 stream of ``path``.
+
+        Read from the stream description and the sequence parameter set, which
+        ffmpeg prints with its ``trace_headers`` bitstream filter.
+        """
+        parameters = self._parameters.get(path)
+        if parameters is None:
+            result = subprocess.run(
+                [
+                    FFMPEG_BINARY, "-hide_banner", "-i", path, "-map", "0:v:0", "-c", "copy",
+                    "-bsf:v", "trace_headers", "-frames:v", "1", "-f", "null", "-",
+                ],
+                capture_output=True,
+            )
+            output = result.stderr.decode(errors="replace")
+            stream = re.search(r"Video: h264 \(([^)]*)\)[^,]*, (\w+)", output)
+            level = re.search(r"level_idc\s+[01]+ = (\d+)", output)
+            aspect = re.search(r"\[SAR (\d+:\d+)", output)
+            parameters = {
+                "profile": stream.group(1) if stream else "",
+                "pixelFormat": stream.group(2) if stream else "",
+                "level": level.group(1) if level else "",
+                # Unsignalled means square pixels
+                "sampleAspectRatio": aspect.group(1) if aspect else "1:1",
+            }
+            self._parameters[path] = parameters
+        return parameters
+
+    def _encoderCodecParameters(self, size: tuple[int, int], fps: int) -> dict[str, str]:
+        """``_codecParameters`` of what the encoder writes at this size and framerate, from a few black frames."""
+        parameters = self._encoderParameters.get((size, fps))
+        if parameters is None:
+            workDir = tempfile.mkdtemp(prefix="pydeo-export-")
+            try:
+                path = os.path.join(workDir, "reference.mp4")
+                writer = FFMPEG_VideoWriter(path, size, fps, codec=self.codec, preset=self.preset)
+                try:
+                    frame = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+                    for _ in range(2):
+                        writer.write_frame(frame)
+                finally:
+                    writer.close()
+                parameters = self._codecParameters(path)
+                self._parameters.pop(path, None)
+            finally:
+                shutil.rmtree(workDir, ignore_errors=True)
+            self._encoderParameters[(size, fps)] = parameters
+        return parameters
+
+    def _splitEncodedSpans(self, spans, fps: int):
+        """Cut long spans to re-encode into chunks, so that they are spread over the workers."""
+        encoded = sum(end - start for start, end, copy in spans if copy is None)
+        minFrames = int(self.minChunkSeconds * fps)
+        length = max(minFrames, -(-encoded // (self.workers * self.chunksPerWorker)))
+        for start, end, copy in spans:
+            if copy is not None or self.workers == 1:
+                yield start, end, copy
+                continue
+            count = max(1, (end - start) // length)
+            cuts = [start + (end - start) * i // count for i in range(count + 1)]
+            for chunkStart, chunkEnd in zip(cuts[:-1], cuts[1:]):
+                yield chunkStart, chunkEnd, None
+
+    def _timestampFilter(self, fps: int) -> str:
+        """``setts`` filter starting a piece at 0 and decoding it ``reorderFrames`` early (or more if it needs to)."""
+        delay = f"max(0\\,{self.reorderFrames}/({fps}*TB)-(STARTPTS-STARTDTS))"
+        return f"setts=pts=PTS-STARTPTS:dts=DTS-STARTPTS-{delay}"
+
+    @staticmethod
+    def _copy(sourcePath: str, sourceStart: float, frames: int, piecePath: str, bitstreamFilter: str) -> None:
+        result = subprocess.run(
+            [
+                FFMPEG_BINARY, "-y", "-loglevel", "error",
+                "-ss", f"{sourceStart:.6f}", "-i", sourcePath,
+                "-map", "0:v:0", "-frames:v", str(frames), "-c", "copy",
+                "-bsf:v", bitstreamFilter, piecePath,
+            ],
+            capture_output=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode(errors="replace").strip())
+
+
+class StreamingExporter:
+    """Exports the timelines in a single pass, streaming frames and audio into one ffmpeg process.
+
+    Three stages run concurrently: a render thread pulls frames from the
+    timeline composite into a bounded queue, the calling thread writes them
+    to ffmpeg's stdin, and an audio thread writes the mix as raw float32
+    samples to a second pipe (passed to ffmpeg as file descriptor 3). The
+    queue bounds the frames held in memory, so memory stays flat however
+    long the timeline is, and nothing is written to disk besides the output.
+    On platforms without fd passing, the audio goes through a WAV file in
+    the temporary directory instead.
+    """
+
+    SAMPLE_RATE = 44100
+    CHANNELS = 2
+    AUDIO_BLOCK = 8192         # samples mixed at a time
+    REPORT_INTERVAL = 0.25     # seconds between two progress reports
+
+    codec: str
+    preset: str
+    queueFrames: int
+
+    def __init__(self, codec: str = "libx264", preset: str = "medium", queueFrames: int = 16) -> None:
+        self.codec = codec
+        self.preset = preset
+        self.queueFrames = queueFrames
+
+    def export(self, description: list[dict], fps: int, path: str, progress: ProgressCallback | None = None,
+               cancelled: threading.Event | None = None) -> None:
+        """Export the timelines to ``path``.
+
+        Args:
+            description (list[dict]): tracks to export, from ``describeTimelines``
+            fps (int): timeline framerate
+            path (str): output file
+            progress (ProgressCallback | None): called every ``REPORT_INTERVAL`` seconds with the
+                frames per second of the render and encode stages, the audio speed (times real
+                time) and the queue fill
+            cancelled (threading.Event | None): set to stop the export and delete the partial output
+
+        Raises:
+            RuntimeError: if the timelines are empty or ffmpeg fails
+            ExportCancelledException: if ``cancelled`` was set
+        """
+        cancelled = cancelled or threading.Event()
+        # Sources are opened again, so the export never shares a reader with the preview
+        timelines = buildTimelines(description)
+        workDir = None
+        try:
+            video, audio = renderTimelines(timelines, fps, compiler=RenderGraphCompiler(effectCacheBytes=0))
+            total = int(round(video.duration * fps))
+            if total <= 0:
+                raise RuntimeError("Nothing to export")
+            hasAudio = audio.duration is not None
+
+            command = [
+                FFMPEG_BINARY, "-y", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{video.w}x{video.h}", "-r", str(fps), "-i", "pipe:0",
+            ]
+            audioRead = audioWrite = None
+            if hasAudio and os.name == "posix":
+                audioRead, audioWrite = os.pipe()
+                command += ["-f", "f32le", "-ar", str(self.SAMPLE_RATE), "-ac", str(self.CHANNELS), "-i", f"pipe:{audioRead}"]
+            elif hasAudio:
+                workDir = tempfile.mkdtemp(prefix="pydeo-export-")
+                audioPath = os.path.join(workDir, "audio.wav")
+                audio.with_duration(total / fps).write_audiofile(audioPath, fps=self.SAMPLE_RATE, logger=None)
+                command += ["-i", audioPath]
+            if hasAudio:
+                command += ["-map", "0:v:0", "-map", "1:a:0", "-c:a", "aac"]
+            command += [
+                "-c:v", self.codec, "-preset", self.preset, "-pix_fmt", "yuv420p",
+                # yuv420p needs even dimensions
+                "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+                "-movflags", "+faststart", path,
+            ]
+
+            process = subprocess.Popen(
+                command, stdin=subprocess.PIPE, stderr=subprocess.PIPE,
+                pass_fds=(audioRead,) if audioRead is not None else (),
+            )
+            if audioRead is not None:
+                os.close(audioRead)
+            try:
+                self._stream(process, video, audio if audioWrite is not None else None, audioWrite,
+                             fps, total, progress, cancelled)
+            except BaseException:
+                process.kill()
+                process.wait()
+                if os.path.isfile(path):
+                    os.remove(path)
+                raise
+
+            errors = process.stderr.read().decode(errors="replace").strip()
+            if process.wait() != 0:
+                if os.path.isfile(path):
+                    os.remove(path)
+                raise RuntimeError(errors or f"ffmpeg exited with code {process.returncode}")
+        finally:
+            closeTimelines(timelines)
+            if workDir:
+                shutil.rmtree(workDir, ignore_errors=True)
+
+    def _stream(self, process: subprocess.Popen, video, audio, audioFd: int | None, fps: int, total: int,
+                progress: ProgressCallback | None, cancelled: threading.Event) -> None:
+        frames = queue.Queue(maxsize=self.queueFrames)
+        stats = {"rendered": 0, "renderTime": 0.0, "audioSeconds": 0.0, "audioTime": 0.0}
+        failures = []
+        stop = threading.Event()
+
+        def render():
+            try:
+                for i in range(total):
+                    start = time.perf_counter()
+                    frame = np.ascontiguousarray(video.get_frame(i / fps)[:, :, :3], dtype=np.uint8)
+                    stats["renderTime"] += time.perf_counter() - start
+                    stats["rendered"] += 1
+                    while not stop.is_set():
+                        try:
+                            frames.put(frame, timeout=0.1)
+                            break
+                        except queue.Full:
+                            pass
+                    if stop.is_set():
+                        return
+            except Exception as e:
+                failures.append(e)
+            frames.put(None)
+
+        def streamAudio():
+            try:
+                samples = int(round(total / fps * self.SAMPLE_RATE))
+                with os.fdopen(audioFd, "wb") as pipe:
+                    for first in range(0, samples, self.AUDIO_BLOCK):
+                        if stop.is_set():
+                            return
+                        start = time.perf_counter()
+                        block = renderAudioBlock(audio, first, min(self.AUDIO_BLOCK, samples - first),
+                                                 self.SAMPLE_RATE, self.CHANNELS)
+                        stats["audioTime"] += time.perf_counter() - start
+                        pipe.write(block.tobytes())
+                        stats["audioSeconds"] += len(block) / self.SAMPLE_RATE
+            except (BrokenPipeError, ValueError):
+                # ffmpeg stopped reading: its exit code tells why
+                pass
+            except Exception as e:
+                failures.append(e)
+
+        threads = [threading.Thread(target=render, name="export-render", daemon=True)]
+        if audioFd is not None:
+            threads.append(threading.Thread(target=streamAudio, name="export-audio", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        written = 0
+        encodeTime = 0.0
+        lastReport = 0.0
+        try:
+            while True:
+                if cancelled.is_set():
+                    raise ExportCancelledException()
+                try:
+                    frame = frames.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if frame is None:
+                    break
+
+                start = time.perf_counter()
+                try:
+                    process.stdin.write(frame.data)
+                except BrokenPipeError:
+                    raise RuntimeError(process.stderr.read().decode(errors="replace").strip() or "ffmpeg stopped")
+                encodeTime += time.perf_counter() - start
+                written += 1
+
+                now = time.perf_counter()
+                if progress and (now - lastReport >= self.REPORT_INTERVAL or written == total):
+                    lastReport = now
+                    progress(written, total, {
+                        "render": stats["rendered"] / stats["renderTime"] if stats["renderTime"] else 0.0,
+                        "encode": written / encodeTime if encodeTime else 0.0,
+                        "audio": stats["audioSeconds"] / stats["audioTime"] if stats["audioTime"] else 0.0,
+                        "queue": frames.qsize() / self.queueFrames,
+                    })
+            if failures:
+                raise failures[0]
+            process.stdin.close()
+            for thread in threads:
+                thread.join()
+            if failures:
+                raise failures[0]
+        finally:
+            stop.set()
+            if not process.stdin.closed:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+
+
+class ExportController(QObject):
+    """Runs exports on a background thread and reports their progress through signals.
+
+    The timelines are described (see ``describeTimelines``) when the export
+    starts, so later edits do not affect it. With smart rendering, a
+    SmartExporter copies what can be copied from the sources. Otherwise,
+    with one worker the export is streamed by a StreamingExporter; with
+    more, chunks are rendered in parallel by a ParallelExporter.
+    """
+
+    progressChanged = Signal(int, int, object)   # frames done, total frames, throughput per stage
+    exportFinished = Signal(str, object)         # output path, SmartExporter report (None without smart rendering)
+    exportFailed = Signal(str)                   # reason
+    exportCancelled = Signal()
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export")
+        self._cancelled = threading.Event()
+        self._running = False
+
+    def isRunning(self) -> bool:
+        return self._running
+
+    def start(self, timelines: list[Timeline], fps: int, path: str, workers: int = 1,
+              smartRender: bool = False) -> bool:
+        """Start exporting; return False if an export is already running."""
+        if self._running:
+            return False
+        self._running = True
+        self._cancelled.clear()
+        self._executor.submit(self._export, describeTimelines(timelines), fps, path, workers, smartRender)
+        return True
+
+    def cancel(self) -> None:
+        if self._running:
+            self._cancelled.set()
+
+    def _export(self, description: list[dict], fps: int, path: str, workers: int, smartRender: bool) -> None:
+        if smartRender:
+            exporter = SmartExporter(workers)
+        else:
+            exporter = StreamingExporter() if workers <= 1 else ParallelExporter(workers)
+        try:
+            report = exporter.export(description, fps, path, self.progressChanged.emit, self._cancelled)
+            self.exportFinished.emit(path, report)
+        except ExportCancelledException:
+            self.exportCancelled.emit()
+        except Exception as e:
+            self.exportFailed.emit(str(e))
+        finally:
+            self._running = False
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def benchmark(paths: list[str], workerCounts: list[int] | None = None, fps: int = 24,
+              preset: str = "ultrafast") -> dict[int, float]:
+    """Export ``benchmarkTimelines(paths)`` with each worker count and return the frames per second of each.
+
+    One worker means the streaming exporter; more, the parallel chunked one.
+    """
+    description = describeTimelines(benchmarkTimelines(paths, fps))
+    frames = ParallelExporter._plan(description).end
+    results = {}
+    for workers in workerCounts or [1, 2, 4, os.cpu_count() or 1]:
+        output = os.path.join(tempfile.gettempdir(), f"pydeo-benchmark-{workers}.mp4")
+        exporter = StreamingExporter(preset=preset) if workers == 1 else ParallelExporter(workers, preset=preset)
+        start = time.perf_counter()
+        exporter.export(description, fps, output)
+        results[workers] = frames / (time.perf_counter() - start)
+        os.remove(output)
+    return results
+
+
+if __name__ == "__main__":
+    # python -m controller.ExportController video1.mp4 [video2.mp4 ...]
+    for workers, framesPerSecond in benchmark(sys.argv[1:]).items():
+        print(f"{workers} worker(s): {framesPerSecond:.1f} fps")
@@ -1,14 +1,21 @@
 from moviepy import CompositeVideoClip, VideoClip, VideoFileClip, AudioClip, AudioFileClip, ImageClip
 
 from model.Source import Source
+from .DecoderPool import getDecoderPool
 from .utils.Exceptions import UnhandledFileFormatException
 import os
 
-def readVideoFile(source: Source) -> tuple[VideoClip, AudioClip | None, int]:
+VIDEO_EXTENSIONS = [".mp4", ".avi", ".mkv", ".mov", ".flv", ".wmv", ".webm"]
+AUDIO_EXTENSIONS = [".mp3", ".wav", ".aac", ".ogg", ".flac", ".opus"]
+
+def readVideoFile(source: Source, useProxy: bool = False, shared: bool = False) -> tuple[VideoClip, AudioClip | None, int]:
     """Open a video file and return VideoClip and AudioClip objects (if audio is available in the video file)
 
     Args:
         source (Source): the source of the clip. This source must refer to a file with supported format (.mp4, .avi, .mkv, .mov, .flv, .wmv or .webm)
+        useProxy (bool): open the source's preview proxy instead of the original file, if one exists
+        shared (bool): decode with the readers of the DecoderPool, shared with the other clips of the file,
+            instead of readers of its own; closing the clip releases them
 
     Returns:
         tuple[VideoClip, AudioClip | None, int]: Clips and framerate extracted from the given file
@@ -17,22 +24,27 @@ def readVideoFile(source: Source) -> tuple[VideoClip, AudioClip | None, int]:
         FileNotFoundError: The specified location is not an existing file
         UnhandledFileFormatException: The specified file extension is not supported
     """
-    if not os.path.isfile(source.filepath):
+    path = source.filepath
+    if useProxy and getattr(source, "proxyPath", None):
+        path = source.proxyPath
+
+    if not os.path.isfile(path):
         raise FileNotFoundError("Given path is not a file")
     
-    if os.path.splitext(source.filepath)[1] not in [".mp4", ".avi", ".mkv", ".mov", ".flv", ".wmv", ".webm"]:
+    if os.path.splitext(path)[1] not in VIDEO_EXTENSIONS:
         raise UnhandledFileFormatException("Wrong video file format. Supported formats are .mp4, .avi, .mkv, .mov, .flv, .wmv and .webm")
     
-    clip = VideoFileClip(source.filepath)
+    clip = getDecoderPool().videoClip(path) if shared else VideoFileClip(path)
     audio = clip.audio
     
     return clip, audio, clip.fps
 
-def readAudioFile(source: Source) -> tuple[AudioClip, int]:
+def readAudioFile(source: Source, shared: bool = False) -> tuple[AudioClip, int]:
     """Open an audio file and return AudioClip object
 
     Args:
         source (source): the source of the clip. This source must refer to a file with supported format (.mp3, .wav, .aac, .ogg, .flac or .opus)
+        shared (bool): read with the readers of the DecoderPool (see readVideoFile)
 
     Returns:
         tuple[AudioClip, int]: Clips extracted from the given file and its frequency
@@ -44,10 +56,10 @@ def readAudioFile(source: Source) -> tuple[AudioClip, int]:
     if not os.path.isfile(source.filepath):
         raise FileNotFoundError("Given path is not a file")
     
-    if os.path.splitext(source.filepath)[1] not in [".mp3", ".wav", ".aac", ".ogg", ".flac", ".opus"]:
+    if os.path.splitext(source.filepath)[1] not in AUDIO_EXTENSIONS:
         raise UnhandledFileFormatException("Wrong video file format. Supported formats are .mp3, .wav, .aac, .ogg, .flac and .opus")
     
-    audio = AudioFileClip(source.filepath)
+    audio = getDecoderPool().audioClip(source.filepath) if shared else AudioFileClip(source.filepath)
     
     return audio, audio.fps
 
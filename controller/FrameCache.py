@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from typing import Hashable
+
+import numpy as np
+
+
+class FrameCache:
+    """LRU cache of rendered preview frames, keyed by timeline frame index.
+
+    A key is either the frame index itself or a tuple starting with it (e.g.
+    ``(frameIndex, quality)``), so that invalidating a range of frames drops
+    every variant of those frames.
+
+    The cache never holds more than ``maxBytes`` of pixel data: when a new
+    frame does not fit, the least recently used frames are evicted first.
+    Hit and miss counters are kept so the preview can report its efficiency.
+    """
+
+    maxBytes: int
+    currentBytes: int
+    hits: int
+    misses: int
+
+    def __init__(self, maxBytes: int = 256 * 1024 * 1024) -> None:
+        self.maxBytes = maxBytes
+        self.currentBytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames: OrderedDict[Hashable, np.ndarray] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._frames
+
+    def get(self, key: Hashable) -> np.ndarray | None:
+        """Return the cached frame and mark it as most recently used, or None on a miss."""
+        frame = self._frames.get(key)
+        if frame is None:
+            self.misses += 1
+            return None
+
+        self._frames.move_to_end(key)
+        self.hits += 1
+        return frame
+
+    def put(self, key: Hashable, frame: np.ndarray) -> None:
+        """Store a frame, evicting the least recently used ones to stay within budget.
+
+        Frames bigger than the whole budget are not cached at all.
+        """
+        if frame.nbytes > self.maxBytes:
+            return
+
+        old = self._frames.pop(key, None)
+        if old is not None:
+            self.currentBytes -= old.nbytes
+
+        self._frames[key] = frame
+        self.currentBytes += frame.nbytes
+        self._evict()
+
+    def setMaxBytes(self, maxBytes: int) -> None:
+        self.maxBytes = maxBytes
+        self._evict()
+
+    def invalidate(self, start: int, end: int) -> int:
+        """Drop the cached frames whose index lies in ``[start, end)``.
+
+        Frames outside that interval stay valid. Returns the number of dropped frames.
+        """
+        stale = [key for key in self._frames if start <= self.frameIndexOf(key) < end]
+        for key in stale:
+            self.currentBytes -= self._frames.pop(key).nbytes
+        return len(stale)
+
+    @staticmethod
+    def frameIndexOf(key: Hashable) -> int:
+        return key[0] if isinstance(key, tuple) else key
+
+    def clear(self) -> None:
+        self._frames.clear()
+        self.currentBytes = 0
+
+    def resetStats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def hitRate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _evict(self) -> None:
+        while self.currentBytes > self.maxBytes and self._frames:
+            _, frame = self._frames.popitem(last=False)
+            self.currentBytes -= frame.nbytes
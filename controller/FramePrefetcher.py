@@ -0,0 +1,191 @@
+import threading
+from typing import Callable
+
+import numpy as np
+
+
+class FrameRingBuffer:
+    """Bounded ring buffer of rendered frames shared by the prefetch thread and the GUI thread.
+
+    The producer pushes ``(frameIndex, frame)`` pairs in playback order and blocks
+    while the buffer is full; the consumer pops the frame it needs, dropping any
+    older entries on the way.
+    """
+
+    capacity: int
+    dropped: int
+
+    def __init__(self, capacity: int = 48) -> None:
+        self.capacity = capacity
+        self._slots: list[tuple[int, np.ndarray] | None] = [None] * capacity
+        self._head = 0
+        self._count = 0
+        self.dropped = 0
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def isFull(self) -> bool:
+        return self._count >= self.capacity
+
+    def push(self, frameIndex: int, frame: np.ndarray) -> None:
+        """Append a frame. The caller must check ``isFull`` under ``condition`` first."""
+        tail = (self._head + self._count) % self.capacity
+        self._slots[tail] = (frameIndex, frame)
+        self._count += 1
+
+    def pop(self, frameIndex: int, direction: int = 1) -> np.ndarray | None:
+        """Return the most recent buffered frame that is not ahead of ``frameIndex``.
+
+        Older entries are discarded (and counted as dropped). Returns None if
+        no such frame has been produced yet.
+        """
+        with self._condition:
+            latest = None
+            while self._count:
+                index, frame = self._slots[self._head]
+                if (index - frameIndex) * direction > 0:
+                    break
+
+                self._slots[self._head] = None
+                self._head = (self._head + 1) % self.capacity
+                self._count -= 1
+                if latest is not None:
+                    self.dropped += 1
+                latest = frame
+            self._condition.notify_all()
+            return latest
+
+    def clear(self) -> None:
+        with self._condition:
+            self._slots = [None] * self.capacity
+            self._head = 0
+            self._count = 0
+            self._condition.notify_all()
+
+    @property
+    def condition(self) -> threading.Condition:
+        return self._condition
+
+
+class FramePrefetcher(threading.Thread):
+    """Background producer that renders frames ahead of the playhead.
+
+    Frames are rendered with ``renderFrame`` (called from this thread only) and
+    stored in a ``FrameRingBuffer``. ``restart`` invalidates everything that was
+    read ahead, e.g. after a seek or an edit. Single-frame requests (seeks) are
+    served first and delivered through ``onFrameRequested``; a new request
+    replaces whatever is still pending, so stale seeks are dropped.
+    """
+
+    buffer: FrameRingBuffer
+    direction: int
+    step: float
+    duration: int
+
+    def __init__(
+        self,
+        renderFrame: Callable[[int], np.ndarray],
+        onFrameRequested: Callable[[int, np.ndarray], None],
+        capacity: int = 48,
+    ) -> None:
+        super().__init__(daemon=True)
+        self.renderFrame = renderFrame
+        self.onFrameRequested = onFrameRequested
+        self.buffer = FrameRingBuffer(capacity)
+        self.direction = 1
+        self.step = 1.0
+        self.duration = 0
+
+        self._position = 0.0
+        self._generation = 0
+        self._requests: list[int] = []
+        self._running = True
+
+    # ----- Control (GUI thread) -------------------------------------------
+    def restart(self, frameIndex: float, direction: int | None = None, duration: int | None = None) -> None:
+        """Drop the read-ahead buffer and start producing again from ``frameIndex``."""
+        with self.buffer.condition:
+            if direction is not None:
+                self.direction = 1 if direction >= 0 else -1
+            if duration is not None:
+                self.duration = duration
+            self._position = float(frameIndex)
+            self._generation += 1
+            self.buffer.clear()
+            self.buffer.condition.notify_all()
+
+    def invalidate(self, start: int, end: int, frameIndex: float) -> None:
+        """Restart the read-ahead from ``frameIndex`` if it produced frames within ``[start, end)``."""
+        with self.buffer.condition:
+            low, high = sorted((frameIndex, self._position))
+            if high < start or low >= end:
+                return
+        self.restart(frameIndex)
+
+    def catchUp(self, frameIndex: int, lead: int = 0) -> None:
+        """Jump ahead if production fell behind the playhead, instead of rendering frames that are already late."""
+        with self.buffer.condition:
+            if len(self.buffer) or (self._position - frameIndex) * self.direction > 0:
+                return
+        self.restart(frameIndex + lead * self.direction)
+
+    def requestFrame(self, frameIndex: int, coarseIndex: int | None = None) -> None:
+        """Ask for a single frame to be rendered as soon as possible, replacing any pending request.
+
+        If ``coarseIndex`` is given, that (cheaper) frame is rendered and delivered
+        first, then ``frameIndex`` unless a newer request arrived in between.
+        """
+        with self.buffer.condition:
+            self._requests = [frameIndex] if coarseIndex is None else [coarseIndex, frameIndex]
+            self.buffer.condition.notify_all()
+
+    def pop(self, frameIndex: int) -> np.ndarray | None:
+        return self.buffer.pop(frameIndex, self.direction)
+
+    def stop(self) -> None:
+        with self.buffer.condition:
+            self._running = False
+            self.buffer.condition.notify_all()
+
+    # ----- Worker thread ---------------------------------------------------
+    def _hasWork(self) -> bool:
+        if self._requests:
+            return True
+        index = int(self._position)
+        return not self.buffer.isFull() and 0 <= index < self.duration
+
+    def run(self) -> None:
+        condition = self.buffer.condition
+        while True:
+            with condition:
+                while self._running and not self._hasWork():
+                    condition.wait()
+                if not self._running:
+                    return
+
+                request = self._requests.pop(0) if self._requests else None
+                generation = self._generation
+                index = int(self._position)
+
+            if request is not None:
+                try:
+                    self.onFrameRequested(request, self.renderFrame(request))
+                except Exception as e:
+                    print(f"[FramePrefetcher] Error rendering frame {request}: {e}")
+                continue
+
+            try:
+                frame = self.renderFrame(index)
+            except Exception as e:
+                print(f"[FramePrefetcher] Error rendering frame {index}: {e}")
+                frame = None
+
+            with condition:
+                # The buffer was invalidated while rendering: throw the frame away
+                if generation != self._generation:
+                    continue
+                if frame is not None:
+                    self.buffer.push(index, frame)
+                self._position += self.step * self.direction
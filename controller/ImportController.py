@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Signal
+
+from controller.FileHandlerController import AUDIO_EXTENSIONS, VIDEO_EXTENSIONS
+from controller.MediaProbe import MediaIndex
+from controller.utils.cacheDirectory import fileHash
+
+
+def expandPaths(paths: list[str]) -> list[str]:
+    """Media files among ``paths``, folders being searched recursively (in name order)."""
+    extensions = set(VIDEO_EXTENSIONS) | set(AUDIO_EXTENSIONS)
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirectories, names in os.walk(path):
+                subdirectories.sort()
+                files += [os.path.join(directory, name) for name in sorted(names)
+                          if os.path.splitext(name)[1] in extensions]
+        elif os.path.splitext(path)[1] in extensions:
+            files.append(path)
+    return files
+
+
+class ImportController(QObject):
+    """Imports batches of files and folders on a bounded pool of worker threads.
+
+    Each file is probed (through the MediaIndex) and hashed in the pool, off
+    the GUI thread; ``fileImported`` is emitted as soon as a file is done, so
+    sources appear one by one while the rest of the batch is still running.
+    Files queued while a batch runs join it. ``cancel`` drops the files that
+    have not started and the results of those being probed.
+    """
+
+    fileImported = Signal(str, object, str)    # path, MediaInfo, content hash
+    fileFailed = Signal(str, str)              # path, reason
+    progressChanged = Signal(int, int, float)  # files done, files in the batch, files per second
+    importFinished = Signal(int, int)          # files imported, files failed
+    importCancelled = Signal()
+
+    mediaIndex: MediaIndex
+
+    def __init__(self, mediaIndex: MediaIndex, maxWorkers: int | None = None, parent=None) -> None:
+        super().__init__(parent)
+        self.mediaIndex = mediaIndex
+        # Probing waits on ffmpeg and hashing on the disk, so a few more threads than cores still pay off
+        workers = maxWorkers or min(8, 2 * (os.cpu_count() or 1))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import")
+        self._lock = threading.Lock()
+        self._futures: list[Future] = []
+        self._batch = 0          # incremented by cancel, so stale results are dropped
+        self._total = 0
+        self._imported = 0
+        self._failed = 0
+        self._startTime = 0.0
+
+    def isRunning(self) -> bool:
+        with self._lock:
+            return self._imported + self._failed < self._total
+
+    def importPaths(self, paths: list[str]) -> int:
+        """Queue files and folders for import; return the number of media files found."""
+        files = expandPaths(paths)
+        with self._lock:
+            if self._imported + self._failed >= self._total:
+                # Previous batch done: start counting a new one
+                self._total = self._imported = self._failed = 0
+                self._futures = []
+                self._startTime = time.perf_counter()
+            self._total += len(files)
+            batch = self._batch
+            self._futures += [self._executor.submit(self._import, path, batch) for path in files]
+        return len(files)
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._imported + self._failed >= self._total:
+                return
+            self._batch += 1
+            for future in self._futures:
+                future.cancel()
+            self._futures = []
+            self._total = self._imported = self._failed = 0
+        self.importCancelled.emit()
+
+    def _import(self, path: str, batch: int) -> None:
+        try:
+            info = self.mediaIndex.probe(path)
+            contentHash = fileHash(path)
+            error = None
+        except Exception as e:
+            error = str(e)
+
+        # Emitted under the lock (the slots run later, on the GUI thread) so that
+        # the signals of a batch arrive in order and importFinished comes last
+        with self._lock:
+            if batch != self._batch:
+                return
+            if error is None:
+                self._imported += 1
+                self.fileImported.emit(path, info, contentHash)
+            else:
+                self._failed += 1
+                self.fileFailed.emit(path, error)
+            done = self._imported + self._failed
+            self.progressChanged.emit(done, self._total, done / max(time.perf_counter() - self._startTime, 1e-6))
+            if done == self._total:
+                self.importFinished.emit(self._imported, self._failed)
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
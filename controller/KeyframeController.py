@@ -0,0 +1,93 @@
+import bisect
+import json
+import os
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Signal
+from moviepy.config import FFMPEG_BINARY
+
+from controller.utils.cacheDirectory import fileHash, getCacheDir
+from model.Source import Source
+
+
+class KeyframeIndex:
+    """Sorted timestamps (in seconds) of the keyframes of a video source."""
+
+    times: list[float]
+
+    def __init__(self, times: list[float]) -> None:
+        self.times = sorted(times)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def keyframeBefore(self, t: float) -> float:
+        """Timestamp of the last keyframe at or before ``t`` (0 if there is none)."""
+        i = bisect.bisect_right(self.times, t + 1e-6)
+        return self.times[i - 1] if i else 0.0
+
+
+def scanKeyframes(path: str) -> KeyframeIndex:
+    """Scan a video file once and return its keyframe index.
+
+    Only keyframes are decoded (``-skip_frame nokey``), so the scan is much
+    faster than a full decode.
+    """
+    result = subprocess.run(
+        [
+            FFMPEG_BINARY, "-hide_banner", "-nostats",
+            "-skip_frame", "nokey", "-i", path,
+            "-map", "0:v:0", "-an", "-fps_mode", "passthrough",
+            "-vf", "showinfo", "-f", "null", "-",
+        ],
+        capture_output=True,
+        check=True,
+    )
+    stderr = result.stderr.decode(errors="replace")
+    return KeyframeIndex([float(t) for t in re.findall(r"pts_time:(-?[\d.]+)", stderr)])
+
+
+class KeyframeController(QObject):
+    """Builds keyframe indexes of imported sources in the background.
+
+    Each index is stored on ``Source.keyframes`` and persisted as JSON in the
+    cache directory, under the source's content hash, so a file is scanned
+    only once.
+    """
+
+    indexReady = Signal(object)          # Source
+    indexFailed = Signal(object, str)    # Source, reason
+
+    def __init__(self, maxWorkers: int = 2, parent=None) -> None:
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix="keyframes")
+
+    def indexSource(self, source: Source) -> None:
+        """Queue the indexing of a source; ``indexReady`` is emitted when done."""
+        self._executor.submit(self._index, source)
+
+    def _index(self, source: Source) -> None:
+        try:
+            source.keyframes = self.loadOrScan(source.filepath)
+            self.indexReady.emit(source)
+        except subprocess.CalledProcessError as e:
+            self.indexFailed.emit(source, e.stderr.decode(errors="replace").strip())
+        except Exception as e:
+            self.indexFailed.emit(source, str(e))
+
+    @staticmethod
+    def loadOrScan(path: str) -> KeyframeIndex:
+        indexPath = os.path.join(getCacheDir("keyframes"), f"{fileHash(path)}.json")
+        if os.path.isfile(indexPath):
+            with open(indexPath, "r", encoding="utf-8") as f:
+                return KeyframeIndex(json.load(f)["keyframes"])
+
+        index = scanKeyframes(path)
+        with open(indexPath, "w", encoding="utf-8") as f:
+            json.dump({"source": path, "keyframes": index.times}, f)
+        return index
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,213 @@
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+from moviepy import VideoFileClip
+from moviepy.config import FFMPEG_BINARY
+
+from controller.utils.cacheDirectory import getCacheDir
+
+# Channel count of the layouts ffmpeg names instead of counting
+CHANNEL_LAYOUTS = {"mono": 1, "stereo": 2, "2.1": 3, "3.0": 3, "quad": 4, "4.0": 4, "5.0": 5, "5.1": 6, "6.1": 7, "7.1": 8}
+
+
+class MediaInfo:
+    """What an import needs to know about a media file, read from its headers.
+
+    Video fields are 0 or None when the file has no video stream (cover art
+    of audio files does not count), audio fields likewise without audio.
+    """
+
+    duration: float
+    fps: float
+    width: int
+    height: int
+    videoCodec: str | None
+    audioCodec: str | None
+    sampleRate: int
+    channels: int
+    channelLayout: str | None
+
+    def __init__(self, duration: float = 0.0, fps: float = 0.0, width: int = 0, height: int = 0,
+                 videoCodec: str | None = None, audioCodec: str | None = None, sampleRate: int = 0,
+                 channels: int = 0, channelLayout: str | None = None) -> None:
+        self.duration = duration
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.videoCodec = videoCodec
+        self.audioCodec = audioCodec
+        self.sampleRate = sampleRate
+        self.channels = channels
+        self.channelLayout = channelLayout
+
+    def __repr__(self) -> str:
+        return f"MediaInfo({self.toDict()})"
+
+    @property
+    def hasVideo(self) -> bool:
+        return self.videoCodec is not None
+
+    @property
+    def hasAudio(self) -> bool:
+        return self.audioCodec is not None
+
+    def toDict(self) -> dict:
+        return dict(vars(self))
+
+    @classmethod
+    def fromDict(cls, data: dict) -> "MediaInfo":
+        return cls(**data)
+
+
+def probeMedia(path: str) -> MediaInfo:
+    """Read duration, framerate, size, codecs and audio layout of a file from its headers.
+
+    ``ffmpeg -i`` only opens the container and prints the streams it finds:
+    no decoder is set up and nothing stays open afterwards, unlike a
+    VideoFileClip.
+
+    Raises:
+        FileNotFoundError: the file does not exist
+        RuntimeError: ffmpeg found no stream in it
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError("Given path is not a file")
+
+    # Without an output ffmpeg exits with an error, after printing what it found
+    result = subprocess.run([FFMPEG_BINARY, "-hide_banner", "-i", path], capture_output=True)
+    stderr = result.stderr.decode(errors="replace")
+
+    info = MediaInfo()
+    duration = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", stderr)
+    if duration:
+        hours, minutes, seconds = duration.groups()
+        info.duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    found = False
+    for line in stderr.splitlines():
+        stream = re.search(r"Stream #\d+:\d+.*?: (Video|Audio): (\w+)", line)
+        if not stream:
+            continue
+        found = True
+        kind, codec = stream.groups()
+        if kind == "Video" and info.videoCodec is None and "attached pic" not in line:
+            info.videoCodec = codec
+            size = re.search(r", (\d{2,})x(\d{2,})", line)
+            if size:
+                info.width, info.height = int(size.group(1)), int(size.group(2))
+            fps = re.search(r"([\d.]+) fps", line) or re.search(r"([\d.]+)k? tbr", line)
+            if fps:
+                info.fps = float(fps.group(1))
+        elif kind == "Audio" and info.audioCodec is None:
+            info.audioCodec = codec
+            layout = re.search(r"(\d+) Hz, ([^,]+)", line)
+            if layout:
+                info.sampleRate = int(layout.group(1))
+                info.channelLayout = layout.group(2).strip()
+                info.channels = channelCount(info.channelLayout)
+
+    if not found:
+        lines = stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else "No stream found")
+    return info
+
+
+def channelCount(layout: str) -> int:
+    """Channels of an ffmpeg layout name: "stereo", "5.1(side)", "3 channels"..."""
+    counted = re.match(r"(\d+) channels", layout)
+    if counted:
+        return int(counted.group(1))
+    return CHANNEL_LAYOUTS.get(layout.split("(")[0], 0)
+
+
+class MediaIndex:
+    """Persistent index of probe results, so a file is probed once until it changes.
+
+    Entries are stored in SQLite in the cache directory and keyed by path,
+    modification time and size: a file that was replaced or re-encoded is
+    probed again, one that was not costs a single indexed lookup.
+    """
+
+    path: str
+    hits: int
+    misses: int
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or os.path.join(getCacheDir("probe"), "media.sqlite")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS media (path TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, info TEXT)"
+        )
+        self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM media").fetchone()[0]
+
+    def probe(self, path: str) -> MediaInfo:
+        """MediaInfo of ``path``, from the index when the file has not changed since it was probed."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT info FROM media WHERE path = ? AND mtime = ? AND size = ?",
+                (path, stat.st_mtime_ns, stat.st_size),
+            ).fetchone()
+            if row is not None:
+                self.hits += 1
+                return MediaInfo.fromDict(json.loads(row[0]))
+            self.misses += 1
+
+        info = probeMedia(path)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO media (path, mtime, size, info) VALUES (?, ?, ?, ?)",
+                (path, stat.st_mtime_ns, stat.st_size, json.dumps(info.toDict())),
+            )
+            self._db.commit()
+        return info
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def benchmark(paths: list[str]) -> dict[str, float]:
+    """Milliseconds per file to get the duration with a VideoFileClip, a probe and an index lookup."""
+    results = {}
+
+    start = time.perf_counter()
+    for path in paths:
+        clip = VideoFileClip(path)
+        clip.close()
+    results["videoFileClip"] = (time.perf_counter() - start) * 1000 / len(paths)
+
+    index = MediaIndex(os.path.join(getCacheDir("probe"), "benchmark.sqlite"))
+    try:
+        with index._lock:
+            index._db.execute("DELETE FROM media")
+            index._db.commit()
+        for name in ("probe", "indexed"):
+            start = time.perf_counter()
+            for path in paths:
+                index.probe(path)
+            results[name] = (time.perf_counter() - start) * 1000 / len(paths)
+    finally:
+        index.close()
+    return results
+
+
+if __name__ == "__main__":
+    # python -m controller.MediaProbe video1.mp4 [video2.mp4 ...]
+    for name, value in benchmark(sys.argv[1:]).items():
+        print(f"{name}: {value:.2f} ms")
@@ -0,0 +1,66 @@
+import time
+from typing import Callable
+
+
+class PlaybackClock:
+    """Transport clock giving the timeline position from elapsed time.
+
+    The position is not accumulated tick by tick: it is computed from the time
+    elapsed since the clock was started, so a late timer tick makes the
+    preview skip frames instead of slowing playback down. Everything that
+    follows the playhead (preview, timeline, audio) reads the same clock.
+
+    The time source defaults to ``time.monotonic`` and can be replaced, e.g. by
+    the position of an audio output device.
+    """
+
+    fps: float
+    direction: int
+    rate: float
+    running: bool
+
+    def __init__(self, fps: float, timeSource: Callable[[], float] = time.monotonic) -> None:
+        self.fps = fps
+        self.direction = 1
+        self.rate = 1.0
+        self.running = False
+        self._timeSource = timeSource
+        self._anchorFrame = 0.0
+        self._anchorTime = 0.0
+
+    def setTimeSource(self, timeSource: Callable[[], float]) -> None:
+        """Switch to another time source without moving the playhead."""
+        frame = self.position()
+        self._timeSource = timeSource
+        self._anchor(frame)
+
+    def start(self, frame: float, direction: int = 1) -> None:
+        self.direction = 1 if direction >= 0 else -1
+        self._anchor(frame)
+        self.running = True
+
+    def stop(self) -> float:
+        """Freeze the clock and return the position it stopped at."""
+        frame = self.position()
+        self.running = False
+        self._anchorFrame = frame
+        return frame
+
+    def seek(self, frame: float) -> None:
+        self._anchor(frame)
+
+    def setDirection(self, direction: int) -> None:
+        frame = self.position()
+        self.direction = 1 if direction >= 0 else -1
+        self._anchor(frame)
+
+    def position(self) -> float:
+        """Current position in timeline frames."""
+        if not self.running:
+            return self._anchorFrame
+        elapsed = self._timeSource() - self._anchorTime
+        return self._anchorFrame + elapsed * self.fps * self.rate * self.direction
+
+    def _anchor(self, frame: float) -> None:
+        self._anchorFrame = float(frame)
+        self._anchorTime = self._timeSource()
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Signal
+from moviepy.config import FFMPEG_BINARY
+
+from controller.utils.cacheDirectory import fileHash, getCacheDir
+from model.Source import Source
+
+
+class ProxyController(QObject):
+    """Generates low-resolution, all-intra proxies of video sources in the background.
+
+    Proxies are MJPEG files (every frame is a keyframe, so seeking is cheap)
+    stored in the cache directory under the source's content hash, which lets
+    a re-imported file reuse its existing proxy. Once a proxy is ready its
+    path is stored in ``Source.proxyPath``; preview playback uses it while
+    export keeps reading the original file.
+    """
+
+    proxyReady = Signal(object)          # Source
+    proxyFailed = Signal(object, str)    # Source, reason
+
+    enabled: bool
+    height: int
+
+    def __init__(self, height: int = 360, maxWorkers: int = 2, parent=None) -> None:
+        super().__init__(parent)
+        self.enabled = True
+        self.height = height
+        self._executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix="proxy")
+
+    def proxyPathFor(self, source: Source) -> str:
+        return os.path.join(getCacheDir("proxies"), f"{fileHash(source.filepath)}_{self.height}p.mov")
+
+    def generateProxy(self, source: Source) -> None:
+        """Queue the transcoding of a source; ``proxyReady`` is emitted when done."""
+        self._executor.submit(self._transcode, source)
+
+    def _transcode(self, source: Source) -> None:
+        try:
+            path = self.proxyPathFor(source)
+            if not os.path.isfile(path):
+                tmpPath = f"{path}.{threading.get_ident()}.part.mov"
+                subprocess.run(
+                    [
+                        FFMPEG_BINARY, "-y", "-loglevel", "error",
+                        "-i", source.filepath,
+                        "-vf", f"scale=-2:{self.height}",
+                        "-c:v", "mjpeg", "-q:v", "5", "-pix_fmt", "yuvj420p",
+                        "-c:a", "aac",
+                        tmpPath,
+                    ],
+                    check=True,
+                    capture_output=True,
+                )
+                os.replace(tmpPath, path)
+
+            source.proxyPath = path
+            self.proxyReady.emit(source)
+        except subprocess.CalledProcessError as e:
+            self.proxyFailed.emit(source, e.stderr.decode(errors="replace").strip())
+        except Exception as e:
+            self.proxyFailed.emit(source, str(e))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,382 @@
+import hashlib
+import sys
+import time
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+from moviepy import AudioClip, CompositeVideoClip, VideoClip
+
+from controller.AudioController import effectGains
+from controller.AudioConversionController import PcmAudioClip
+from controller.AudioMixer import AudioMixer, MixTrack
+from controller.EffectKernels import EffectChain, MemoizedEffectChain
+from controller.FrameCache import FrameCache
+from controller.SegmentPlanner import SegmentPlan, planSegments
+from controller.VideoController import apply_video_effects
+from controller.utils.cacheDirectory import sourceHash
+from model.Effects import VideoEffect, VideoEffectEnum, effectChainHash
+from model.Source import Source
+from model.Timeline import Timeline
+from model.TimelineClip import TimelineAudioClip, TimelineVideoClip
+
+Kernel = Callable[[np.ndarray], np.ndarray]
+
+
+class SegmentedVideoClip(VideoClip):
+    """Video of a whole timeline, rendered segment by segment.
+
+    Each frame is served by the renderer of the segment it falls in, found
+    with a binary search over the plan, so the cost of a frame only depends on
+    the layers active at that time. Gaps between clips are black.
+    """
+
+    plan: SegmentPlan
+    renderers: list[Callable[[float], np.ndarray] | None]
+    timelineFps: int
+
+    def __init__(self, plan: SegmentPlan, renderers: list[Callable[[float], np.ndarray] | None],
+                 size: tuple[int, int], fps: int) -> None:
+        super().__init__()
+        self.plan = plan
+        self.renderers = renderers
+        self.timelineFps = fps
+        self.size = size
+        self.duration = self.end = plan.end / fps
+        self._blank = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        self.frame_function = self._frameAt
+
+    def _frameAt(self, t: float) -> np.ndarray:
+        i = self.plan.segmentIndexAt(int(t * self.timelineFps + 1e-6))
+        renderer = self.renderers[i] if i is not None else None
+        if renderer is None:
+            return self._blank
+        return renderer(t - self.plan.segments[i].start / self.timelineFps)
+
+
+# --- Kernels: plain functions from frame to frame, called directly by the compiled plan ---
+
+def resizeKernel(size: tuple[int, int]) -> Kernel:
+    """Same resampling as MoviePy's Resize effect (PIL, Lanczos)."""
+    def resize(frame: np.ndarray) -> np.ndarray:
+        return np.array(Image.fromarray(frame).resize(size, Image.Resampling.LANCZOS))
+    return resize
+
+
+# --- Compiled plan ---
+
+class LayerProgram:
+    """One layer of a segment: decode at an affine source time, run the kernels in order, then the effects.
+
+    With ``effects``, the effect chain output is memoised per source frame
+    (see MemoizedEffectChain) and decoding is skipped when it is cached.
+    """
+
+    key: str
+    timeOffset: float
+    timeScale: float
+    duration: float
+    kernels: list[Kernel]
+    effects: MemoizedEffectChain | None
+
+    def __init__(self, key: str, decoder: VideoClip, timeOffset: float, timeScale: float,
+                 duration: float, kernels: list[Kernel], effects: MemoizedEffectChain | None = None) -> None:
+        self.key = key
+        self.decoder = decoder
+        self.timeOffset = timeOffset
+        self.timeScale = timeScale
+        self.duration = duration
+        self.kernels = kernels
+        self.effects = effects
+        # Straight to the ffmpeg reader, skipping MoviePy's get_frame wrappers
+        self._decode = decoder.reader.get_frame if getattr(decoder, "reader", None) else decoder.get_frame
+
+    def render(self, t: float) -> np.ndarray:
+        sourceTime = self.timeOffset + self.timeScale * t
+        if self.effects is None:
+            return self._decodeAt(sourceTime)
+        return self.effects.render(self._sourceFrame(sourceTime), lambda: self._decodeAt(sourceTime))
+
+    def _decodeAt(self, sourceTime: float) -> np.ndarray:
+        frame = self._decode(sourceTime)
+        for kernel in self.kernels:
+            frame = kernel(frame)
+        return frame
+
+    def _sourceFrame(self, sourceTime: float) -> int:
+        # Same rounding as MoviePy's reader, so times decoding to the same frame share a key
+        fps = self.decoder.fps or 1000
+        return int(fps * sourceTime + 0.00001)
+
+
+class SegmentProgram:
+    """Flat execution plan of a segment: its layers, bottom first, pasted on a canvas."""
+
+    key: str
+    size: tuple[int, int]
+    layers: list[LayerProgram]
+
+    def __init__(self, key: str, size: tuple[int, int], layers: list[LayerProgram]) -> None:
+        self.key = key
+        self.size = size
+        self.layers = layers
+
+    def render(self, t: float) -> np.ndarray:
+        w, h = self.size
+        canvas = None
+        for layer in self.layers:
+            if t < layer.duration:
+                frame = layer.render(t)
+                if len(self.layers) == 1 and frame.shape[1] == w and frame.shape[0] == h:
+                    # A lone layer filling the canvas is the frame itself
+                    return frame
+                if canvas is None:
+                    canvas = np.zeros((h, w, 3), dtype=np.uint8)
+                # Layers are anchored top-left, as in CompositeVideoClip
+                fh, fw = min(frame.shape[0], h), min(frame.shape[1], w)
+                canvas[:fh, :fw] = frame[:fh, :fw, :3]
+        return canvas if canvas is not None else np.zeros((h, w, 3), dtype=np.uint8)
+
+
+class RenderGraphCompiler:
+    """Compiles segment plans into flat programs, reusing unchanged ones.
+
+    Every layer and segment program gets a structural hash of what it
+    computes (decoder, output size, time mapping, effect chain). Programs are
+    kept by hash in a bounded LRU, so after an edit only the segments whose
+    structure changed are compiled again. The output of effect chains is
+    memoised in ``effectCache``, shared by all programs.
+    """
+
+    compiled: int
+    reused: int
+    effectCache: FrameCache
+
+    def __init__(self, maxPrograms: int = 1024, effectCacheBytes: int = 128 * 1024 * 1024) -> None:
+        self.maxPrograms = maxPrograms
+        self.compiled = 0
+        self.reused = 0
+        self.effectCache = FrameCache(effectCacheBytes)
+        self._programs: OrderedDict[str, LayerProgram | SegmentProgram] = OrderedDict()
+
+    def compile(self, plan: SegmentPlan, decoders: dict[int, VideoClip], size: tuple[int, int],
+                width: int | None, fps: int) -> list[SegmentProgram | None]:
+        """Compile every segment of ``plan``.
+
+        Args:
+            plan (SegmentPlan): segments of the timeline
+            decoders (dict[int, VideoClip]): clip to decode for each timeline clip, by ``id``
+            size (tuple[int, int]): output frame size
+            width (int | None): width layers are scaled to, None to keep the source size
+            fps (int): timeline framerate
+
+        Returns:
+            list[SegmentProgram | None]: one program per segment, None where no video layer is active
+        """
+        programs = []
+        for segment in plan:
+            layers = []
+            for _, clip in segment.layers:
+                decoder = decoders.get(id(clip))
+                if decoder is None:
+                    continue
+                layer = self._compileLayer(clip, decoder, (segment.start - clip.start_frame) / fps, width)
+                if layer is not None:
+                    layers.append(layer)
+
+            if not layers:
+                programs.append(None)
+                continue
+            key = self._hash(("segment", size, [layer.key for layer in layers]))
+            programs.append(self._lookup(key, lambda: SegmentProgram(key, size, layers)))
+        return programs
+
+    def _compileLayer(self, clip: TimelineVideoClip, decoder: VideoClip, offset: float, width: int | None) -> LayerProgram | None:
+        chain = EffectChain(clip.effects)
+        speed = chain.speed
+        # The clip shows its source from the beginning, sped up by the speed effects
+        duration = decoder.duration / speed - offset
+        if duration <= 0:
+            return None
+
+        size = None
+        if width is not None and decoder.w != width:
+            size = (width, int(decoder.h * width / decoder.w))
+
+        key = self._hash((
+            "layer", sourceHash(clip.source), id(decoder), size, offset, speed, effectChainHash(clip.effects),
+        ))
+
+        def build() -> LayerProgram:
+            effects = None
+            if not chain.isIdentity():
+                # Effects of the same decoded frames at the same size share their results, wherever the clip is
+                baseKey = self._hash(("effects", sourceHash(clip.source), id(decoder), size))
+                effects = MemoizedEffectChain(clip.effects, self.effectCache, baseKey)
+            return LayerProgram(
+                key, decoder, offset * speed, speed, duration, [resizeKernel(size)] if size else [], effects,
+            )
+        return self._lookup(key, build)
+
+    def _lookup(self, key: str, build: Callable):
+        program = self._programs.get(key)
+        if program is None:
+            program = build()
+            self._programs[key] = program
+            self.compiled += 1
+            while len(self._programs) > self.maxPrograms:
+                self._programs.popitem(last=False)
+        else:
+            self._programs.move_to_end(key)
+            self.reused += 1
+        return program
+
+    @staticmethod
+    def _hash(description) -> str:
+        return hashlib.sha1(repr(description).encode()).hexdigest()
+
+
+def outputSize(decoders: list[VideoClip], width: int | None = None) -> tuple[int, int]:
+    """Frame size of a render: large enough for every layer, once scaled to ``width`` (16:9 black if there is none)."""
+    if not decoders:
+        width = width or 1280
+        return width, max(width * 9 // 16, 2)
+    sizes = [(d.w, d.h) if width is None or d.w == width else (width, int(d.h * width / d.w)) for d in decoders]
+    return max(w for w, _ in sizes), max(h for _, h in sizes)
+
+
+def renderTimelines(timelines: list[Timeline], fps: int, width: int | None = None, useProxies: bool = False,
+                    compiler: RenderGraphCompiler | None = None) -> tuple[VideoClip, AudioClip]:
+    """Build the video and audio of the timelines.
+
+    Args:
+        timelines (list[Timeline]): tracks to render, ``timelines[0]`` being the top layer
+        fps (int): timeline framerate
+        width (int | None): width clips are scaled to (preview), None for the original size (export)
+        useProxies (bool): decode clips from their proxies when available
+        compiler (RenderGraphCompiler | None): compile the segments into flat programs; without it, each
+            segment is built from MoviePy subclips and CompositeVideoClip
+
+    Returns:
+        tuple[VideoClip, AudioClip]: timeline video and audio (an AudioMixer when there is any)
+    """
+    plan = planSegments(timelines)
+    decoders = {}
+    layerClips = {}
+    audioTracks = []
+    sampleRate = AudioMixer.SAMPLE_RATE
+
+    def addAudio(audio: AudioClip | None, clip, gains: np.ndarray, converted: bool = True) -> None:
+        if audio is None or audio.duration is None:
+            return
+        if converted and clip.source.pcmPath:
+            # Read from the PCM converted on import rather than decoding and resampling now
+            audio = PcmAudioClip(clip.source.pcmPath, sampleRate, AudioMixer.CHANNELS)
+        # Boundaries are rounded once, to the sample the clip's first frame falls on
+        start = int(round(clip.start_frame * sampleRate / fps))
+        length = int(round(min(clip.duration_frames / fps, audio.duration) * sampleRate))
+        if length > 0:
+            audioTracks.append(MixTrack(audio, start, length, gains))
+
+    for timeline in timelines:
+        for clip in timeline.clips:
+            match clip:
+                case TimelineVideoClip():
+                    decoder = clip.getVideoClip(useProxies)
+                    decoders[id(clip)] = decoder
+
+                    # The compiled plan scales and applies effects itself; this clip
+                    # is still used for the audio and by the MoviePy path
+                    c = decoder
+                    if compiler is None and width is not None and c.w != width:
+                        c = c.resized(width=width)
+                    c = apply_video_effects(c, clip.effects)
+                    layerClips[id(clip)] = c
+
+                    # Speed effects change the audio too, so it is then taken from the clip with effects
+                    retimed = any(effect.effect == VideoEffectEnum.SPEED for effect in clip.effects)
+                    addAudio(c.audio, clip, np.ones(AudioMixer.CHANNELS, dtype=np.float32), converted=not retimed)
+
+                case TimelineAudioClip():
+                    addAudio(clip.audioClip, clip, effectGains(clip.effects))
+
+                case _:
+                    pass
+
+    size = outputSize(list(decoders.values()), width)
+
+    if compiler is not None:
+        renderers = [program.render if program else None for program in compiler.compile(plan, decoders, size, width, fps)]
+    else:
+        renderers = [_moviepySegment(segment, layerClips, size, fps) for segment in plan]
+
+    videoClip = SegmentedVideoClip(plan, renderers, size, fps)
+    audioClip = AudioMixer(audioTracks, sampleRate) if audioTracks else AudioClip()
+    return videoClip, audioClip
+
+
+def _moviepySegment(segment, layerClips: dict[int, VideoClip], size: tuple[int, int], fps: int):
+    pieces = []
+    for _, clip in segment.layers:
+        source = layerClips.get(id(clip))
+        if source is None:
+            continue
+        # Offset of the segment in the clip, which starts at the beginning of its source
+        start = (segment.start - clip.start_frame) / fps
+        end = min((segment.end - clip.start_frame) / fps, source.duration)
+        if start < end:
+            pieces.append(source.subclipped(start, end))
+
+    if not pieces:
+        return None
+    if len(pieces) == 1 and pieces[0].size == size:
+        return pieces[0].get_frame
+    return CompositeVideoClip(pieces, size=size).get_frame
+
+
+def benchmarkTimelines(paths: list[str], fps: int = 24) -> list[Timeline]:
+    """Timelines used by the benchmarks: every file on its own track, each starting one second
+    after the previous one so that layers overlap, with black & white and contrast on the top one."""
+    timelines = []
+    for i, path in enumerate(paths):
+        source = Source()
+        source.filepath, source.name = path, path
+        timeline = Timeline(f"Video {i + 1}")
+        clip = TimelineVideoClip(path, source, i * fps, fps=fps)
+        timeline.add_clip(clip)
+        timelines.insert(0, timeline)
+    timelines[0].clips[0].effects = [
+        VideoEffect(VideoEffectEnum.BLACK_AND_WHITE, {}),
+        VideoEffect(VideoEffectEnum.CONTRAST, {"lum": 10, "contrast": 0.5}),
+    ]
+    return timelines
+
+
+def benchmark(paths: list[str], frames: int = 96, width: int = 640, fps: int = 24) -> dict[str, float]:
+    """Compare the frames per second of the compiled plan and of the MoviePy composite.
+
+    The same frames of ``benchmarkTimelines(paths)`` are rendered sequentially with both paths.
+    """
+    timelines = benchmarkTimelines(paths, fps)
+
+    results = {}
+    reference = None
+    for name, compiler in (("moviepy", None), ("compiled", RenderGraphCompiler())):
+        clip, _ = renderTimelines(timelines, fps, width=width, compiler=compiler)
+        count = min(frames, int(clip.duration * fps))
+        clip.get_frame(0)   # open the decoders
+        start = time.perf_counter()
+        rendered = [clip.get_frame(i / fps) for i in range(count)]
+        results[name] = count / (time.perf_counter() - start)
+        if reference is None:
+            reference = rendered
+        else:
+            results["maxDifference"] = float(max(np.abs(a.astype(int) - b).max() for a, b in zip(reference, rendered)))
+    return results
+
+
+if __name__ == "__main__":
+    # python -m controller.RenderGraph video1.mp4 [video2.mp4 ...]
+    for name, value in benchmark(sys.argv[1:]).items():
+        print(f"{name}: {value:.1f}")
@@ -0,0 +1,120 @@
+import bisect
+
+from model.Timeline import Timeline
+from model.TimelineClip import TimelineClip
+
+
+class Segment:
+    """Span of the timeline ``[start, end)`` (in frames) over which the same clips are active.
+
+    ``layers`` lists the active clips as ``(layerIndex, clip)`` pairs, bottom
+    layer first, which is the order they are composited in.
+    """
+
+    start: int
+    end: int
+    layers: list[tuple[int, TimelineClip]]
+
+    def __init__(self, start: int, end: int, layers: list[tuple[int, TimelineClip]]) -> None:
+        self.start = start
+        self.end = end
+        self.layers = layers
+
+    def __len__(self) -> int:
+        return len(self.layers)
+
+    def __repr__(self) -> str:
+        return f"Segment({self.start}, {self.end}, {[(layer, clip.title) for layer, clip in self.layers]})"
+
+    @property
+    def duration(self) -> int:
+        return self.end - self.start
+
+    def clips(self) -> list[TimelineClip]:
+        return [clip for _, clip in self.layers]
+
+
+class SegmentPlan:
+    """Ordered, non-overlapping segments covering every clip of the timelines.
+
+    Gaps where no clip is active are not represented. Since segments are
+    disjoint and sorted, "which clips are active at frame f" is a binary
+    search over their starts.
+    """
+
+    segments: list[Segment]
+
+    def __init__(self, segments: list[Segment]) -> None:
+        self.segments = segments
+        self._starts = [segment.start for segment in segments]
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def __iter__(self):
+        return iter(self.segments)
+
+    @property
+    def end(self) -> int:
+        """First frame after the last clip (0 for an empty timeline)."""
+        return self.segments[-1].end if self.segments else 0
+
+    def segmentIndexAt(self, frame: int) -> int | None:
+        i = bisect.bisect_right(self._starts, frame) - 1
+        if i >= 0 and frame < self.segments[i].end:
+            return i
+        return None
+
+    def segmentAt(self, frame: int) -> Segment | None:
+        """Segment containing ``frame``, in O(log n); None in a gap."""
+        i = self.segmentIndexAt(frame)
+        return self.segments[i] if i is not None else None
+
+    def activeAt(self, frame: int) -> list[tuple[int, TimelineClip]]:
+        """Active ``(layerIndex, clip)`` pairs at ``frame``, bottom layer first."""
+        segment = self.segmentAt(frame)
+        return segment.layers if segment else []
+
+    def segmentsBetween(self, start: int, end: int) -> list[Segment]:
+        """Segments overlapping the frames ``[start, end)``."""
+        i = max(bisect.bisect_right(self._starts, start) - 1, 0)
+        j = bisect.bisect_left(self._starts, end)
+        return [segment for segment in self.segments[i:j] if segment.end > start]
+
+
+def planSegments(timelines: list[Timeline]) -> SegmentPlan:
+    """Split the timelines into the minimal list of segments with a constant set of active clips.
+
+    Sweep line over the clip boundaries: boundaries are sorted once
+    (O(n log n)), then every clip enters and leaves the active set exactly
+    once. ``timelines[0]`` is the top layer, as in the timeline widget.
+    """
+    events = []
+    for index, timeline in enumerate(timelines):
+        layer = len(timelines) - index
+        for clip in timeline.clips:
+            if clip.end > clip.start_frame:
+                events.append((clip.start_frame, 1, layer, clip))
+                events.append((clip.end, -1, layer, clip))
+    # Leaving clips sort before entering ones at the same frame
+    events.sort(key=lambda event: (event[0], event[1]))
+
+    segments = []
+    active: dict[int, tuple[int, TimelineClip]] = {}
+    i = 0
+    while i < len(events):
+        frame = events[i][0]
+        # Apply every boundary at this frame before opening the next segment
+        while i < len(events) and events[i][0] == frame:
+            _, kind, layer, clip = events[i]
+            if kind > 0:
+                active[id(clip)] = (layer, clip)
+            else:
+                active.pop(id(clip), None)
+            i += 1
+
+        if active and i < len(events):
+            layers = sorted(active.values(), key=lambda pair: pair[0])
+            segments.append(Segment(frame, events[i][0], layers))
+
+    return SegmentPlan(segments)
@@ -0,0 +1,103 @@
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtGui import QImage
+from moviepy.config import FFMPEG_BINARY
+
+from controller.utils.cacheDirectory import fileHash, getCacheDir
+from model.Source import Source
+
+
+class ThumbnailController(QObject):
+    """Generates and serves filmstrip thumbnails of video sources.
+
+    Thumbnails are extracted in the background in a single ffmpeg pass, one
+    every ``INTERVALS[0]`` seconds, and stored on disk under the source's
+    content hash with the timestamp (in ms) as file name. The coarser densities
+    are subsets of the finest one, so zooming only changes which tiles are
+    drawn. Once loaded, tiles are kept in memory so painting never decodes.
+    """
+
+    INTERVALS = (1.0, 4.0, 16.0)   # seconds between two thumbnails, finest first
+    THUMB_HEIGHT = 54
+
+    thumbnailsReady = Signal(object)          # Source
+    thumbnailsFailed = Signal(object, str)    # Source, reason
+
+    def __init__(self, maxWorkers: int = 2, parent=None) -> None:
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix="thumbnails")
+        self._images: dict[str, dict[int, QImage]] = {}
+        self._lock = threading.Lock()
+
+    def generateThumbnails(self, source: Source) -> None:
+        """Queue the thumbnail extraction of a source; ``thumbnailsReady`` is emitted when done."""
+        self._executor.submit(self._generate, source)
+
+    def _generate(self, source: Source) -> None:
+        try:
+            directory = os.path.join(getCacheDir("thumbnails"), fileHash(source.filepath))
+            if not os.path.isfile(os.path.join(directory, ".complete")):
+                self._extract(source.filepath, directory)
+
+            images = {}
+            for name in os.listdir(directory):
+                if name.endswith(".jpg"):
+                    image = QImage(os.path.join(directory, name))
+                    if not image.isNull():
+                        images[int(name[:-4])] = image
+
+            with self._lock:
+                self._images[source.filepath] = images
+            self.thumbnailsReady.emit(source)
+        except subprocess.CalledProcessError as e:
+            self.thumbnailsFailed.emit(source, e.stderr.decode(errors="replace").strip())
+        except Exception as e:
+            self.thumbnailsFailed.emit(source, str(e))
+
+    def _extract(self, path: str, directory: str) -> None:
+        tmpDirectory = f"{directory}.{threading.get_ident()}.part"
+        shutil.rmtree(tmpDirectory, ignore_errors=True)
+        os.makedirs(tmpDirectory)
+        interval = self.INTERVALS[0]
+        subprocess.run(
+            [
+                FFMPEG_BINARY, "-y", "-loglevel", "error",
+                "-i", path, "-an",
+                "-vf", f"fps=1/{interval},scale=-2:{self.THUMB_HEIGHT}",
+                "-q:v", "5",
+                os.path.join(tmpDirectory, "%08d.jpg"),
+            ],
+            check=True,
+            capture_output=True,
+        )
+        # Name each tile after its timestamp so lookups do not depend on the density
+        for name in os.listdir(tmpDirectory):
+            timeMs = int(round((int(name[:-4]) - 1) * interval * 1000))
+            os.replace(os.path.join(tmpDirectory, name), os.path.join(tmpDirectory, f"{timeMs}.jpg"))
+        open(os.path.join(tmpDirectory, ".complete"), "w").close()
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmpDirectory, directory)
+
+    def getStrip(self, source: Source, pixelsPerSecond: float) -> tuple[float, dict[int, QImage]] | None:
+        """Return the thumbnail interval suited to the zoom level and the loaded tiles, or None if not ready.
+
+        The finest density whose tiles do not overlap at ``pixelsPerSecond`` is used.
+        """
+        with self._lock:
+            images = self._images.get(source.filepath)
+        if not images:
+            return None
+
+        thumbWidth = next(iter(images.values())).width()
+        for interval in self.INTERVALS:
+            if interval * pixelsPerSecond >= thumbWidth:
+                return interval, images
+        return self.INTERVALS[-1], images
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
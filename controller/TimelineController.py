@@ -8,6 +8,8 @@ from model.TimelineClip import TimelineAudioClip, TimelineClip, TimelineVideoCli
 if TYPE_CHECKING:
     # import only for type checking to avoid circular imports at runtime
     from views.VideoEditor import VideoEditor
+    from controller.WaveformController import WaveformController
+    from controller.AudioConversionController import AudioConversionController
 
 
 class TimelineController:
@@ -15,6 +17,8 @@ class TimelineController:
     view: "VideoEditor"
     timelines: list[Timeline]
     videoPreviewController: VideoPreviewController
+    waveformController: "WaveformController | None"
+    audioConversionController: "AudioConversionController | None"
     
     def __init__(self, view) -> None:
         # keep a reference to the view instance (injected by the view)
@@ -22,6 +26,8 @@ class TimelineController:
         self.view = view
         self.timelines = []
         self.videoPreviewController = None
+        self.waveformController = None
+        self.audioConversionController = None
 
         if hasattr(self.view, "clipClicked"):
             self.view.clipClicked.connect(self.onClipClicked)
@@ -35,10 +41,36 @@ class TimelineController:
             clip = TimelineVideoClip(name, source, start_frame, fps=24)
         else: #timeline.type == AUDIO
             clip = TimelineAudioClip(name, source, start_frame)
+            if self.waveformController is not None:
+                self.waveformController.analyze(source)
+            if self.audioConversionController is not None:
+                self.audioConversionController.convert(source)
         self.view.timeline.timeline_view.updateLayout()
         return clip
 
 
+    def onClipMoved(self, clip: TimelineClip, old_start: int, new_start: int) -> None:
+        """Re-render the frames left and newly covered by a moved clip."""
+        if old_start == new_start:
+            return
+        clip.end = clip.start_frame + clip.duration_frames
+        self.markDirty(min(old_start, new_start), max(old_start, new_start) + clip.duration_frames)
+
+    def onClipResized(self, clip: TimelineClip, old_duration: int, new_duration: int) -> None:
+        """Re-render the frames between the old and the new end of a resized clip."""
+        if old_duration == new_duration:
+            return
+        clip.end = clip.start_frame + clip.duration_frames
+        self.markDirty(
+            clip.start_frame + min(old_duration, new_duration),
+            clip.start_frame + max(old_duration, new_duration),
+        )
+
+    def markDirty(self, start: int, end: int) -> None:
+        """Invalidate the preview for the timeline frames ``[start, end)`` only."""
+        if self.videoPreviewController is not None and end > start:
+            self.videoPreviewController.updateTimeline(self.timelines, start, end)
+
     def onClipClicked(self, clip):
         self.selectedClip = clip
         print(f"[TimelineController] Selected clip: {clip.title}")
\ No newline at end of file
@@ -11,26 +11,22 @@ from controller.utils.VarConstraintChecker import constraintPositiveNumber, cons
 from .utils.VarConstraintChecker import constraintPositiveNumber, constraintNotEmptyText
 
 from model.Effects import VideoEffectEnum
+from controller.EffectKernels import EffectChain
 
 
 def apply_video_effects(video_clip, effects):
-	"""Apply all stored VideoEffects sequentially."""
+	"""Apply all stored VideoEffects.
+
+	Speed changes only remap time; the pixel effects are fused by EffectChain
+	and run as a single transform per frame instead of one MoviePy effect each.
+	"""
 	for eff in effects:
-		if eff.effect == VideoEffectEnum.BLACK_AND_WHITE:
-			video_clip = videoBlackWhiteEffect(video_clip)
-		elif eff.effect == VideoEffectEnum.SPEED:
+		if eff.effect == VideoEffectEnum.SPEED:
 			speed = eff.params.get("speed", 1.0)
 			video_clip = videoSpeedEffect(video_clip, speed)
-		elif eff.effect == VideoEffectEnum.CONTRAST:
-			lum = eff.params.get("lum", 0)
-			contrast = eff.params.get("contrast", 1)
-			video_clip = videoContrastEffect(video_clip, lum, contrast)
-		elif eff.effect == VideoEffectEnum.SATURATION:
-			saturation = eff.params.get("saturation", 1)
-			video_clip = videoSaturationEffect(video_clip, saturation)
-		elif eff.effect == VideoEffectEnum.ROTATION:
-			rotation = eff.params.get("rotation", 0)
-			video_clip = videoRotationEffect(video_clip, rotation)
+	chain = EffectChain(effects)
+	if not chain.isIdentity():
+		video_clip = video_clip.image_transform(chain.apply)
 	return video_clip
 
 
@@ -1,10 +1,23 @@
+import hashlib
+import threading
+import time
+from enum import Enum
+
 import numpy as np
-from PySide6.QtCore import QObject, QTimer, Signal
-from moviepy import AudioClip, AudioFileClip, CompositeAudioClip, VideoClip, CompositeVideoClip
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+from moviepy import AudioClip, AudioFileClip, VideoClip
 
-from controller.VideoController import cutVideo, apply_video_effects
+from controller.AudioPlaybackController import AudioPlaybackController
+from controller.DiskFrameCache import DiskFrameCache
+from controller.FrameCache import FrameCache
+from controller.FramePrefetcher import FramePrefetcher
+from controller.PlaybackClock import PlaybackClock
+from controller.RenderGraph import RenderGraphCompiler, renderTimelines
+from controller.SegmentPlanner import SegmentPlan, planSegments
+from controller.utils.cacheDirectory import getCacheDir, sourceHash
+from model.Effects import effectChainHash
 from model.Timeline import Timeline
-from model.TimelineClip import TimelineAudioClip, TimelineClip, TimelineVideoClip
+from model.TimelineClip import TimelineAudioClip, TimelineVideoClip
 from views.VideoPreviewWidget import VideoPreviewWidget
 from model.Source import Source
 
@@ -12,25 +25,22 @@ from controller.FileHandlerController import readVideoFile
 import os
 
 
-class SubClip:
-    """Sous-classe représentant un sous-clip, c-à-d un ensemble de clips de timeline qui se chevauchent"""
-    
-    clips: list[TimelineClip]
-    clipIndexes: list[int]
-    start: float
-    end: float
-    
-    def __init__(self, clips: list[TimelineClip], clipIndexes: list[int], start: float, end: float) -> None:
-        self.clips = clips
-        self.clipIndexes = clipIndexes
-        self.start = start
-        self.end = end
-        
-    def __len__(self) -> int:
-        return len(self.clips)
-    
-    def getClipAndIndex(self, i) -> tuple[TimelineClip, int]:
-        return self.clips[i], self.clipIndexes[i]
+class PreviewQuality(Enum):
+    """Preview resolution tiers; the value is the divisor applied to the preview width."""
+
+    FULL = 1
+    HALF = 2
+    QUARTER = 4
+    EIGHTH = 8
+
+    def lower(self) -> "PreviewQuality":
+        tiers = list(PreviewQuality)
+        return tiers[min(tiers.index(self) + 1, len(tiers) - 1)]
+
+    def higher(self) -> "PreviewQuality":
+        tiers = list(PreviewQuality)
+        return tiers[max(tiers.index(self) - 1, 0)]
+
 
 class VideoPreviewController(QObject):
     """Controller that manages playback and backend interaction."""
@@ -38,6 +48,8 @@ class VideoPreviewController(QObject):
     timeChanged = Signal(float)        # current time in seconds
     durationChanged = Signal(float)    # total duration
     playbackStateChanged = Signal(bool)  # True = playing, False = paused
+    frameRequested = Signal(int, object)  # frame index, frame rendered for a seek
+    qualityChanged = Signal(object)      # PreviewQuality
     
     widget: VideoPreviewWidget
     clip: VideoClip | None
@@ -47,23 +59,82 @@ class VideoPreviewController(QObject):
     currentTime: float
     isPlaying: bool
     previewFps: int
+    frameCache: FrameCache
+    diskCache: DiskFrameCache
+    prefetcher: FramePrefetcher
+    clock: PlaybackClock
+    audioPlayback: AudioPlaybackController
+    direction: int
+    droppedFrames: int
+    timelines: list[Timeline]
+    plan: SegmentPlan
+    renderCompiler: RenderGraphCompiler
+    compiledRender: bool
+    useProxies: bool
+    previewWidth: int
+    quality: PreviewQuality
+    autoQuality: bool
+    renderTime: float
 
-    def __init__(self, widget: VideoPreviewWidget, fps=60):
+    def __init__(self, widget: VideoPreviewWidget, fps=60, cacheBytes=256 * 1024 * 1024, bufferFrames=48,
+                 diskCacheBytes=2 * 1024 ** 3):
         super().__init__()
         self.widget = widget  # VideoPreviewWidget (view)
         self.clip = None
         self.audio = None
+        self.timelines = []
+        self.plan = SegmentPlan([])
+        self.renderCompiler = RenderGraphCompiler()
+        self.compiledRender = True
         self.fps = fps
         self.duration = 0
-        self.currentTime = 0
+        self.currentTime = 0  # position in timeline frames
         self.isPlaying = False
-        self.frames = []
+        # Frames are rendered on demand and kept in a memory-bounded LRU cache
+        self.frameCache = FrameCache(cacheBytes)
+        # Behind it, rendered frames persist on disk across edits and restarts
+        self.diskCache = DiskFrameCache(getCacheDir("frames"), diskCacheBytes)
         
         self.previewFps = 24
+        self.previewWidth = 640
+        self.useProxies = True
+        self.direction = 1
+
+        # Quality used while playing; stills are always rendered at FULL
+        self.quality = PreviewQuality.FULL
+        self.autoQuality = True
+        self.renderTime = 0.0  # moving average of the render time per frame, in seconds
+        self._headroomFrames = 0
+        self._tierClips = {}
+
+        # Decoding happens on the prefetch thread only; the lock protects
+        # the composite clip and the cache while an edit swaps them.
+        self._renderLock = threading.Lock()
+        self._pendingSeek = None
+        self._pendingCoarse = None
+        self.frameRequested.connect(self._onFrameRequested)
+        self.prefetcher = FramePrefetcher(self.renderFrame, self.frameRequested.emit, bufferFrames)
+        self.prefetcher.step = self.fps / self.previewFps
+        self.prefetcher.start()
+
+        # The playhead follows the wall clock, or the audio device when there is
+        # something to hear; the timer only decides when to present a frame
+        self.clock = PlaybackClock(self.fps)
+        self.audioPlayback = AudioPlaybackController(parent=self)
+        self.droppedFrames = 0
 
         # Timer for playback
         self.timer = QTimer()
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.timer.timeout.connect(self._update_frame)
+
+        # Frames are rendered at the size they are displayed at; resizes are
+        # debounced so dragging the window does not re-render every step
+        self._resizeTimer = QTimer()
+        self._resizeTimer.setSingleShot(True)
+        self._resizeTimer.setInterval(150)
+        self._resizeTimer.timeout.connect(self._fitPreviewToWidget)
+        self.widget.sizeChanged.connect(lambda _: self._resizeTimer.start())
         
     def getDuration(self):
         return self.duration
@@ -84,24 +155,167 @@ class VideoPreviewController(QObject):
     #         return False
     
     def loadVideo(self, timelines: list[Timeline]) -> bool:
-        self.clip, self.audio = self.render(timelines)
+        self.timelines = timelines
+        self.plan = planSegments(timelines)
+        # MoviePy may read frames while building clips, so keep the prefetch thread off the readers
+        with self._renderLock:
+            clip, audio = self.render(timelines)
+            self.clip, self.audio = clip, audio
+            self._tierClips = {PreviewQuality.FULL: clip}
+            self.frameCache.clear()
+        self._setAudio(audio)
 
         self.duration = int(round(self.clip.duration * self.fps))
         self.currentTime = 0
         self.durationChanged.emit(self.duration)
-
-        self.frames = [
-            self.clip.get_frame(t)
-            for t in np.arange(0, self.clip.duration, 1 / self.previewFps)
-        ]
+        self._fitPreviewToWidget()
 
         self.seek(0)
         return True
 
-    
+    def updateTimeline(self, timelines: list[Timeline], start: int, end: int) -> bool:
+        """Rebuild the composite after an edit touching only the frames ``[start, end)``.
+
+        Building the MoviePy composite is lazy and cheap; what costs is decoding,
+        so cached frames outside the edited interval are kept and only the dirty
+        ones will be rendered again.
+        """
+        if self.clip is None:
+            return self.loadVideo(timelines)
+
+        self.timelines = timelines
+        self.plan = planSegments(timelines)
+        # MoviePy may read frames while building clips, so keep the prefetch thread off the readers
+        with self._renderLock:
+            previousSize = self.clip.size
+            clip, audio = self.render(timelines)
+            self.clip, self.audio = clip, audio
+            self._tierClips = {PreviewQuality.FULL: clip}
+            if tuple(clip.size) != tuple(previousSize):
+                # The canvas fits every clip of the timeline: when it changes, every cached frame is stale
+                start, end = 0, max(self.duration, int(round(clip.duration * self.fps)))
+                self.frameCache.clear()
+            else:
+                self.frameCache.invalidate(start, end)
+        self._setAudio(audio)
+
+        duration = int(round(self.clip.duration * self.fps))
+        if duration != self.duration:
+            self.duration = duration
+            self.prefetcher.duration = duration
+            self.durationChanged.emit(self.duration)
+
+        if self.isPlaying:
+            self.prefetcher.invalidate(start, end, int(self.currentTime))
+        elif start <= self.currentTime < end or self.currentTime > self.duration:
+            self.seek(self.currentTime)
+        else:
+            self.prefetcher.invalidate(start, end, int(self.currentTime))
+        return True
+
+    def invalidateRange(self, start: int, end: int) -> bool:
+        """Re-render the last loaded timelines after an edit of the frames ``[start, end)``."""
+        return self.updateTimeline(self.timelines, start, end)
+
+    def getFrame(self, frameIndex: int, quality: PreviewQuality = PreviewQuality.FULL) -> np.ndarray:
+        """Return the composited frame at the given timeline frame, rendering it on a cache miss."""
+        key = (frameIndex, quality.value)
+        frame = self.frameCache.get(key)
+        if frame is not None:
+            return frame
+
+        diskKey = self.diskKeyFor(frameIndex, quality)
+        frame = self.diskCache.get(diskKey) if diskKey else None
+        if frame is None:
+            clip = self._clipForQuality(quality)
+            start = time.perf_counter()
+            frame = clip.get_frame(min(frameIndex / self.fps, clip.duration))
+            if quality == self.quality:
+                elapsed = time.perf_counter() - start
+                self.renderTime = elapsed if not self.renderTime else 0.8 * self.renderTime + 0.2 * elapsed
+            if diskKey:
+                self.diskCache.put(diskKey, frame)
+        self.frameCache.put(key, frame)
+        return frame
+
+    def diskKeyFor(self, frameIndex: int, quality: PreviewQuality) -> str | None:
+        """Content key of a preview frame for the disk cache, or None if no clip is visible.
+
+        The key is built from what the frame is made of: for each active video
+        clip, its layer, source hash, effect chain hash and frame in the
+        source, plus the preview resolution and the size of the canvas, which
+        depends on every clip of the timeline. Moving a clip or changing its
+        effects thus gives new keys, while untouched material keeps hitting.
+        """
+        layers = []
+        for layer, clip in self.plan.activeAt(frameIndex):
+            if isinstance(clip, TimelineVideoClip):
+                proxy = self.useProxies and clip.previewClip is not None
+                layers.append((
+                    layer, sourceHash(clip.source), proxy, clip.fps,
+                    effectChainHash(clip.effects), frameIndex - clip.start_frame,
+                ))
+        if not layers:
+            return None
+        size = tuple(self._clipForQuality(quality).size)
+        description = repr((layers, self.previewWidth // quality.value, size, self.fps))
+        return hashlib.sha1(description.encode()).hexdigest()
+
+    def renderFrame(self, frameIndex: int) -> np.ndarray:
+        """Thread-safe variant of getFrame, used by the prefetch thread.
+
+        Frames read ahead for playback use the current quality tier, stills
+        shown while paused are rendered at full quality.
+        """
+        with self._renderLock:
+            return self.getFrame(frameIndex, self.quality if self.isPlaying else PreviewQuality.FULL)
+
+    def _clipForQuality(self, quality: PreviewQuality) -> VideoClip:
+        clip = self._tierClips.get(quality)
+        if clip is None:
+            clip, _ = self.render(self.timelines, preview=True, scale=quality.value)
+            self._tierClips[quality] = clip
+        return clip
+
+    def setQuality(self, quality: PreviewQuality) -> None:
+        if quality != self.quality:
+            self.quality = quality
+            self.renderTime = 0.0
+            self._headroomFrames = 0
+            self.qualityChanged.emit(quality)
+
+    def _adaptQuality(self) -> None:
+        """Drop a tier when rendering is slower than realtime, climb back with enough headroom."""
+        if not self.autoQuality or not self.renderTime:
+            return
+
+        budget = 1 / self.previewFps
+        if self.renderTime > budget:
+            self.setQuality(self.quality.lower())
+        elif self.renderTime < budget / 3:
+            self._headroomFrames += 1
+            # Require sustained headroom before switching back up, to avoid oscillating
+            if self._headroomFrames >= self.previewFps:
+                self.setQuality(self.quality.higher())
+        else:
+            self._headroomFrames = 0
+
+    def setPlaybackDirection(self, direction: int) -> None:
+        """Play forward (1) or backward (-1); the prefetcher reads ahead in that direction."""
+        direction = 1 if direction >= 0 else -1
+        if direction != self.direction:
+            self.direction = direction
+            self.clock.setDirection(direction)
+            self.currentTime = self.clock.position()
+            if self.isPlaying:
+                self._syncAudio(self.currentTime)
+            self.prefetcher.restart(int(self.currentTime), direction)
+
     def play(self):
         if self.clip and not self.isPlaying:
             self.isPlaying = True
+            self._syncAudio(self.currentTime)
+            self.clock.start(self.currentTime, self.direction)
             self.timer.start(int((1 / self.previewFps) * 1000))
             self.playbackStateChanged.emit(True)
 
@@ -109,7 +323,12 @@ class VideoPreviewController(QObject):
         if self.isPlaying:
             self.isPlaying = False
             self.timer.stop()
+            self.currentTime = max(0, min(self.clock.stop(), self.duration))
+            self.audioPlayback.stop()
             self.playbackStateChanged.emit(False)
+            if self.quality != PreviewQuality.FULL and self.clip:
+                # Replace the last played frame by a sharp still
+                self.seek(self.currentTime)
 
     def togglePlayPause(self):
         if self.isPlaying:
@@ -122,149 +341,174 @@ class VideoPreviewController(QObject):
         self.seek(0)
 
     def seek(self, t: float):
+        """Move the playhead to the given timeline frame."""
         if not self.clip:
             return
         t = max(0, min(t, self.duration))
         self.currentTime = t
+        self.clock.seek(t)
+        if self.isPlaying:
+            self._syncAudio(t)
 
+        # The frame is rendered off the GUI thread and shown by _onFrameRequested.
+        # Unless it is cached, the nearest keyframe is shown first (it needs no
+        # decoding forward), then refined to the exact frame.
+        frameIndex = min(int(t), max(self.duration - 1, 0))
+        coarseIndex = self.keyframeBefore(frameIndex)
+        if coarseIndex == frameIndex or (frameIndex, PreviewQuality.FULL.value) in self.frameCache:
+            coarseIndex = None
+        self._pendingSeek = frameIndex
+        self._pendingCoarse = coarseIndex
+        self.prefetcher.requestFrame(frameIndex, coarseIndex)
+        self.prefetcher.restart(frameIndex, self.direction, self.duration)
+        self.timeChanged.emit(t)
 
+    def _setAudio(self, audio: AudioClip | None) -> None:
+        hadAudio = self.audioPlayback.hasAudio()
+        self.audioPlayback.setAudio(audio)
+        if self.isPlaying and self.audioPlayback.hasAudio() != hadAudio:
+            # Switch the clock between the audio device and the wall clock
+            self._syncAudio(self.clock.position())
 
-        frame = self.clip.get_frame(t)
-        self.widget.set_frame(frame)
-        self.timeChanged.emit(t)
+    def _syncAudio(self, frame: float) -> None:
+        """(Re)start the audio at ``frame`` and make the clock follow it.
+
+        Audio is only played forward; backward playback, or a timeline without
+        sound, runs on the wall clock.
+        """
+        if self.direction == 1 and self.audioPlayback.hasAudio():
+            self.audioPlayback.start(frame / self.fps)
+            self.clock.setTimeSource(self.audioPlayback.elapsed)
+        else:
+            self.audioPlayback.stop()
+            self.clock.setTimeSource(time.monotonic)
+        self.clock.seek(frame)
+
+    def _onFrameRequested(self, frameIndex: int, frame: np.ndarray):
+        # Ignore results of seeks that were superseded by a newer one
+        if self.isPlaying:
+            return
+        if frameIndex == self._pendingSeek:
+            self._pendingCoarse = None
+            self.widget.set_frame(frame)
+        elif frameIndex == self._pendingCoarse:
+            self.widget.set_frame(frame)
+
+    def keyframeBefore(self, frameIndex: int) -> int:
+        """Timeline frame of the keyframe preceding ``frameIndex`` in the topmost active video clip.
+
+        Returns ``frameIndex`` itself when every frame is a keyframe (proxies) or
+        the source has not been indexed yet.
+        """
+        for _, clip in reversed(self.plan.activeAt(frameIndex)):
+            if not isinstance(clip, TimelineVideoClip):
+                continue
+            keyframes = clip.source.keyframes
+            if keyframes is None or (self.useProxies and clip.previewClip is not None):
+                return frameIndex
+            sourceTime = (frameIndex - clip.start_frame) / self.fps
+            return clip.start_frame + int(round(keyframes.keyframeBefore(sourceTime) * self.fps))
+        return frameIndex
 
     def _update_frame(self):
-        if not self.frames:
+        if not self.clip:
             self.pause()
             return
 
-        frame_index = int(self.currentTime * self.previewFps)
-        if frame_index >= len(self.frames):
-            self.currentTime = self.duration
+        self.currentTime = self.clock.position()
+        frame_index = int(self.currentTime)
+        if frame_index >= self.duration or frame_index < 0:
             self.pause()
             self.timeChanged.emit(self.currentTime)
             return
 
-        frame = self.frames[frame_index]
-        self.widget.set_frame(frame)
+        frame = self.prefetcher.pop(frame_index)
+        if frame is None:
+            # Rendering is late: keep the last frame on screen and let the
+            # prefetcher skip ahead rather than slowing the clock down
+            self.droppedFrames += 1
+            self.prefetcher.catchUp(frame_index, int(np.ceil(2 * self.renderTime * self.fps)))
+        else:
+            self.widget.set_frame(frame)
+            self._adaptQuality()
         self.timeChanged.emit(self.currentTime)
 
-        # Increment time
-        self.currentTime += 1 / self.previewFps
+    def getDroppedFrames(self) -> int:
+        """Frames that were skipped because they were not rendered in time."""
+        return self.droppedFrames + self.prefetcher.buffer.dropped
+
+    def getAudioDrift(self) -> float:
+        """Seconds the audio device clock, which drives playback, is ahead of the wall clock."""
+        return self.audioPlayback.drift()
 
     def close(self):
         self.pause()
+        self.prefetcher.stop()
+        self.diskCache.close()
         if self.clip:
             self.clip.close()
             
-    def getClips(self, timelines: list[Timeline]) -> list[SubClip]: 
-        indexes = []
-        clips :list[TimelineClip] = []
-        subClips = []
-        
-        for t in timelines:
-            clips.extend(t.clips)
-            indexes.extend([len(timelines) - timelines.index(t)] * len(t.clips))
-            
-        clips.sort(key=lambda c: c.start_frame)
-        
-        if len(clips) == 1:
-            subClips.append(SubClip([clips[0]], [indexes[0]], clips[0].start_frame, clips[0].end))
-        
-        for i in range(len(clips) - 1):
-            if clips[i].end > clips[i+1].start_frame:
-                subClips.append(SubClip(
-                    [clips[i]], 
-                    [indexes[i]], 
-                    clips[i].start_frame, 
-                    clips[i].end
-                ))
-                
-                if clips[i].end < clips[i+1].end:
-                    subClips.append(SubClip(
-                            [clips[i], clips[i+1]], 
-                            [indexes[i], indexes[i+1]], 
-                            clips[i+1].start_frame, 
-                            clips[i].end
-                    ))
-                    subClips.append(SubClip(
-                        [clips[i+1]], 
-                        [indexes[i+1]], 
-                        clips[i].end, 
-                        clips[i+1].end
-                    ))
-                else:
-                    subClips.append(SubClip(
-                        [clips[i], clips[i+1]], 
-                        [indexes[i], indexes[i+1]], 
-                        clips[i+1].start_frame, 
-                        clips[i].end
-                    ))
-                    subClips.append(SubClip(
-                        [clips[i+1]], 
-                        [indexes[i+1]], 
-                        clips[i].end, 
-                        clips[i+1].end
-                    ))
-                    
-        return subClips
-        
-    def render(self, timelines: list[Timeline]) -> tuple[VideoClip, AudioClip]:
-        subClips = self.getClips(timelines)
-        videoClips = []
-        audioClips = []
-        
-        for subClip in subClips:
-            for i in range(len(subClip)):
-                clip, index = subClip.getClipAndIndex(i)
-                match clip:
-                    case TimelineVideoClip():
-                        frame = clip.end - clip.start_frame
-                        c, _ = cutVideo(clip.videoClip, frame, clip.fps)
-                        c.layer_index = index
-                        # c.start = clip.start_frame
-                        # c.end = clip.end
-                        # c.duration = c.end - c.start
-                        
-                        audioClips.append(c.audio)
-                        
-                        videoClips.append(c)
-                        break
-                    
-                    case TimelineAudioClip():
-                        # TODO
-                        # frame = (clip.end - clip.start) * clip.frequency
-                        # c = cutVideo(clip, frame, clip.frequency)
-                    
-                        break
-                        
-                    case _:
-                        pass
-        
-        videoClip, audioClip = None, None
-        if len(videoClips) == 0:
-            videoClip = VideoClip()
-        else:
-            videoClip = CompositeVideoClip(videoClips).resized(width=640)
+    def render(self, timelines: list[Timeline], preview: bool = True, scale: int = 1) -> tuple[VideoClip, AudioClip]:
+        """Build the composite of the timelines.
 
-        if len(audioClips) == 0:
-            audioClip = AudioClip()
-        else:
-            audioClip = CompositeAudioClip(audioClips)
+        In preview mode clips are decoded from their proxies (when enabled and
+        available) and scaled down to ``previewWidth / scale`` before compositing;
+        otherwise the original sources are used at full resolution, for export.
+
+        Unless ``compiledRender`` is off, segments are compiled into flat
+        programs calling the decoders and kernels directly (see RenderGraph).
+        """
+        return renderTimelines(
+            timelines, self.fps,
+            width=max(self.previewWidth // scale, 2) if preview else None,
+            useProxies=preview and self.useProxies,
+            compiler=self.renderCompiler if self.compiledRender else None,
+        )
+
+    def setPreviewWidth(self, width: int) -> None:
+        """Render preview frames at a new width, re-rendering what was cached at the old one."""
+        width = max(2, width - width % 2)
+        if width != self.previewWidth:
+            self.previewWidth = width
+            if self.clip is not None:
+                self.invalidateRange(0, self.duration)
+
+    def _fitPreviewToWidget(self) -> None:
+        if self.clip is None or not self.clip.w or not self.clip.h:
+            return
+        self.setPreviewWidth(self.widget.targetSize(self.clip.w, self.clip.h).width())
+
+    def setUseProxies(self, enabled: bool) -> None:
+        """Switch preview decoding between proxies and original sources."""
+        if enabled != self.useProxies:
+            self.useProxies = enabled
+            if self.clip is not None:
+                self.invalidateRange(0, self.duration)
 
-        return videoClip, audioClip
+    def onProxyReady(self, source: Source) -> None:
+        """Start using a freshly generated proxy for the clips made from ``source``."""
+        for timeline in self.timelines:
+            for clip in timeline.clips:
+                if isinstance(clip, TimelineVideoClip) and clip.source is source and clip.loadProxy():
+                    if self.useProxies:
+                        self.invalidateRange(clip.start_frame, clip.end)
+
+    def onAudioReady(self, source: Source) -> None:
+        """Mix the clips made from ``source`` from its converted audio from now on."""
+        if self.clip is None:
+            return
+        if any(clip.source is source for timeline in self.timelines for clip in timeline.clips):
+            # Only the audio changes: no cached frame is invalidated
+            self.updateTimeline(self.timelines, 0, 0)
 
     def refreshPreview(self, selectedClip):
-        """Rebuild the current clip preview when effects are added."""
+        """Re-render the frames covered by a clip when effects are added."""
         if not selectedClip or not hasattr(selectedClip, "videoClip"):
             print("[VideoPreviewController] No valid clip to preview.")
             return
 
         try:
-            processed_clip = apply_video_effects(selectedClip.videoClip, getattr(selectedClip, "effects", []))
-            self.clip = processed_clip
-            self.duration = processed_clip.duration
-            self.seek(0)
+            self.invalidateRange(selectedClip.start_frame, selectedClip.end)
             print(f"[VideoPreviewController] Preview refreshed with {len(selectedClip.effects)} effect(s).")
         except Exception as e:
             print(f"[VideoPreviewController] Error refreshing preview: {e}")
@@ -0,0 +1,177 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PySide6.QtCore import QObject, Signal
+from moviepy import AudioClip
+
+from controller.FileHandlerController import readAudioFile
+from controller.utils.cacheDirectory import fileHash, getCacheDir
+from model.Source import Source
+
+
+class WaveformPeaks:
+    """Min/max peak pyramid of an audio source, mixed down to mono.
+
+    ``levels[bucket]`` is a ``(mins, maxs)`` pair of float32 arrays where each
+    entry summarises ``bucket`` consecutive samples.
+    """
+
+    sampleRate: int
+    levels: dict[int, tuple[np.ndarray, np.ndarray]]
+
+    def __init__(self, sampleRate: int, levels: dict[int, tuple[np.ndarray, np.ndarray]]) -> None:
+        self.sampleRate = sampleRate
+        self.levels = levels
+
+    def levelFor(self, samplesPerPixel: float) -> int:
+        """Coarsest bucket size that still gives at least one bucket per pixel."""
+        buckets = sorted(self.levels)
+        chosen = buckets[0]
+        for bucket in buckets:
+            if bucket <= samplesPerPixel:
+                chosen = bucket
+        return chosen
+
+    def peaksForPixels(self, firstSample: float, samplesPerPixel: float, count: int) -> tuple[np.ndarray, np.ndarray]:
+        """Per-pixel min and max for ``count`` pixel columns starting at ``firstSample``.
+
+        Only the visible columns are computed, so the cost does not depend on the
+        length of the source.
+        """
+        bucket = self.levelFor(samplesPerPixel)
+        mins, maxs = self.levels[bucket]
+        edges = (firstSample + np.arange(count) * samplesPerPixel) / bucket
+        edges = np.clip(edges.astype(np.int64), 0, len(mins) - 1)
+        if not len(edges):
+            return np.zeros(0, dtype=mins.dtype), np.zeros(0, dtype=maxs.dtype)
+        # reduceat runs its last reduction to the end of the array: stop it at the last visible column
+        endEdge = int(np.ceil((firstSample + count * samplesPerPixel) / bucket))
+        endEdge = max(min(endEdge, len(mins)), edges[-1] + 1)
+        first = edges[0]
+        edges = edges - first
+        return (np.minimum.reduceat(mins[first:endEdge], edges),
+                np.maximum.reduceat(maxs[first:endEdge], edges))
+
+
+def computePeaks(audioClip: AudioClip, levels: tuple[int, ...], blockSize: int = 65536) -> WaveformPeaks:
+    """Read the samples of an audio clip once and build its peak pyramid.
+
+    ``blockSize`` must be a multiple of every level so that buckets never
+    straddle two blocks, and smaller than the reader's buffer (200000 samples
+    by default in MoviePy), which returns silence for larger requests.
+    """
+    sampleRate = audioClip.fps
+    total = int(audioClip.duration * sampleRate)
+    finest = levels[0]
+    mins, maxs = [], []
+
+    for start in range(0, total, blockSize):
+        samples = audioClip.get_frame(np.arange(start, min(start + blockSize, total)) / sampleRate)
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim == 2:
+            # Mono envelope of all channels
+            low, high = samples.min(axis=1), samples.max(axis=1)
+        else:
+            low, high = samples, samples
+
+        pad = (-len(low)) % finest
+        if pad:
+            low = np.concatenate([low, np.full(pad, low[-1], dtype=np.float32)])
+            high = np.concatenate([high, np.full(pad, high[-1], dtype=np.float32)])
+        mins.append(low.reshape(-1, finest).min(axis=1))
+        maxs.append(high.reshape(-1, finest).max(axis=1))
+
+    base = (
+        np.concatenate(mins) if mins else np.zeros(1, dtype=np.float32),
+        np.concatenate(maxs) if maxs else np.zeros(1, dtype=np.float32),
+    )
+    pyramid = {finest: base}
+    for bucket in levels[1:]:
+        # Coarser levels are reductions of the finest one, no need to re-read samples
+        group = bucket // finest
+        low, high = base
+        pad = (-len(low)) % group
+        low = np.concatenate([low, np.full(pad, low[-1], dtype=np.float32)])
+        high = np.concatenate([high, np.full(pad, high[-1], dtype=np.float32)])
+        pyramid[bucket] = (low.reshape(-1, group).min(axis=1), high.reshape(-1, group).max(axis=1))
+
+    return WaveformPeaks(sampleRate, pyramid)
+
+
+class WaveformController(QObject):
+    """Computes waveform peak pyramids of audio sources in the background.
+
+    Pyramids are persisted as ``.npz`` files in the cache directory under the
+    source's content hash, so each file is only analysed once.
+    """
+
+    LEVELS = (256, 4096, 65536)   # samples per bucket
+
+    waveformReady = Signal(object)          # Source
+    waveformFailed = Signal(object, str)    # Source, reason
+
+    def __init__(self, maxWorkers: int = 2, parent=None) -> None:
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix="waveforms")
+        self._peaks: dict[str, WaveformPeaks] = {}
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+
+    def analyze(self, source: Source) -> None:
+        """Queue the analysis of a source, unless it is already known or in progress."""
+        with self._lock:
+            if source.filepath in self._peaks or source.filepath in self._pending:
+                return
+            self._pending.add(source.filepath)
+        self._executor.submit(self._analyze, source)
+
+    def _analyze(self, source: Source) -> None:
+        try:
+            path = os.path.join(getCacheDir("waveforms"), f"{fileHash(source.filepath)}.npz")
+            if os.path.isfile(path):
+                peaks = self._load(path)
+            else:
+                # A reader of our own, so playback is not disturbed by the analysis
+                audioClip, _ = readAudioFile(source)
+                try:
+                    peaks = computePeaks(audioClip, self.LEVELS)
+                finally:
+                    audioClip.close()
+                self._save(path, peaks)
+
+            with self._lock:
+                self._peaks[source.filepath] = peaks
+            self.waveformReady.emit(source)
+        except Exception as e:
+            self.waveformFailed.emit(source, str(e))
+        finally:
+            with self._lock:
+                self._pending.discard(source.filepath)
+
+    def getPeaks(self, source: Source) -> WaveformPeaks | None:
+        with self._lock:
+            return self._peaks.get(source.filepath)
+
+    @staticmethod
+    def _save(path: str, peaks: WaveformPeaks) -> None:
+        arrays = {"sampleRate": np.array(peaks.sampleRate)}
+        for bucket, (low, high) in peaks.levels.items():
+            arrays[f"min_{bucket}"] = low
+            arrays[f"max_{bucket}"] = high
+        tmpPath = path + ".part.npz"
+        np.savez(tmpPath, **arrays)
+        os.replace(tmpPath, path)
+
+    @staticmethod
+    def _load(path: str) -> WaveformPeaks:
+        with np.load(path) as data:
+            levels = {
+                int(name[4:]): (data[name], data[f"max_{name[4:]}"])
+                for name in data.files if name.startswith("min_")
+            }
+            return WaveformPeaks(int(data["sampleRate"]), levels)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -4,3 +4,7 @@ class ConstraintException(Exception):
 
 class UnhandledFileFormatException(Exception):
 	pass
+
+
+class ExportCancelledException(Exception):
+	pass
@@ -0,0 +1,39 @@
+import hashlib
+import os
+
+
+def getCacheDir(name: str) -> str:
+	"""Return (and create) a sub-directory of the PyDEO cache.
+
+	The cache lives in $PYDEO_CACHE_DIR if set, else in $XDG_CACHE_HOME/pydeo
+	or ~/.cache/pydeo.
+	"""
+	root = os.environ.get("PYDEO_CACHE_DIR") or os.path.join(
+		os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "pydeo"
+	)
+	path = os.path.join(root, name)
+	os.makedirs(path, exist_ok=True)
+	return path
+
+
+def fileHash(path: str, sampleSize: int = 1024 * 1024) -> str:
+	"""Return a content hash of a media file, cheap enough to compute on import.
+
+	Only the size and the first and last ``sampleSize`` bytes are hashed, so the
+	key survives renames and moves but changes whenever the file is re-encoded.
+	"""
+	size = os.path.getsize(path)
+	digest = hashlib.sha1(str(size).encode())
+	with open(path, "rb") as f:
+		digest.update(f.read(sampleSize))
+		if size > sampleSize:
+			f.seek(max(sampleSize, size - sampleSize))
+			digest.update(f.read(sampleSize))
+	return digest.hexdigest()
+
+
+def sourceHash(source) -> str:
+	"""Return the content hash of a Source, computing it only once."""
+	if source.contentHash is None:
+		source.contentHash = fileHash(source.filepath)
+	return source.contentHash
@@ -12,13 +12,30 @@ if __name__ == "__main__":
     
     # File menu
     file_menu = menu_bar.addMenu("Fichier")
-    import_action = file_menu.addAction("Importer une vidéo")
+    import_action = file_menu.addAction("Importer des médias...")
     import_action.triggered.connect(editor.importVideo)
+
+    import_folder_action = file_menu.addAction("Importer un dossier...")
+    import_folder_action.triggered.connect(editor.importFolder)
+
+    cancel_import_action = file_menu.addAction("Annuler l'import")
+    cancel_import_action.triggered.connect(editor.cancelImport)
     
     export_action = file_menu.addAction("Exporter la vidéo")
     export_action.triggered.connect(editor.exportVideo)
     export_action.setEnabled(True)
     editor.exportBtn = export_action  # Store reference for enabling later
+
+    cancel_export_action = file_menu.addAction("Annuler l'export")
+    cancel_export_action.triggered.connect(editor.cancelExport)
+
+    workers_action = file_menu.addAction("Processus d'export...")
+    workers_action.triggered.connect(editor.setExportWorkers)
+
+    smart_render_action = file_menu.addAction("Rendu intelligent")
+    smart_render_action.setCheckable(True)
+    smart_render_action.setChecked(editor.smartRender)
+    smart_render_action.toggled.connect(editor.setSmartRender)
     
     file_menu.addSeparator()
     exit_action = file_menu.addAction("Quitter")
@@ -1,3 +1,6 @@
+import hashlib
+import json
+import os
 from enum import Enum
 from typing import Any
 
@@ -9,9 +12,13 @@ class VideoEffectEnum(Enum):
     CONTRAST = 3
     SATURATION = 4
     ROTATION = 5
+    BRIGHTNESS = 6
+    LUT = 7
     
 class AudioEffectEnum(Enum):
-    pass
+
+    VOLUME = 1
+    PAN = 2
     
 class VideoEffect:
     effect: VideoEffectEnum
@@ -29,3 +36,20 @@ class AudioEffect:
         self.effect = effect
         self.params = params
 
+
+def effectChainHash(effects: list[VideoEffect | AudioEffect]) -> str:
+    """Hash of an ordered list of effects and their parameters.
+
+    Two chains with the same effects, in the same order and with the same
+    parameters, give the same hash. A LUT is hashed with the modification
+    time and size of its file, so editing the ``.cube`` gives new keys, also
+    in the caches kept across sessions.
+    """
+    chain = []
+    for effect in effects:
+        item = (effect.effect.name, effect.params)
+        if effect.effect == VideoEffectEnum.LUT and os.path.isfile(effect.params.get("path", "")):
+            stat = os.stat(effect.params["path"])
+            item += (stat.st_mtime_ns, stat.st_size)
+        chain.append(item)
+    return hashlib.sha1(json.dumps(chain, sort_keys=True, default=str).encode()).hexdigest()
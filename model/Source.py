@@ -1,6 +1,19 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from controller.KeyframeController import KeyframeIndex
+
+
 class Source:
     filepath: str
     name: str
+    proxyPath: str | None  # low-resolution copy used for preview, if generated
+    keyframes: "KeyframeIndex | None"  # keyframe timestamps, once the source has been scanned
+    contentHash: str | None  # fileHash of the source, computed on first use
+    pcmPath: str | None  # audio converted to the project rate and layout, once done
     
     def __init__(self) -> None:
-        pass
\ No newline at end of file
+        self.proxyPath = None
+        self.keyframes = None
+        self.contentHash = None
+        self.pcmPath = None
\ No newline at end of file
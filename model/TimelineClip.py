@@ -16,17 +16,22 @@ class TimelineClip:
         self.source = source
         self.title = title
         self.start_frame = start_frame
+
+    def close(self) -> None:
+        """Release the readers of the clip."""
         
 class TimelineVideoClip(TimelineClip):
     videoClip: VideoClip
     audioClip: AudioClip | None
+    previewClip: VideoClip | None  # proxy of the source, used for preview only
     fps: int
     effects: list[VideoEffect]
     
     def __init__(self, name: str, source: Source, start_frame: int, duration_frame = -1, fps = None):
         super().__init__(name, source, start_frame)
         
-        self.videoClip, self.audioClip, self.fps = readVideoFile(source)
+        # Clips of the same source share their decoders (see DecoderPool)
+        self.videoClip, self.audioClip, self.fps = readVideoFile(source, shared=True)
         
         if duration_frame < 0:
             self.duration_frames = seconds_to_frames(self.videoClip.duration, fps or self.fps)
@@ -35,6 +40,27 @@ class TimelineVideoClip(TimelineClip):
 
         self.end = self.start_frame + self.duration_frames
         self.effects = []
+        self.previewClip = None
+        self.loadProxy()
+
+    def loadProxy(self) -> bool:
+        """Open the proxy of the source for preview, if one has been generated."""
+        if not getattr(self.source, "proxyPath", None):
+            return False
+        # A previous proxy clip may still be used by compiled renders: its handle is released once they drop it
+        self.previewClip, _, _ = readVideoFile(self.source, useProxy=True, shared=True)
+        return True
+
+    def getVideoClip(self, preview: bool = False) -> VideoClip:
+        """Return the clip to decode: the proxy for preview when available, else the original."""
+        if preview and self.previewClip is not None:
+            return self.previewClip
+        return self.videoClip
+
+    def close(self) -> None:
+        for clip in (self.videoClip, self.audioClip, self.previewClip):
+            if clip is not None:
+                clip.close()
         
             
         
@@ -46,7 +72,7 @@ class TimelineAudioClip(TimelineClip):
     def __init__(self, name: str, source: Source, start_frame: int, duration_frame = -1):
         super().__init__(name, source, start_frame)
         
-        self.audioClip, self.frequency = readAudioFile(source)
+        self.audioClip, self.frequency = readAudioFile(source, shared=True)
         
         # TODO : a revoir
         if duration_frame < 0:
@@ -54,4 +80,8 @@ class TimelineAudioClip(TimelineClip):
         else:
             self.duration_frames = duration_frame
 
-        self.effects = []
\ No newline at end of file
+        self.end = self.start_frame + self.duration_frames
+        self.effects = []
+
+    def close(self) -> None:
+        self.audioClip.close()
@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout,
-                               QPushButton, QLabel)
+                               QPushButton, QLabel, QFileDialog, QInputDialog)
 
 from model.Effects import VideoEffect, VideoEffectEnum
 
@@ -27,7 +27,8 @@ class EffectsTab(QWidget):
             "Zoom": VideoEffectEnum.SPEED,
             "Fondu": None,
             "Dissolution": None,
-            "Luminosité": None,
+            "Luminosité": VideoEffectEnum.BRIGHTNESS,
+            "LUT (.cube)": VideoEffectEnum.LUT,
         }
 
         for effect_name, effect_enum in self.effects.items():
@@ -65,8 +66,21 @@ class EffectsTab(QWidget):
             print(f"[EffectsTab] Effect '{name}' not implemented yet.")
             return
 
+        params = {}
+        if effect_enum == VideoEffectEnum.LUT:
+            path, _ = QFileDialog.getOpenFileName(self, "Importer un LUT", "", "LUT (*.cube)")
+            if not path:
+                return
+            params["path"] = path
+        elif effect_enum == VideoEffectEnum.BRIGHTNESS:
+            factor, ok = QInputDialog.getDouble(self, "Luminosité", "Facteur de luminosité :", 1.2, 0.0, 4.0, 2)
+            # A factor of 1 changes nothing and would only cost a stage (and prevent stream copies)
+            if not ok or factor == 1.0:
+                return
+            params["brightness"] = factor
+
         # Store the effect in the clip's model
-        clip.effects.append(VideoEffect(effect_enum, {}))
+        clip.effects.append(VideoEffect(effect_enum, params))
         print(f"[EffectsTab] Applied {name} to clip '{clip.title}'")
 
         self.timelineController.videoPreviewController.refreshPreview(clip)
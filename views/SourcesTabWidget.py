@@ -1,5 +1,5 @@
 from PySide6.QtCore import Signal
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QScrollArea, QPushButton, QHBoxLayout, QLabel
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QScrollArea, QPushButton, QHBoxLayout, QLabel, QCheckBox
 
 from controller.SourceController import SourceController
 from controller.TimelineController import TimelineController
@@ -20,6 +20,8 @@ class SourcesTabWidget(QWidget):
     """
 
     importRequested = Signal()
+    importFolderRequested = Signal()
+    proxyToggled = Signal(bool)
     
     timeline_controller: TimelineController
 
@@ -47,14 +49,22 @@ class SourcesTabWidget(QWidget):
         self.importVideoBtn = QPushButton("Importer une source")
         self.importVideoBtn.clicked.connect(self.importRequested.emit)
         btnRow.addWidget(self.importVideoBtn)
+        self.importFolderBtn = QPushButton("Importer un dossier")
+        self.importFolderBtn.clicked.connect(self.importFolderRequested.emit)
+        btnRow.addWidget(self.importFolderBtn)
+        self.proxyCheckBox = QCheckBox("Proxys pour l'aperçu")
+        self.proxyCheckBox.setChecked(True)
+        self.proxyCheckBox.setToolTip("Lire des copies basse résolution des sources pendant l'aperçu (l'export utilise toujours les originaux)")
+        self.proxyCheckBox.toggled.connect(self.proxyToggled.emit)
+        btnRow.addWidget(self.proxyCheckBox)
         layout.addLayout(btnRow)
 
         self.source_controller = source_controller
         self.timeline_controller = timeline_controller
 
     # ----- Public API -----------------------------------------------------
-    def addSourceItem(self, fileName: str, durationSec: float, filePath: str) -> None:
-        """Append a simple row widget describing an imported source."""
+    def addSourceItem(self, fileName: str, durationSec: float, filePath: str) -> Source:
+        """Append a simple row widget describing an imported source and return that source."""
         laSource = Source()
         laSource.name = fileName
         laSource.filepath = filePath
@@ -77,6 +87,7 @@ class SourcesTabWidget(QWidget):
         self.tracksLayout.insertWidget(self.tracksLayout.count() - 1, row)
 
         self.source_controller.sources.append(laSource)
+        return laSource
 
     def selectTimelineAndAddClipToTrack(self, laSource: Source):
         chooseTrack = ChooseTrackDialog(self.timeline_controller, laSource)
@@ -97,4 +108,7 @@ class SourcesTabWidget(QWidget):
         if clip is TimelineVideoClip:
             self.selectTimelineAndAddClipToTrack(Source(c))
         
-        self.timeline_controller.view.videoController.loadVideo(self.timeline_controller.timelines)
+        # Only the frames covered by the new clip need to be rendered again
+        self.timeline_controller.view.videoController.updateTimeline(
+            self.timeline_controller.timelines, clip.start_frame, clip.end
+        )
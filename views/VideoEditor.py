@@ -1,6 +1,6 @@
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                               QPushButton, QFileDialog, QLabel, QToolButton, QSplitter, 
-                              QScrollArea, QSlider, QDialog, QTabWidget, QLayout)
+                              QScrollArea, QSlider, QDialog, QTabWidget, QLayout, QInputDialog)
 from PySide6.QtCore import Qt, QTimer
 from moviepy import VideoClip
 from moviepy.video.io.VideoFileClip import VideoFileClip
@@ -21,7 +21,18 @@ from .PlaybackControlsWidget import PlaybackControlsWidget
 from .ToolbarWidget import ToolbarWidget
 from .SourcesTabWidget import SourcesTabWidget
 
-from controller.FileHandlerController import readVideoFile
+from controller.AudioConversionController import AudioConversionController
+from controller.AudioMixer import AudioMixer
+from controller.ClipResizeController import ClipResizeController
+from controller.DecoderPool import getDecoderPool
+from controller.ExportController import ExportController
+from controller.FileHandlerController import AUDIO_EXTENSIONS, VIDEO_EXTENSIONS
+from controller.ImportController import ImportController, expandPaths
+from controller.KeyframeController import KeyframeController
+from controller.MediaProbe import MediaIndex
+from controller.ThumbnailController import ThumbnailController
+from controller.WaveformController import WaveformController
+from controller.ProxyController import ProxyController
 from controller.SourceController import SourceController
 from controller.TimelineController import TimelineController
 
@@ -51,6 +62,8 @@ class VideoEditor(QMainWindow):
     timeline: TimelineWidget
     statusManager: StatusManager
     isPlaying: bool
+    exportWorkers: int
+    smartRender: bool
 
     videoController: VideoPreviewController
 
@@ -61,6 +74,8 @@ class VideoEditor(QMainWindow):
         self.clips = []  # Store clip information for timeline
         self.currentPlayTime = 0
         self.timelines = []  # List to manage all timelines dynamically
+        self.exportWorkers = os.cpu_count() or 1  # processes rendering export chunks in parallel
+        self.smartRender = True  # copy untouched parts of the sources instead of re-encoding them
         
         # Create main widget and layout
         mainWidget = QWidget()
@@ -129,9 +144,37 @@ class VideoEditor(QMainWindow):
 
         # Tabs on the right side: Sources (custom widget) & Effects
         self.timelineController = TimelineController(self)
+        self.timelineController.videoPreviewController = self.videoController
         self.sourceController = SourceController()
         self.sourcesTab = SourcesTabWidget(self.timelineController, self.sourceController)
         self.sourcesTab.importRequested.connect(self.importVideo)
+        self.sourcesTab.importFolderRequested.connect(self.importFolder)
+
+        # Preview proxies are transcoded in the background after each import
+        self.proxyController = ProxyController(parent=self)
+        self.proxyController.proxyReady.connect(self.onProxyReady)
+        self.proxyController.proxyFailed.connect(self.onProxyFailed)
+        self.sourcesTab.proxyToggled.connect(self.setUseProxies)
+
+        # Imports read durations and formats from a persistent probe index instead of opening a decoder,
+        # on a pool of worker threads; sources are added as each file is probed
+        self.mediaIndex = MediaIndex()
+        self.importController = ImportController(self.mediaIndex, parent=self)
+        self.importController.fileImported.connect(self.onFileImported)
+        self.importController.fileFailed.connect(
+            lambda path, reason: print(f"[VideoEditor] Import failed for {path}: {reason}")
+        )
+        self.importController.progressChanged.connect(self.onImportProgress)
+        self.importController.importFinished.connect(self.onImportFinished)
+        self.importController.importCancelled.connect(
+            lambda: self.statusManager.update_status("État: Import annulé")
+        )
+
+        # Each source is scanned once for its keyframes, used for fast scrubbing
+        self.keyframeController = KeyframeController(parent=self)
+        self.keyframeController.indexFailed.connect(
+            lambda source, reason: print(f"[VideoEditor] Keyframe index failed for {source.name}: {reason}")
+        )
 
         self.effectsTab = EffectsTab()
         self.effectsTab.timelineController = self.timeline.timeline_view.controller  # Défini le controller pour les effets
@@ -181,6 +224,49 @@ class VideoEditor(QMainWindow):
         
         # Add timelines to the list
         self.timelines.append(self.timeline)
+
+        # Filmstrips of video clips, generated in the background on import
+        self.thumbnailController = ThumbnailController(parent=self)
+        self.thumbnailController.thumbnailsReady.connect(
+            lambda _: self.timeline.timeline_view.viewport().update()
+        )
+        self.timeline.timeline_view.thumbnails = self.thumbnailController
+
+        # Waveforms of audio clips, analysed in the background when they are added
+        self.waveformController = WaveformController(parent=self)
+        self.waveformController.waveformReady.connect(
+            lambda _: self.timeline.timeline_view.viewport().update()
+        )
+        self.timeline.timeline_view.waveforms = self.waveformController
+        self.timelineController.waveformController = self.waveformController
+
+        # Source audio is converted once to the mix rate and layout, then read from the cache
+        self.audioConversionController = AudioConversionController(AudioMixer.SAMPLE_RATE, AudioMixer.CHANNELS, parent=self)
+        self.audioConversionController.audioReady.connect(self.videoController.onAudioReady)
+        self.audioConversionController.audioFailed.connect(
+            lambda source, reason: print(f"[VideoEditor] Audio conversion failed for {source.name}: {reason}")
+        )
+        self.timelineController.audioConversionController = self.audioConversionController
+
+        # Exports run on a background thread and report their progress to the status bar
+        self.exportController = ExportController(parent=self)
+        self.exportController.progressChanged.connect(self.onExportProgress)
+        self.exportController.exportFinished.connect(self.onExportFinished)
+        self.exportController.exportFailed.connect(
+            lambda reason: self.statusManager.update_status(f"Erreur d'export: {reason}")
+        )
+        self.exportController.exportCancelled.connect(
+            lambda: self.statusManager.update_status("État: Export annulé")
+        )
+
+        # Moving or resizing a clip only invalidates the frames it covered
+        self.resizeController = ClipResizeController(self)
+        self.resizeController.clipMoved.connect(self.timelineController.onClipMoved)
+        self.resizeController.clipResized.connect(self.timelineController.onClipResized)
+        self.resizeController.resizeFailed.connect(
+            lambda clip, reason: self.statusManager.update_status(f"Erreur: {reason}")
+        )
+        self.timeline.set_resize_controller(self.resizeController)
         
         # Status area
         self.statusManager = StatusManager()
@@ -200,11 +286,13 @@ class VideoEditor(QMainWindow):
         mainLayout.addWidget(timelineContainer)
         mainLayout.addWidget(self.statusManager.status_label)
         
-        self.timeline.timeline_view.dragSignal.connect(self.onVideoTimeChanged)
+        self.timeline.timeline_view.dragSignal.connect(self.onPlayheadDragged)
+        self.timeline.timeline_view.playbackRequested.connect(self.updatePlayback)
         # Connect video preview signals
         self.videoController.timeChanged.connect(self.onVideoTimeChanged)
         self.videoController.durationChanged.connect(self.onVideoDurationChanged)
         self.videoController.playbackStateChanged.connect(self.onPlaybackStateChanged)
+        self.videoController.qualityChanged.connect(self.onPreviewQualityChanged)
 
         self.setCentralWidget(mainWidget)
 
@@ -225,29 +313,71 @@ class VideoEditor(QMainWindow):
 
     
     def importVideo(self) -> None:
-        """Open a file dialog, load a video, and reflect it in the UI."""
-        filePath, _ = QFileDialog.getOpenFileName(
-            self, "Sélectionner une vidéo", "", "Fichiers vidéo (*.mp4 *.avi *.mov *.mkv)"
+        """Open a file dialog and import the selected media files in the background."""
+        patterns = " ".join(f"*{extension}" for extension in VIDEO_EXTENSIONS + AUDIO_EXTENSIONS)
+        filePaths, _ = QFileDialog.getOpenFileNames(
+            self, "Sélectionner des médias", "", f"Fichiers médias ({patterns})"
         )
-        if not filePath:
-            return
-        
-        source = Source()
-        source.filepath = filePath
-        source.name = os.path.basename(source.filepath)
-        videoClip, audioClip, frame = readVideoFile(source)
-
-            # Add to the Sources tab list
-        try:
-            duration = videoClip.duration
-        except Exception:
-            duration = 0.0
-        self.sourcesTab.addSourceItem(source.name, duration, source.filepath)
-
-        # Inform status bar; the rest of the UI (slider, play button)
-        # is updated via VideoPreviewController signals we connect below.
-        self.statusManager.update_status(f"État: Vidéo chargée - {os.path.basename(filePath)}")
+        if filePaths:
+            self.importPaths(filePaths)
+
+    def importFolder(self) -> None:
+        """Import every media file of a folder and its sub-folders in the background."""
+        directory = QFileDialog.getExistingDirectory(self, "Sélectionner un dossier")
+        if directory:
+            self.importPaths([directory])
+
+    def importPaths(self, paths: list[str]) -> None:
+        known = {source.filepath for source in self.sourceController.sources}
+        count = self.importController.importPaths([path for path in expandPaths(paths) if path not in known])
+        if count:
+            self.statusManager.update_status(f"État: Import de {count} fichier(s)...")
+        else:
+            self.statusManager.update_status("Erreur: Aucun nouveau fichier média à importer")
+
+    def cancelImport(self) -> None:
+        self.importController.cancel()
+
+    def onFileImported(self, filePath: str, info, contentHash: str) -> None:
+        """Add a probed file to the Sources tab and start its background jobs."""
+        source = self.sourcesTab.addSourceItem(os.path.basename(filePath), info.duration, filePath)
+        source.contentHash = contentHash
+        if info.hasVideo:
+            self.keyframeController.indexSource(source)
+            self.thumbnailController.generateThumbnails(source)
+            if self.proxyController.enabled:
+                self.proxyController.generateProxy(source)
+        elif info.hasAudio:
+            self.waveformController.analyze(source)
+        if info.hasAudio:
+            self.audioConversionController.convert(source)
+
+    def onImportProgress(self, done: int, total: int, filesPerSecond: float) -> None:
+        self.statusManager.update_status(f"État: Import {done}/{total} — {filesPerSecond:.1f} fichiers/s")
+
+    def onImportFinished(self, imported: int, failed: int) -> None:
+        message = f"État: {imported} source(s) importée(s)"
+        if failed:
+            message += f", {failed} échec(s)"
+        self.statusManager.update_status(message)
     
+    def setUseProxies(self, enabled: bool) -> None:
+        """Toggle preview proxies; missing proxies are generated when turned on."""
+        self.proxyController.enabled = enabled
+        if enabled:
+            for source in self.sourceController.sources:
+                if source.proxyPath is None:
+                    self.proxyController.generateProxy(source)
+        self.videoController.setUseProxies(enabled)
+        self.statusManager.update_status(f"État: Proxys {'activés' if enabled else 'désactivés'}")
+
+    def onProxyReady(self, source: Source) -> None:
+        self.videoController.onProxyReady(source)
+        self.statusManager.update_status(f"État: Proxy prêt - {source.name}")
+
+    def onProxyFailed(self, source: Source, reason: str) -> None:
+        self.statusManager.update_status(f"Erreur: Proxy impossible pour {source.name}: {reason}")
+
     # def addTrack(self) -> None:
     #     if not self.sourceVideo:
     #         return
@@ -281,12 +411,11 @@ class VideoEditor(QMainWindow):
     
     # Legacy helper kept for reference; playback is driven by VideoPreviewController
     def updatePlayback(self, wantPlay):
+        # The timeline playhead follows the preview clock through timeChanged
         if wantPlay:
             self.videoController.play()
-            self.timeline.timeline_view.startPlayback() 
         else:
             self.videoController.pause()
-            self.timeline.timeline_view.stopPlayback() 
     # def updatePlayback(self):
     #     if not self.sourceVideo:
     #         return
@@ -342,34 +471,48 @@ class VideoEditor(QMainWindow):
         if not filePath:
             return
 
-        try:
+        # The export runs in the background: streamed to ffmpeg with one worker,
+        # rendered in parallel chunks with more, copying untouched spans with smart rendering
+        if self.exportController.start(self.timelineController.timelines, self.videoController.fps,
+                                       filePath, self.exportWorkers, self.smartRender):
             self.statusManager.update_status(f"État: Export en cours vers {filePath}...")
-
-            # Render the full timeline at full resolution and FPS
-            videoClip, audioClip = self.videoController.render(self.timelineController.timelines)
-
-            # If audio exists, attach it
-            if audioClip:
-                videoClip.audio = audioClip
-
-            # Export using MoviePy (full FPS & resolution)
-            # Optional: adjust codec, preset, bitrate for faster or higher quality export
-            videoClip.write_videofile(
-                filePath,
-                fps=self.videoController.fps,
-                codec="libx264",
-                audio_codec="aac",
-                preset="medium",
-                threads=4,
-                temp_audiofile="temp-audio.m4a",
-                remove_temp=True,
-            )
-
-            self.statusManager.update_status(f"État: Vidéo exportée vers {filePath}")
-
-        except Exception as e:
-            self.statusManager.update_status(f"Erreur d'export: {str(e)}")
+        else:
+            self.statusManager.update_status("Erreur: Un export est déjà en cours")
+
+    def cancelExport(self) -> None:
+        if self.exportController.isRunning():
+            self.exportController.cancel()
+            self.statusManager.update_status("État: Annulation de l'export...")
+
+    def onExportProgress(self, done: int, total: int, throughput: dict) -> None:
+        labels = {"render": "rendu {:.1f} i/s", "encode": "encodage {:.1f} i/s", "audio": "audio {:.1f}x"}
+        stages = [label.format(throughput[stage]) for stage, label in labels.items() if stage in throughput]
+        if "queue" in throughput:
+            stages.append(f"file {throughput['queue']:.0%}")
+        details = f" — {', '.join(stages)}" if stages else ""
+        self.statusManager.update_status(f"État: Export {100 * done // max(total, 1)}%{details}")
+
+    def onExportFinished(self, path: str, report: dict | None) -> None:
+        message = f"État: Vidéo exportée vers {path}"
+        if report:
+            fps = self.videoController.fps
+            message += (f" (copiés {report['copiedFrames'] / fps:.1f} s, "
+                        f"réencodés {report['encodedFrames'] / fps:.1f} s)")
+        self.statusManager.update_status(message)
+
+    def setSmartRender(self, enabled: bool) -> None:
+        self.smartRender = enabled
+        self.statusManager.update_status(f"État: Rendu intelligent {'activé' if enabled else 'désactivé'}")
     
+    def setExportWorkers(self) -> None:
+        """Ask how many processes render the export in parallel."""
+        workers, ok = QInputDialog.getInt(
+            self, "Processus d'export", "Nombre de processus :", self.exportWorkers, 1, 4 * (os.cpu_count() or 1)
+        )
+        if ok:
+            self.exportWorkers = workers
+            self.statusManager.update_status(f"État: Export sur {workers} processus")
+
     def onVideoTimeChanged(self, time):
         """Called when video time changes during playback"""
         print(time)
@@ -380,6 +523,13 @@ class VideoEditor(QMainWindow):
         #self.timeline.setCurrentTime(time)
         self.updateTimeDisplay()
 	
+    def onPlayheadDragged(self, frame):
+        """Seek the preview when the timeline playhead is moved by hand"""
+        if self.videoController.clip is None:
+            self.onVideoTimeChanged(frame)
+        else:
+            self.videoController.seek(frame)
+
     def onVideoDurationChanged(self, duration):
         """Called when a new video is loaded"""
         print(duration)
@@ -393,6 +543,11 @@ class VideoEditor(QMainWindow):
         self.isPlaying = isPlaying
         self.playbackControls.setIsPlaying(isPlaying)
 	
+    def onPreviewQualityChanged(self, quality):
+        """Called when the preview switches resolution tier to keep up with realtime"""
+        label = "pleine" if quality.value == 1 else f"1/{quality.value}"
+        self.statusManager.update_status(f"État: Qualité de l'aperçu: {label}")
+	
     def onSliderPressed(self):
         """Pause when user grabs the slider"""
         if self.isPlaying:
@@ -410,4 +565,14 @@ class VideoEditor(QMainWindow):
     def onSliderReleased(self):
         """Resume playback if it was playing before"""
         if hasattr(self, '__wasPlaying__') and self.__wasPlaying__:
-            self.videoController.play()
\ No newline at end of file
+            self.videoController.play()
+
+    def closeEvent(self, event):
+        """Stop playback and background work, and save the frame cache index"""
+        self.exportController.shutdown()
+        self.importController.shutdown()
+        self.audioConversionController.shutdown()
+        self.mediaIndex.close()
+        self.videoController.close()
+        getDecoderPool().close()
+        super().closeEvent(event)
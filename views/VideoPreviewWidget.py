@@ -1,65 +1,100 @@
 from PySide6.QtWidgets import QWidget, QSizePolicy
-from PySide6.QtCore import Qt, QEvent
+from PySide6.QtCore import Qt, QEvent, QSize, Signal
 from PySide6.QtGui import QPainter, QBrush, QColor, QImage, QPixmap
 import numpy as np
 
 
 class VideoPreviewWidget(QWidget):
     currentFrame: None
-    currentPixmap: QPixmap | None
+    currentImage: QImage | None
     videoDuration: float
     currentTime: float
-    
+
+    BUFFER_COUNT = 3
+
+    sizeChanged = Signal(QSize)  # new widget size, so frames can be rendered at that size upstream
+
     """Widget to display video preview"""
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumSize(768, 432)
         self.setStyleSheet("background-color: #000;")
-        self.currentPixmap = None
+        self.currentImage = None
+
+        # Pool of pre-allocated, C-contiguous frame buffers, each wrapped once
+        # by a QImage sharing its memory. Frames are copied into the next buffer
+        # in turn, so no array or image is allocated per frame.
+        self._buffers: list[tuple[np.ndarray, QImage]] = []
+        self._nextBuffer = 0
+        self._scaledImage = None
+        self._scaledSize = None
+
+    def targetSize(self, frameWidth: int, frameHeight: int) -> QSize:
+        """Size at which a frame of the given dimensions is displayed (aspect ratio kept)."""
+        return QSize(frameWidth, frameHeight).scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio)
 
     def set_frame(self, frame):
-        """Receive a numpy frame (from MoviePy) and convert to QPixmap."""
+        """Receive a numpy frame (from MoviePy) and present it through the buffer pool."""
         if frame is None:
-            self.currentPixmap = None
+            self.currentImage = None
+            self._scaledImage = None
             self.update()
             return
 
-        # Ensure the numpy buffer is C-contiguous. MoviePy can return
-        # views or Fortran-ordered arrays which are not acceptable
-        # for QImage memoryview; this prevents BufferError:
-        # "memoryview: underlying buffer is not C-contiguous"
-        frame = np.ascontiguousarray(frame)
-
         h, w, ch = frame.shape
-        bytes_per_line = ch * w
-
-        if ch == 3:
-            q_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-        elif ch == 4:
-            q_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format.Format_RGBA8888)
-        else:
+        if ch not in (3, 4):
             return
 
-        self.currentPixmap = QPixmap.fromImage(q_image)
+        if not self._buffers or self._buffers[0][0].shape != frame.shape:
+            self._allocateBuffers(w, h, ch)
+
+        # np.copyto accepts views and Fortran-ordered arrays (which QImage cannot
+        # wrap) and writes them straight into the contiguous buffer
+        buffer, image = self._buffers[self._nextBuffer]
+        self._nextBuffer = (self._nextBuffer + 1) % len(self._buffers)
+        np.copyto(buffer, frame, casting="unsafe")
+
+        self.currentImage = image
+        self._scaledImage = None
         self.update()
-        
+
+    def _allocateBuffers(self, w: int, h: int, ch: int) -> None:
+        imageFormat = QImage.Format.Format_RGB888 if ch == 3 else QImage.Format.Format_RGBA8888
+        self._buffers = []
+        for _ in range(self.BUFFER_COUNT):
+            buffer = np.zeros((h, w, ch), dtype=np.uint8)
+            self._buffers.append((buffer, QImage(buffer.data, w, h, ch * w, imageFormat)))
+        self._nextBuffer = 0
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self._scaledImage = None
+        self.sizeChanged.emit(self.size())
+
     def paintEvent(self, event: QEvent) -> None:
         """Draw the current frame"""
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
 
         painter.setBrush(QBrush(QColor(0, 0, 0)))
         painter.drawRect(self.rect())
 
-        if self.currentPixmap:
-            scaled = self.currentPixmap.scaled(
-                self.size(),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            x = (self.width() - scaled.width()) // 2
-            y = (self.height() - scaled.height()) // 2
-            painter.drawPixmap(x, y, scaled)
+        if self.currentImage:
+            image = self.currentImage
+            size = self.targetSize(image.width(), image.height())
+            if size != image.size():
+                # Frames are normally rendered at the target size upstream; when
+                # they are not, scale once and reuse until the frame or size changes
+                if self._scaledImage is None or self._scaledSize != size:
+                    self._scaledImage = image.scaled(
+                        size,
+                        Qt.AspectRatioMode.IgnoreAspectRatio,
+                        Qt.TransformationMode.SmoothTransformation
+                    )
+                    self._scaledSize = size
+                image = self._scaledImage
+            x = (self.width() - image.width()) // 2
+            y = (self.height() - image.height()) // 2
+            painter.drawImage(x, y, image)
         else:
             painter.setPen(QColor(100, 100, 100))
             painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Aucune vidéo chargée")
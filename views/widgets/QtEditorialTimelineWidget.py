@@ -10,11 +10,12 @@ from PySide6.QtWidgets import (
     QGraphicsItem,
 )
 from PySide6.QtGui import QPainter, QPen, QColor, QPolygonF, QFont
-from PySide6.QtCore import Qt, QRectF, QTimer, QPointF
+from PySide6.QtCore import Qt, QRectF, QPointF, QLineF
 from PySide6.QtCore import Signal
 
 from controller.TimelineController import TimelineController
 from controller.VideoController import frames_to_timecode
+from model.TimelineClip import TimelineAudioClip, TimelineVideoClip
 # --- Default Constants (can be overridden by theme) ---
 from model.WidgetConfig import DEFAULT_CONSTANTS
 
@@ -35,6 +36,7 @@ THEMES = {
         "clip_fill": "#6496C8",
         "clip_fill_selected": "#96C8FF",
         "clip_border": "#000000",
+        "waveform_color": "#1E3C5A",
         "end_line_color": "#C83232",
         "background_color": "#111111",
     },
@@ -53,6 +55,7 @@ THEMES = {
         "clip_fill": "#90CAF9",
         "clip_fill_selected": "#64B5F6",
         "clip_border": "#000000",
+        "waveform_color": "#1565C0",
         "end_line_color": "#E53935",
         "background_color": "#FFFFFF",
     },
@@ -431,7 +434,9 @@ class ClipItem(QGraphicsItem):
         self.theme = theme
         self.rect = QRectF()
         self.setFlags(
-            QGraphicsItem.ItemIsSelectable | QGraphicsItem.ItemIsMovable
+            QGraphicsItem.ItemIsSelectable
+            | QGraphicsItem.ItemIsMovable
+            | QGraphicsItem.ItemUsesExtendedStyleOption  # exposedRect for the filmstrip
         )
         self._fixed_y = 0
         self._resize_handle = None  # left, right
@@ -459,6 +464,8 @@ class ClipItem(QGraphicsItem):
             else QColor(self.theme["clip_fill"])
         )
         painter.fillRect(self.rect, fill)
+        self._draw_filmstrip(painter, option)
+        self._draw_waveform(painter, option)
         painter.setPen(QPen(QColor(self.theme["clip_border"])))
         painter.drawRect(self.rect)
         
@@ -486,6 +493,67 @@ class ClipItem(QGraphicsItem):
         )
         painter.drawText(self.rect, Qt.AlignCenter, self.clip_data.title)
 
+    def _draw_filmstrip(self, painter, option):
+        # Only blits thumbnails that are already in memory, never decodes
+        scene = self.scene()
+        thumbnails = getattr(scene.views()[0], "thumbnails", None) if scene else None
+        if thumbnails is None or not isinstance(self.clip_data, TimelineVideoClip):
+            return
+
+        view = scene.views()[0]
+        fps = 24
+        pixels_per_second = self.theme["BASE_PIXELS_PER_FRAME"] * view.h_zoom * fps
+        strip = thumbnails.getStrip(self.clip_data.source, pixels_per_second)
+        if strip is None:
+            return
+        interval, images = strip
+
+        exposed = option.exposedRect.intersected(self.rect)
+        tile_width = interval * pixels_per_second
+        first = max(0, int(exposed.left() // tile_width))
+        last = int(exposed.right() // tile_width)
+
+        painter.save()
+        painter.setClipRect(self.rect)
+        for i in range(first, last + 1):
+            image = images.get(int(round(i * interval * 1000)))
+            if image is None:
+                continue
+            y = (self.rect.height() - image.height()) / 2
+            painter.drawImage(QPointF(i * tile_width, y), image)
+        painter.restore()
+
+    def _draw_waveform(self, painter, option):
+        # Peaks come from a precomputed pyramid, so the cost only depends on the visible width
+        scene = self.scene()
+        waveforms = getattr(scene.views()[0], "waveforms", None) if scene else None
+        if waveforms is None or not isinstance(self.clip_data, TimelineAudioClip):
+            return
+
+        peaks = waveforms.getPeaks(self.clip_data.source)
+        if peaks is None:
+            return
+
+        view = scene.views()[0]
+        fps = 24
+        pixels_per_second = self.theme["BASE_PIXELS_PER_FRAME"] * view.h_zoom * fps
+        samples_per_pixel = peaks.sampleRate / pixels_per_second
+
+        exposed = option.exposedRect.intersected(self.rect)
+        first = int(exposed.left())
+        count = int(exposed.right()) - first + 1
+        if count <= 0:
+            return
+        mins, maxs = peaks.peaksForPixels(first * samples_per_pixel, samples_per_pixel, count)
+
+        mid = self.rect.height() / 2
+        half = mid - 2
+        painter.setPen(QPen(QColor(self.theme["waveform_color"])))
+        painter.drawLines([
+            QLineF(first + i, mid - high * half, first + i, mid - low * half)
+            for i, (low, high) in enumerate(zip(mins.tolist(), maxs.tolist()))
+        ])
+
     def _draw_resize_handles(self, painter):
         handle_size = self.RESIZE_HANDLE_SIZE
         rect = self.rect
@@ -690,6 +758,7 @@ class TimelineView(QGraphicsView):
     clipClicked = Signal(object)
 
     dragSignal = Signal(float)
+    playbackRequested = Signal(bool)  # playback itself is driven by the preview clock
     
     def __init__(self, theme, parent=None):
         super().__init__(parent)
@@ -710,6 +779,8 @@ class TimelineView(QGraphicsView):
         self.playhead_frame = 0
         self.end_frame = 0
         self.bottom_frame_offset = self.BOTTOM_MARGIN
+        self.thumbnails = None  # ThumbnailController providing clip filmstrips
+        self.waveforms = None  # WaveformController providing audio clip peaks
         
         self.scene_obj = QGraphicsScene()
         self.setScene(self.scene_obj)
@@ -731,8 +802,6 @@ class TimelineView(QGraphicsView):
         self.trackHeaderItems = []
         self.trackLaneItems = []
         self.clipItems = []
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.playbackStep)
         self.setDragMode(QGraphicsView.RubberBandDrag)
         self.setStyleSheet(f"background-color: {self.theme['background_color']};")
         self.updateLayout()
@@ -865,18 +934,11 @@ class TimelineView(QGraphicsView):
         self.end_frame = frame
         self.updateLayout()
 
-    def playbackStep(self):
-        self.playhead_frame += 1
-        if self.playhead_frame >= self.end_frame:
-            self.playhead_frame = 0
-        self.updateFromPlayhead(self.playhead_frame)
-
     def startPlayback(self):
-        interval = 1000 / 24
-        self.timer.start(interval)
+        self.playbackRequested.emit(True)
 
     def stopPlayback(self):
-        self.timer.stop()
+        self.playbackRequested.emit(False)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)